@@ -0,0 +1,269 @@
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from dimacs_reader import DIMACSReader
+from first_part import SimpleSolver
+from second_part import DLPPSolver, CDCLSolver
+
+
+SOLVERS = ("cdcl", "dpll", "simple")
+
+# the files that are solved when a directory is given
+SUFFIXES = (".cnf", ".in", ".cnf.gz", ".cnf.xz", ".cnf.bz2")
+
+FIELDS = ("file", "solver", "status", "time", "decisions", "conflicts", "propagations", "max_rss", "error")
+
+
+def find_instances(paths: Iterable[str]) -> List[str]:
+    """
+    Collects the instances to solve.
+    :param paths: Files and directories. Directories are searched recursively for files ending in SUFFIXES
+    :return: The paths of the instances, sorted within each directory
+    """
+    instances = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for directory, _, files in os.walk(path):
+                found.extend(os.path.join(directory, file) for file in files if file.endswith(SUFFIXES))
+            instances.extend(sorted(found))
+        else:
+            instances.append(path)
+    return instances
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """
+    :param pid: The id of a process
+    :return: The resident set size of the process in bytes; None if it can not be read on this platform
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def solve_instance(file: str, solver: str, timeout: float) -> Dict[str, Any]:
+    """
+    Reads and solves one instance.
+    :param file: The path of the instance
+    :param solver: The name of the solver, one of SOLVERS
+    :param timeout: The timeout passed on to the solver
+    :return: The result record of the instance
+    """
+    record = {"file": file, "solver": solver}
+    start = time.perf_counter()
+    reader = DIMACSReader()
+    reader.read(file)
+
+    if solver == "simple":
+        instance = SimpleSolver(reader.clauses, timeout=timeout)
+    elif solver == "dpll":
+        instance = DLPPSolver(reader.get_arena(), timeout=timeout)
+    else:
+        instance = CDCLSolver(reader.get_arena(), timeout=timeout)
+
+    # solve returns None if the solver ran out of time
+    satisfiable = instance.solve()
+    record["status"] = "TIMEOUT" if satisfiable is None else "SAT" if satisfiable else "UNSAT"
+
+    record["time"] = time.perf_counter() - start
+    record["decisions"] = instance.get_num_decisions()
+    record["conflicts"] = instance.stats.conflicts
+    record["propagations"] = getattr(instance, "num_propagations", None)
+    return record
+
+
+def _worker(file: str, solver: str, timeout: float, connection):
+    """
+    Solves an instance in a worker process and sends its result record through the connection.
+    """
+    try:
+        record = solve_instance(file, solver, timeout)
+    except MemoryError:
+        record = {"file": file, "solver": solver, "status": "MEMOUT"}
+    except Exception as e:
+        record = {"file": file, "solver": solver, "status": "ERROR", "error": f"{type(e).__name__}: {e}"}
+    connection.send(record)
+    connection.close()
+
+
+class ResultWriter:
+    """
+    Appends result records to a JSONL file, or a CSV file if the path ends in .csv, and flushes after every record,
+    so that the results of an interrupted run are kept.
+    """
+    def __init__(self, path: str, resume=False):
+        """
+        :param path: The path of the output file
+        :param resume: (optional) append to an existing file instead of overwriting it
+        """
+        self.csv = path.endswith(".csv")
+        exists = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            self.__truncate_incomplete_line(path)
+        self.file = open(path, "a" if exists else "w", newline="")
+        self.writer = None
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if not exists:
+                self.writer.writeheader()
+
+    @staticmethod
+    def __truncate_incomplete_line(path: str):
+        """
+        Removes the last line of a file if it was cut off by an interrupted run.
+        :param path: The path of the file
+        """
+        with open(path, "rb+") as f:
+            content = f.read()
+            if not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+
+    def write(self, record: Dict[str, Any]):
+        record = {field: record.get(field) for field in FIELDS}
+        if self.csv:
+            self.writer.writerow(record)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def finished_instances(path: str) -> Set[str]:
+    """
+    Reads the instances that already have a result in an output file.
+    :param path: The path of the JSONL or CSV output file
+    :return: The paths of the finished instances
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            # the csv module reads an incomplete last row like a complete one, so it is dropped like ResultWriter
+            # drops it on resume
+            content = f.read()
+            if not content.endswith("\n"):
+                content = content[:content.rfind("\n") + 1]
+            return {row["file"] for row in csv.DictReader(io.StringIO(content))}
+        finished = set()
+        for line in f:
+            # the last line may be incomplete if the run was killed while writing it
+            try:
+                finished.add(json.loads(line)["file"])
+            except (ValueError, KeyError):
+                continue
+        return finished
+
+
+def run_batch(instances: List[str], output: str, jobs: Optional[int] = None, solver="cdcl", timeout=60.0,
+              memory_limit: Optional[int] = None, kill_grace=1.0, resume=False, poll_interval=0.05,
+              on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Solves instances in parallel worker processes, one process per instance. A worker that exceeds the wall-clock
+    limit or the memory limit is killed, so the limits hold even if the solver does not check its timeout for a while.
+    :param instances: The paths of the instances
+    :param output: The path of the JSONL or CSV file the results are streamed to
+    :param jobs: (optional) the number of instances solved at the same time, by default the number of CPUs
+    :param solver: (optional) the solver, one of SOLVERS
+    :param timeout: (optional) the wall-clock limit per instance in seconds, including reading it. The solver itself
+    stops at the limit, the worker is killed kill_grace seconds later
+    :param memory_limit: (optional) the limit of the resident set size per worker in bytes
+    :param kill_grace: (optional) the seconds a worker may overrun the timeout before it is killed
+    :param resume: (optional) skip the instances that already have a result in the output file and append to it
+    :param poll_interval: (optional) the seconds between two checks of the workers
+    :param on_result: (optional) called with every result record as soon as it is written
+    :return: The result records of the instances solved in this run
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver}, choose one of {', '.join(SOLVERS)}")
+
+    # the writer removes a line cut off by an interrupted run before the finished instances are read
+    writer = ResultWriter(output, resume=resume)
+    finished = finished_instances(output) if resume else set()
+    pending = deque(instance for instance in instances if instance not in finished)
+    jobs = jobs or multiprocessing.cpu_count()
+    records = []
+
+    # the running workers with their instance, connection, start time and largest resident set size
+    running = {}
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                instance = pending.popleft()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                worker = multiprocessing.Process(target=_worker, args=(instance, solver, timeout, sender), daemon=True)
+                worker.start()
+                sender.close()
+                running[worker] = [instance, receiver, time.perf_counter(), 0]
+
+            for worker, (instance, receiver, start, max_rss) in list(running.items()):
+                elapsed = time.perf_counter() - start
+                rss = rss_bytes(worker.pid)
+                if rss is not None:
+                    max_rss = running[worker][3] = max(max_rss, rss)
+
+                record = None
+                if receiver.poll():
+                    try:
+                        record = receiver.recv()
+                    except EOFError:
+                        pass
+                if record is None and not worker.is_alive():
+                    record = {"status": "ERROR", "error": f"worker exited with code {worker.exitcode}"}
+                elif record is None and elapsed > timeout + kill_grace:
+                    worker.kill()
+                    record = {"status": "TIMEOUT", "time": elapsed}
+                elif record is None and memory_limit is not None and rss is not None and rss > memory_limit:
+                    worker.kill()
+                    record = {"status": "MEMOUT", "time": elapsed}
+                if record is None:
+                    continue
+
+                worker.join()
+                receiver.close()
+                del running[worker]
+                record.update(file=instance, solver=solver, max_rss=max_rss or None)
+                record.setdefault("time", elapsed)
+                writer.write(record)
+                records.append(record)
+                if on_result is not None:
+                    on_result(record)
+
+            if running:
+                time.sleep(poll_interval)
+    finally:
+        for worker in running:
+            worker.kill()
+            worker.join()
+        writer.close()
+
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="solves all instances of directories in parallel")
+    parser.add_argument("paths", nargs="*", default=["./test-formulas"], help="instance files and directories")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="the JSONL or CSV file for the results")
+    parser.add_argument("-j", "--jobs", type=int, help="the number of worker processes, by default the CPUs")
+    parser.add_argument("--solver", choices=SOLVERS, default="cdcl")
+    parser.add_argument("--timeout", type=float, default=60, help="wall-clock limit per instance in seconds")
+    parser.add_argument("--memory-limit", type=float, metavar="MB", help="resident set size limit per instance")
+    parser.add_argument("--resume", action="store_true", help="skip instances that already have a result")
+    args = parser.parse_args()
+
+    memory_limit = int(args.memory_limit * 2 ** 20) if args.memory_limit else None
+    run_batch(find_instances(args.paths), args.output, jobs=args.jobs, solver=args.solver, timeout=args.timeout,
+              memory_limit=memory_limit, resume=args.resume,
+              on_result=lambda result: print(f"{result['file']}: {result['status']} in {result['time']:.3f}s",
+                                             flush=True))
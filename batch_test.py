@@ -0,0 +1,87 @@
+import csv
+import json
+
+from batch import find_instances, run_batch, finished_instances
+from second_part.cdcl_solver_test import pigeonhole
+
+
+def write_cnf(path, clauses, num_vars):
+    with open(path, "w") as f:
+        f.write(f"p cnf {num_vars} {len(clauses)}\n")
+        for clause in clauses:
+            f.write(" ".join(map(str, clause)) + " 0\n")
+    return str(path)
+
+
+def test_find_instances(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("b.cnf", "a.in", "sub/c.cnf.gz", "notes.txt"):
+        (tmp_path / name).write_text("")
+    assert find_instances([str(tmp_path)]) == [str(tmp_path / name) for name in ("a.in", "b.cnf", "sub/c.cnf.gz")]
+
+
+def test_run_batch(tmp_path):
+    sat = write_cnf(tmp_path / "sat.cnf", [[1, 2], [-1, 2], [-2, 3]], 3)
+    unsat = write_cnf(tmp_path / "unsat.cnf", pigeonhole(4, 3), 12)
+    broken = tmp_path / "broken.cnf"
+    broken.write_text("1 2 0\n")
+    output = str(tmp_path / "results.jsonl")
+
+    records = run_batch([sat, unsat, str(broken)], output, jobs=2)
+    statuses = {record["file"]: record["status"] for record in records}
+    assert statuses == {sat: "SAT", unsat: "UNSAT", str(broken): "ERROR"}
+
+    with open(output) as f:
+        lines = [json.loads(line) for line in f]
+    assert {line["file"] for line in lines} == set(statuses)
+    solved = next(line for line in lines if line["file"] == unsat)
+    assert solved["conflicts"] > 0 and solved["propagations"] > 0 and solved["time"] > 0
+
+
+def test_run_batch_limits(tmp_path):
+    hard = write_cnf(tmp_path / "hard.cnf", pigeonhole(10, 9), 90)
+    output = str(tmp_path / "results.csv")
+
+    records = run_batch([hard], output, timeout=0.3, kill_grace=0)
+    assert records[0]["status"] == "TIMEOUT"
+    assert records[0]["time"] < 5
+
+    records = run_batch([hard], output, timeout=30, memory_limit=1)
+    assert records[0]["status"] == "MEMOUT"
+
+    with open(output, newline="") as f:
+        assert [row["status"] for row in csv.DictReader(f)] == ["MEMOUT"]
+
+
+def test_run_batch_resume(tmp_path):
+    first = write_cnf(tmp_path / "first.cnf", [[1]], 1)
+    second = write_cnf(tmp_path / "second.cnf", [[-1]], 1)
+    output = str(tmp_path / "results.jsonl")
+
+    run_batch([first], output, jobs=1)
+    # a record cut off by an interrupted run is ignored
+    with open(output, "a") as f:
+        f.write('{"file": "second')
+    assert finished_instances(output) == {first}
+
+    records = run_batch([first, second], output, jobs=1, resume=True)
+    assert [record["file"] for record in records] == [second]
+    assert finished_instances(output) == {first, second}
+
+
+def test_run_batch_resume_csv(tmp_path):
+    first = write_cnf(tmp_path / "first.cnf", [[1]], 1)
+    second = write_cnf(tmp_path / "second.cnf", [[-1]], 1)
+    output = str(tmp_path / "results.csv")
+
+    run_batch([first], output, jobs=1)
+    # csv reads a row cut off by an interrupted run like a complete one, it must not count as finished
+    with open(output, "a") as f:
+        f.write(f"{second},cdcl,S")
+    assert finished_instances(output) == {first}
+
+    records = run_batch([first, second], output, jobs=1, resume=True)
+    assert [record["file"] for record in records] == [second]
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["file"], row["status"]) for row in rows] == [(first, "SAT"), (second, "SAT")]
@@ -0,0 +1,3 @@
+from .generators import Instance, random_ksat, planted_ksat, pigeonhole, parity_chains, graph_colouring, \
+    default_suite
+from .runner import ENGINES, Engine, run_benchmark, run_suite, save_baseline, load_baseline, compare_to_baseline
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+
+from .generators import default_suite
+from .runner import ENGINES, run_suite, save_baseline, load_baseline, compare_to_baseline
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def print_result(result):
+    if result["status"] == "SKIPPED":
+        return
+    propagations = result.get("propagations_per_sec")
+    memory = result.get("peak_memory")
+    print(f"{result['instance']:<28} {result['engine']:<7} {result['status']:<8} {result['time']:>9.3f}s "
+          f"{result['decisions_per_sec']:>11.0f} dec/s "
+          f"{'-' if propagations is None else f'{propagations:.0f}':>11} prop/s "
+          f"{'-' if memory is None else f'{memory / 2 ** 20:.2f}':>8} MB", flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="runs the solvers on generated instances and compares the results "
+                                                 "to a stored baseline")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated instances")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor for the sizes of the instances")
+    parser.add_argument("--timeout", type=float, default=60, help="timeout per run in seconds")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per instance, the fastest is reported")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="the baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative increase of time or peak memory that fails the run")
+    args = parser.parse_args()
+
+    results = run_suite(default_suite(seed=args.seed, scale=args.scale), args.engines, timeout=args.timeout,
+                        repeat=args.repeat, measure_memory=not args.no_memory, on_result=print_result)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, create one with --save-baseline", file=sys.stderr)
+        regressions = compare_to_baseline(results, {})
+    else:
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), threshold=args.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} REGRESSIONS:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
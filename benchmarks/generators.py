@@ -0,0 +1,177 @@
+import math
+import random
+from typing import List, NamedTuple, Optional
+
+
+# the clause to variable ratio at which random k-SAT changes from mostly satisfiable to mostly unsatisfiable
+PHASE_TRANSITION = {2: 1.0, 3: 4.26, 4: 9.93, 5: 21.12, 6: 43.37, 7: 87.79}
+
+
+class Instance(NamedTuple):
+    name: str
+    clauses: List[List[int]]
+    num_variables: int
+    # True or False if the status of the instance is known by construction; None else
+    expected: Optional[bool]
+
+
+def random_ksat(num_variables: int, k=3, ratio: Optional[float] = None, seed=0) -> Instance:
+    """
+    Creates a uniform random k-SAT instance. Every clause consists of k distinct variables with random signs.
+    :param num_variables: The number of variables
+    :param k: (optional) the number of literals per clause
+    :param ratio: (optional) the number of clauses per variable, by default the phase transition of k
+    :param seed: (optional) seed of the random number generator
+    :return: The instance
+    """
+    if ratio is None:
+        ratio = PHASE_TRANSITION.get(k, 2 ** k * math.log(2))
+    rng = random.Random(seed)
+    clauses = [[variable * rng.choice((-1, 1)) for variable in rng.sample(range(1, num_variables + 1), k)]
+               for _ in range(round(ratio * num_variables))]
+    return Instance(f"random-{k}sat-{num_variables}-{seed}", clauses, num_variables, None)
+
+
+def planted_ksat(num_variables: int, k=3, ratio: Optional[float] = None, seed=0) -> Instance:
+    """
+    Creates a random k-SAT instance that is satisfied by a hidden assignment. Random clauses that the hidden
+    assignment falsifies are drawn again.
+    :param num_variables: The number of variables
+    :param k: (optional) the number of literals per clause
+    :param ratio: (optional) the number of clauses per variable, by default the phase transition of k
+    :param seed: (optional) seed of the random number generator
+    :return: The instance
+    """
+    if ratio is None:
+        ratio = PHASE_TRANSITION.get(k, 2 ** k * math.log(2))
+    rng = random.Random(seed)
+    hidden = [None] + [rng.random() < 0.5 for _ in range(num_variables)]
+    clauses = []
+    while len(clauses) < round(ratio * num_variables):
+        clause = [variable * rng.choice((-1, 1)) for variable in rng.sample(range(1, num_variables + 1), k)]
+        if any(hidden[abs(literal)] == (literal > 0) for literal in clause):
+            clauses.append(clause)
+    return Instance(f"planted-{k}sat-{num_variables}-{seed}", clauses, num_variables, True)
+
+
+def pigeonhole(holes: int) -> Instance:
+    """
+    Creates the unsatisfiable instance that holes + 1 pigeons fit into holes holes with at most one pigeon each.
+    Variable (p - 1) * holes + h states that pigeon p sits in hole h.
+    :param holes: The number of holes
+    :return: The instance
+    """
+    pigeons = holes + 1
+
+    def variable(pigeon, hole):
+        return (pigeon - 1) * holes + hole
+
+    clauses = [[variable(pigeon, hole) for hole in range(1, holes + 1)] for pigeon in range(1, pigeons + 1)]
+    for hole in range(1, holes + 1):
+        for first in range(1, pigeons + 1):
+            for second in range(first + 1, pigeons + 1):
+                clauses.append([-variable(first, hole), -variable(second, hole)])
+    return Instance(f"pigeonhole-{holes}", clauses, pigeons * holes, False)
+
+
+def _xor_chain(variables: List[int], parity: bool, next_variable: int, clauses: List[List[int]]) -> int:
+    """
+    Encodes that the XOR of the variables equals the parity with a chain of auxiliary variables, each being the XOR of
+    the previous one and the next variable.
+    :param variables: The variables of the XOR
+    :param parity: The value of the XOR
+    :param next_variable: The first unused variable
+    :param clauses: The list the clauses are appended to
+    :return: The first unused variable after the chain
+    """
+    current = variables[0]
+    for variable in variables[1:]:
+        chained = next_variable
+        next_variable += 1
+        # chained <-> current XOR variable
+        clauses.extend([[-chained, current, variable], [-chained, -current, -variable],
+                        [chained, -current, variable], [chained, current, -variable]])
+        current = chained
+    clauses.append([current if parity else -current])
+    return next_variable
+
+
+def parity_chains(num_variables: int, satisfiable=False, seed=0) -> Instance:
+    """
+    Creates an instance of two XOR chains over the same variables in different random orders. If the chains require
+    different parities the instance is unsatisfiable, which is hard to refute without reasoning about XORs.
+    :param num_variables: The number of variables in the chains
+    :param satisfiable: (optional) whether both chains require the same parity
+    :param seed: (optional) seed of the random number generator
+    :return: The instance
+    """
+    rng = random.Random(seed)
+    parity = rng.random() < 0.5
+    clauses = []
+    variables = list(range(1, num_variables + 1))
+    next_variable = _xor_chain(variables, parity, num_variables + 1, clauses)
+    rng.shuffle(variables)
+    next_variable = _xor_chain(variables, parity if satisfiable else not parity, next_variable, clauses)
+    status = "sat" if satisfiable else "unsat"
+    return Instance(f"parity-{status}-{num_variables}-{seed}", clauses, next_variable - 1, satisfiable)
+
+
+def graph_colouring(num_vertices: int, num_colours=3, edge_ratio=2.3, seed=0, planted=False) -> Instance:
+    """
+    Creates an instance that colours a random graph with a number of colours so that adjacent vertices have different
+    colours. Variable v * num_colours + c + 1 states that vertex v has colour c.
+    :param num_vertices: The number of vertices
+    :param num_colours: (optional) the number of colours
+    :param edge_ratio: (optional) the number of edges per vertex
+    :param seed: (optional) seed of the random number generator
+    :param planted: (optional) only add edges between vertices of different colours of a hidden colouring, which
+    makes the instance satisfiable
+    :return: The instance
+    """
+    rng = random.Random(seed)
+    hidden = [rng.randrange(num_colours) for _ in range(num_vertices)]
+
+    def variable(vertex, colour):
+        return vertex * num_colours + colour + 1
+
+    edges = set()
+    while len(edges) < min(round(edge_ratio * num_vertices), num_vertices * (num_vertices - 1) // 2):
+        first, second = sorted(rng.sample(range(num_vertices), 2))
+        if not planted or hidden[first] != hidden[second]:
+            edges.add((first, second))
+
+    clauses = []
+    for vertex in range(num_vertices):
+        clauses.append([variable(vertex, colour) for colour in range(num_colours)])
+        for first in range(num_colours):
+            for second in range(first + 1, num_colours):
+                clauses.append([-variable(vertex, first), -variable(vertex, second)])
+    for first, second in sorted(edges):
+        for colour in range(num_colours):
+            clauses.append([-variable(first, colour), -variable(second, colour)])
+
+    name = f"colouring-{num_colours}-{num_vertices}-{seed}{'-planted' if planted else ''}"
+    return Instance(name, clauses, num_vertices * num_colours, True if planted else None)
+
+
+def default_suite(seed=0, scale=1.0) -> List[Instance]:
+    """
+    Creates the instances the benchmarks are run on. The same seed and scale always give the same instances.
+    :param seed: (optional) seed of the random instances
+    :param scale: (optional) factor for the sizes of the instances
+    :return: The instances
+    """
+    def size(base):
+        return max(2, round(base * scale))
+
+    instances = []
+    for offset in range(3):
+        instances.append(random_ksat(size(100), seed=seed + offset))
+        instances.append(planted_ksat(size(200), seed=seed + offset))
+    instances.append(random_ksat(size(16), seed=seed))
+    instances.append(pigeonhole(size(7)))
+    instances.append(parity_chains(size(14), satisfiable=False, seed=seed))
+    instances.append(parity_chains(size(60), satisfiable=True, seed=seed))
+    instances.append(graph_colouring(size(50), seed=seed))
+    instances.append(graph_colouring(size(120), seed=seed, planted=True))
+    return instances
@@ -0,0 +1,35 @@
+import itertools
+
+import pytest
+from benchmarks.generators import random_ksat, planted_ksat, pigeonhole, parity_chains, graph_colouring, \
+    default_suite
+
+
+def brute_force(instance):
+    for values in itertools.product([False, True], repeat=instance.num_variables):
+        if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in instance.clauses):
+            return True
+    return False
+
+def test_random_ksat():
+    instance = random_ksat(50, k=3, seed=1)
+    assert len(instance.clauses) == 213
+    assert all(len({abs(literal) for literal in clause}) == 3 for clause in instance.clauses)
+    assert random_ksat(50, k=3, seed=1) == instance
+    assert random_ksat(50, k=3, seed=2) != instance
+    assert len(random_ksat(10, k=4, ratio=2).clauses) == 20
+
+@pytest.mark.parametrize("instance", [
+    planted_ksat(12, seed=3),
+    pigeonhole(3),
+    parity_chains(5, satisfiable=False, seed=1),
+    parity_chains(5, satisfiable=True, seed=1),
+    graph_colouring(6, edge_ratio=1.5, seed=2, planted=True),
+])
+def test_expected_status(instance):
+    assert all(abs(literal) <= instance.num_variables for clause in instance.clauses for literal in clause)
+    assert brute_force(instance) == instance.expected
+
+def test_default_suite_is_reproducible():
+    assert default_suite(seed=4, scale=0.5) == default_suite(seed=4, scale=0.5)
+    assert len({instance.name for instance in default_suite()}) == len(default_suite())
@@ -0,0 +1,177 @@
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from first_part import SimpleSolver
+from second_part import CDCLSolver, DLPPSolver
+
+from .generators import Instance
+
+
+class Engine(NamedTuple):
+    # creates a solver from the clauses of an instance and a timeout
+    create: Callable[[List[List[int]], float], Any]
+    # instances with more variables are skipped
+    max_variables: Optional[int] = None
+
+
+def _simple_solver(clauses: List[List[int]], timeout: float) -> SimpleSolver:
+    return SimpleSolver([[(1 if literal > 0 else -1, abs(literal) - 1) for literal in clause] for clause in clauses],
+                        timeout=timeout)
+
+
+# the solvers that can be benchmarked. New engines only have to be added here
+ENGINES = {
+    "simple": Engine(_simple_solver, max_variables=20),
+    "dpll": Engine(lambda clauses, timeout: DLPPSolver(clauses, timeout=timeout), max_variables=150),
+    "cdcl": Engine(lambda clauses, timeout: CDCLSolver(clauses, timeout=timeout)),
+}
+
+
+def _solve(engine: Engine, instance: Instance, timeout: float) -> Dict[str, Any]:
+    """
+    Creates a solver for an instance and runs it.
+    :return: The status, the time and the counters of the run
+    """
+    start = time.perf_counter()
+    solver = engine.create(instance.clauses, timeout)
+    # solve returns None if the solver ran out of time
+    satisfiable = solver.solve()
+    status = "TIMEOUT" if satisfiable is None else "SAT" if satisfiable else "UNSAT"
+    seconds = time.perf_counter() - start
+
+    correct = None
+    if satisfiable is not None and instance.expected is not None:
+        correct = satisfiable == instance.expected
+    if satisfiable:
+        model = solver.get_model()
+        correct = correct is not False and all(
+            any(model.get(abs(literal)) == (literal > 0) for literal in clause) for clause in instance.clauses)
+
+    return {
+        "status": status,
+        "correct": correct,
+        "time": seconds,
+        "decisions": solver.get_num_decisions(),
+        "propagations": getattr(solver, "num_propagations", None),
+        "conflicts": solver.stats.conflicts,
+    }
+
+
+def run_benchmark(instance: Instance, engine_name: str, timeout=60.0, repeat=1, measure_memory=True) \
+        -> Dict[str, Any]:
+    """
+    Benchmarks an engine on an instance.
+    :param instance: The instance
+    :param engine_name: The name of the engine in ENGINES
+    :param timeout: (optional) timeout of every run in seconds
+    :param repeat: (optional) the number of timed runs, the fastest one is reported
+    :param measure_memory: (optional) measure the peak memory in an additional run under tracemalloc, which is not
+    timed since tracing slows it down
+    :return: The result with the status, time, counters, rates and peak memory in bytes. The status is SKIPPED if the
+    instance is too large for the engine
+    """
+    engine = ENGINES[engine_name]
+    result = {"instance": instance.name, "engine": engine_name}
+    if engine.max_variables is not None and instance.num_variables > engine.max_variables:
+        result["status"] = "SKIPPED"
+        return result
+
+    runs = [_solve(engine, instance, timeout) for _ in range(repeat)]
+    result.update(min(runs, key=lambda run: run["time"]))
+    seconds = max(result["time"], 1e-9)
+    result["decisions_per_sec"] = result["decisions"] / seconds
+    if result["propagations"] is not None:
+        result["propagations_per_sec"] = result["propagations"] / seconds
+
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            _solve(engine, instance, timeout)
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(instances: Iterable[Instance], engine_names: Iterable[str], timeout=60.0, repeat=1,
+              measure_memory=True, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) \
+        -> List[Dict[str, Any]]:
+    """
+    Benchmarks engines on instances.
+    :param instances: The instances
+    :param engine_names: The names of the engines in ENGINES
+    :param timeout: (optional) timeout of every run in seconds
+    :param repeat: (optional) the number of timed runs per instance and engine
+    :param measure_memory: (optional) measure the peak memory of every instance and engine
+    :param on_result: (optional) called with every result as soon as it is available
+    :return: The results of run_benchmark
+    """
+    engine_names = list(engine_names)
+    for engine_name in engine_names:
+        if engine_name not in ENGINES:
+            raise ValueError(f"unknown engine {engine_name}, choose one of {', '.join(ENGINES)}")
+
+    results = []
+    for instance in instances:
+        for engine_name in engine_names:
+            result = run_benchmark(instance, engine_name, timeout=timeout, repeat=repeat,
+                                   measure_memory=measure_memory)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def save_baseline(results: List[Dict[str, Any]], path: str):
+    """
+    Stores results as the baseline of later runs.
+    :param results: The results of run_suite
+    :param path: The path of the JSON file
+    """
+    baseline = {f"{result['engine']}/{result['instance']}": result for result in results}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    :param path: The path of a JSON file written by save_baseline
+    :return: The baseline results by engine and instance
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold=0.25,
+                        min_time=0.05) -> List[str]:
+    """
+    Finds the results that got worse than the baseline.
+    :param results: The results of run_suite
+    :param baseline: The baseline from load_baseline
+    :param threshold: (optional) the relative increase of time or peak memory that counts as regression
+    :param min_time: (optional) times below this in the baseline are too noisy to compare
+    :return: A description of every regression
+    """
+    regressions = []
+    for result in results:
+        key = f"{result['engine']}/{result['instance']}"
+        if result.get("correct") is False:
+            regressions.append(f"{key}: wrong result {result['status']}")
+        if key not in baseline or result["status"] == "SKIPPED":
+            continue
+
+        base = baseline[key]
+        if base["status"] in ("SAT", "UNSAT") and result["status"] not in ("SAT", "UNSAT"):
+            regressions.append(f"{key}: {result['status']} but {base['status']} in the baseline")
+            continue
+        if base["status"] == "SAT" or base["status"] == "UNSAT":
+            if base["time"] >= min_time and result["time"] > base["time"] * (1 + threshold):
+                regressions.append(f"{key}: time {result['time']:.3f}s, baseline {base['time']:.3f}s "
+                                   f"(+{result['time'] / base['time'] - 1:.0%})")
+            if base.get("peak_memory") and result.get("peak_memory") and \
+                    result["peak_memory"] > base["peak_memory"] * (1 + threshold):
+                regressions.append(f"{key}: peak memory {result['peak_memory']} bytes, baseline "
+                                   f"{base['peak_memory']} bytes (+{result['peak_memory'] / base['peak_memory'] - 1:.0%})")
+    return regressions
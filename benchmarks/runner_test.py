@@ -0,0 +1,38 @@
+import pytest
+from benchmarks.generators import Instance, pigeonhole, random_ksat
+from benchmarks.runner import run_benchmark, run_suite, save_baseline, load_baseline, compare_to_baseline
+
+
+def test_run_benchmark():
+    result = run_benchmark(pigeonhole(4), "cdcl")
+    assert result["status"] == "UNSAT"
+    assert result["correct"]
+    assert result["decisions_per_sec"] > 0 and result["propagations_per_sec"] > 0
+    assert result["peak_memory"] > 0
+
+    result = run_benchmark(random_ksat(10, seed=2), "simple", measure_memory=False)
+    assert result["status"] in ("SAT", "UNSAT")
+    assert result["propagations"] is None and "peak_memory" not in result
+
+    assert run_benchmark(pigeonhole(6), "simple")["status"] == "SKIPPED"
+
+def test_run_benchmark_detects_wrong_expectation():
+    instance = Instance("wrong", [[1], [-1, 2]], 2, False)
+    assert run_benchmark(instance, "dpll")["correct"] is False
+
+def test_run_suite_unknown_engine():
+    with pytest.raises(ValueError):
+        run_suite([pigeonhole(2)], ["magic"])
+
+def test_compare_to_baseline(tmp_path):
+    results = run_suite([pigeonhole(3), random_ksat(12, seed=1)], ["dpll", "cdcl"], measure_memory=False)
+    path = str(tmp_path / "baseline.json")
+    save_baseline(results, path)
+    baseline = load_baseline(path)
+    assert compare_to_baseline(results, baseline) == []
+
+    slower = [dict(result, time=result["time"] * 2 + 1) for result in results]
+    assert len(compare_to_baseline(slower, baseline, min_time=0)) == len(results)
+
+    timed_out = [dict(results[0], status="TIMEOUT")]
+    assert "TIMEOUT" in compare_to_baseline(timed_out, baseline)[0]
@@ -0,0 +1,78 @@
+import time
+from typing import Callable, Optional
+
+from solver_statistics import SolverStatistics
+
+
+class Budget:
+    """
+    The resources one call of solve may use. The limits on conflicts, propagations and decisions count from the start
+    of the call. The counters are compared on every check, while the clock and the memory, which cost more to read,
+    are only read every check_interval steps.
+    """
+    def __init__(self, conflicts: Optional[int] = None, propagations: Optional[int] = None,
+                 decisions: Optional[int] = None, memory: Optional[int] = None, seconds=float("inf"),
+                 check_interval=256):
+        """
+        Initializes the budget. None stands for no limit.
+        :param conflicts: (optional) the number of conflicts
+        :param propagations: (optional) the number of propagated literals
+        :param decisions: (optional) the number of decisions
+        :param memory: (optional) the size of the clause database in bytes
+        :param seconds: (optional) the wall-clock time in seconds
+        :param check_interval: (optional) the number of steps between two reads of the clock and the memory
+        """
+        if any(limit is not None and limit < 0 for limit in (conflicts, propagations, decisions, memory)) \
+                or seconds < 0:
+            raise ValueError("budgets can not be negative")
+        if check_interval < 1:
+            raise ValueError("check_interval has to be at least 1")
+        self.conflicts = conflicts
+        self.propagations = propagations
+        self.decisions = decisions
+        self.memory = memory
+        self.seconds = seconds
+        self.check_interval = check_interval
+
+        self.__max_conflicts = self.__max_propagations = self.__max_decisions = float("inf")
+        self.__deadline = float("inf")
+        self.__steps = 0
+
+    def start(self, stats: SolverStatistics):
+        """
+        Starts the budget of a call of solve.
+        :param stats: The statistics of the solver when the call starts
+        """
+        infinity = float("inf")
+        self.__max_conflicts = infinity if self.conflicts is None else stats.conflicts + self.conflicts
+        self.__max_propagations = infinity if self.propagations is None else stats.propagations + self.propagations
+        self.__max_decisions = infinity if self.decisions is None else stats.decisions + self.decisions
+        self.__deadline = time.perf_counter() + self.seconds
+        # the clock is read on the first check
+        self.__steps = self.check_interval
+
+    def exceeded(self, stats: SolverStatistics, memory: Optional[Callable[[], int]] = None, steps=1) \
+            -> Optional[str]:
+        """
+        Checks whether the budget is used up.
+        :param stats: The statistics of the solver
+        :param memory: (optional) returns the memory used by the solver in bytes
+        :param steps: (optional) the number of steps since the last check
+        :return: The name of the exceeded limit: "conflicts", "propagations", "decisions", "time" or "memory";
+        None if the budget is not used up
+        """
+        if stats.conflicts >= self.__max_conflicts:
+            return "conflicts"
+        if stats.propagations >= self.__max_propagations:
+            return "propagations"
+        if stats.decisions >= self.__max_decisions:
+            return "decisions"
+
+        self.__steps += steps
+        if self.__steps >= self.check_interval:
+            self.__steps = 0
+            if time.perf_counter() > self.__deadline:
+                return "time"
+            if self.memory is not None and memory is not None and memory() > self.memory:
+                return "memory"
+        return None
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+import pytest
+from first_part import SimpleSolver
+from budget import Budget
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole, is_model
+from second_part.solver import DLPPSolver
+from solver_statistics import SolverStatistics
+
+
+def test_budget_counts_from_start():
+    stats = SolverStatistics()
+    stats.conflicts = 50
+    budget = Budget(conflicts=10, decisions=0)
+    budget.start(stats)
+    assert budget.exceeded(stats) == "decisions"
+
+    budget = Budget(conflicts=10)
+    budget.start(stats)
+    assert budget.exceeded(stats) is None
+    stats.conflicts = 60
+    assert budget.exceeded(stats) == "conflicts"
+
+def test_budget_reads_clock_and_memory_at_intervals():
+    stats = SolverStatistics()
+    budget = Budget(memory=100, check_interval=10)
+    budget.start(stats)
+    reads = []
+    def memory():
+        reads.append(1)
+        return 50
+    for _ in range(25):
+        assert budget.exceeded(stats, memory) is None
+    # the first check reads the memory and then every tenth
+    assert len(reads) == 3
+    assert budget.exceeded(stats, lambda: 200, steps=10) == "memory"
+
+    budget = Budget(seconds=0)
+    budget.start(stats)
+    time.sleep(0.001)
+    assert budget.exceeded(stats) == "time"
+
+    with pytest.raises(ValueError):
+        Budget(conflicts=-1)
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_time_slices_reach_the_same_result(solver_class):
+    clauses = pigeonhole(6, 5)
+    solver = solver_class(clauses)
+    solver.set_budget(conflicts=20)
+    results = []
+    while True:
+        result = solver.solve()
+        results.append(result)
+        if result is not None:
+            break
+        assert solver.stop_reason == "conflicts"
+    assert results[-1] is False
+    assert len(results) > 3
+
+    # the slices continue the search, so that they need as many conflicts as one call
+    reference = solver_class(clauses)
+    reference.solve()
+    assert solver.num_conflicts == reference.num_conflicts
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_resumed_search_finds_models(solver_class):
+    rng = random.Random(22)
+    for _ in range(20):
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, 12) for _ in range(3)] for _ in range(45)]
+        solver = solver_class(clauses)
+        solver.set_budget(decisions=3)
+        result = None
+        while result is None:
+            result = solver.solve([1])
+        expected = solver_class(clauses).solve([1])
+        assert result == expected
+        if result:
+            assert is_model(clauses, solver.get_model())
+
+def test_other_assumptions_restart_the_search():
+    solver = DLPPSolver(pigeonhole(5, 4))
+    solver.set_budget(decisions=5)
+    assert solver.solve() is None
+    assert solver.decision_level > 0
+    solver.set_budget()
+    assert solver.solve([1]) is False
+    assert solver.get_core() == [1]
+    assert solver.solve() is False
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_interrupt_from_another_thread(solver_class):
+    solver = solver_class(pigeonhole(9, 8))
+    timer = threading.Timer(0.2, solver.interrupt)
+    timer.start()
+    start = time.perf_counter()
+    assert solver.solve() is None
+    assert time.perf_counter() - start < 5
+    assert solver.stop_reason == "interrupt"
+    timer.join()
+
+def test_interrupt_before_solve_stops_the_next_call():
+    solver = CDCLSolver([[1, 2]])
+    solver.interrupt()
+    assert solver.solve() is None
+    assert solver.stop_reason == "interrupt"
+    assert solver.solve() is True
+    assert solver.stop_reason is None
+
+def test_timeout_returns_none():
+    solver = CDCLSolver(pigeonhole(9, 8), timeout=0.1)
+    assert solver.solve() is None
+    assert solver.stop_reason == "time"
+
+def test_memory_budget():
+    solver = CDCLSolver(pigeonhole(8, 7))
+    solver.set_budget(memory=solver.clauses.nbytes() + 1000)
+    assert solver.solve() is None
+    assert solver.stop_reason == "memory"
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_simple_solver_slices(vectorized):
+    # the only model assigns 1 to all twelve variables
+    clauses = [[(1, variable)] for variable in range(12)]
+    solver = SimpleSolver(clauses, vectorized=vectorized, block_bits=6)
+    solver.set_budget(decisions=500)
+    results = []
+    while not results or results[-1] is None:
+        results.append(solver.solve())
+    assert results[-1] is True
+    assert len(results) > 3
+    assert solver.get_model() == {variable: True for variable in range(1, 13)}
+    # every assignment was tried once
+    assert solver.num_decisions == 2 ** 12
+
+    solver.interrupt()
+    assert solver.solve() is None
+    assert solver.stop_reason == "interrupt"
@@ -1,39 +1,209 @@
+import bz2
+import gzip
+import lzma
+import mmap
+import re
+import warnings
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+from second_part.clause_arena import ClauseArena
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional and only speeds up the integer conversion
+    np = None
+
+
+# the literals are stored as 32 bit integers
+MAX_LITERAL = 2 ** 31 - 1
+
+# the files are parsed in chunks of about this many bytes. Chunks always end at a line break
+CHUNK_SIZE = 1 << 24
+
+OPENERS = {
+    ".gz": gzip.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+    ".bz2": bz2.open,
+}
+
+HEADER = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)[ \t\r]*$", re.MULTILINE)
+COMMENT = re.compile(rb"^[ \t]*c.*$", re.MULTILINE)
+# SATLIB files end with a line containing only % followed by garbage
+END_MARKER = re.compile(rb"^[ \t]*%", re.MULTILINE)
+
+
 class DIMACSReader:
     def __init__(self):
         self.num_vars = 0
         self.num_clauses = 0
-        self.clauses = []
 
-    def get_clauses(self):
+        # all literals of the file in the order they appear, every clause terminated by a 0
+        self.literals = array("i")
+
+    @property
+    def clauses(self) -> List[List[Tuple[int, int]]]:
+        """
+        The clauses in the form [[(polarity, variable), ...], ...] with variables starting at 0, as used by the
+        SimpleSolver. They are built on every access.
+        """
         clauses = []
-        for clause in self.clauses:
-            new_clause = []
-            for (polarity, variable) in clause:
-                new_clause.append(polarity * (variable+1))
-            clauses.append(new_clause)
+        clause = []
+        for literal in self.literals:
+            if literal == 0:
+                clauses.append(clause)
+                clause = []
+            else:
+                clause.append((1 if literal > 0 else -1, abs(literal) - 1)) # -1 to get the same index as for array indices
+        return clauses
 
+    def get_clauses(self) -> List[List[int]]:
+        """
+        :return: The clauses in the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+        """
+        clauses = []
+        clause = []
+        for literal in self.literals:
+            if literal == 0:
+                clauses.append(clause)
+                clause = []
+            else:
+                clause.append(literal)
         return clauses
 
-    def read(self, fn:str):
-        with open(fn, "r") as f:
-            line = f.readline()
-            line_split = line.split(" ")
-            assert line_split[0] == "p"
-            assert line_split[1] == "cnf"
+    def get_arena(self) -> ClauseArena:
+        """
+        Creates a clause arena that the solvers use directly, without building a list per clause. Every call
+        returns a new arena, since the solvers modify the arena they are given.
+        :return: The clauses in a new clause arena
+        """
+        return ClauseArena.from_dimacs(array("i", self.literals))
 
-            self.num_vars = int(line_split[2])
-            self.num_clauses = int(line_split[3])
+    def read(self, fn: str):
+        """
+        Reads a CNF in DIMACS format. Comments, clauses spanning several lines, several clauses per line and any
+        whitespace are accepted. Files ending in .gz, .xz, .lzma or .bz2 are decompressed on the fly.
+        :param fn: The path of the file
+        """
+        self.__parse(self.__chunks(fn), fn)
 
-            while (line := f.readline()):
-                literals = line.split(" ")
-                assert literals[-1] == "0\n"
-                literals = literals[:-1]
+    def read_bytes(self, data: bytes, name="<bytes>"):
+        """
+        Reads a CNF in DIMACS format from memory, e.g. one received over the network. The format is the same as for
+        read, but the data is not decompressed.
+        :param data: The content of a DIMACS file
+        :param name: (optional) the name of the data in error messages
+        """
+        self.__parse([data], name)
 
-                clause = []
-                for literal in literals:
-                    literal = int(literal)
-                    clause.append((1 if literal > 0 else -1, abs(literal) - 1)) # -1 to get the same index as for array indices
-                
-                self.clauses.append(clause)
+    def __parse(self, chunks: Iterable[bytes], fn: str):
+        """
+        Parses a CNF from chunks that end at line breaks.
+        :param chunks: The chunks of the file
+        :param fn: The name of the file in error messages
+        """
+        self.num_vars = 0
+        self.num_clauses = 0
+        self.literals = array("i")
+
+        header_found = False
+        for chunk in chunks:
+            if not header_found:
+                match = HEADER.search(chunk)
+                if match is None:
+                    # everything before the header has to be comments or empty lines
+                    if COMMENT.sub(b"", chunk).strip():
+                        raise ValueError(f"{fn} does not start with a 'p cnf' header")
+                    continue
+                if COMMENT.sub(b"", chunk[:match.start()]).strip():
+                    raise ValueError(f"{fn} contains data before the 'p cnf' header")
+
+                header_found = True
+                self.num_vars = int(match.group(1))
+                self.num_clauses = int(match.group(2))
+                chunk = chunk[match.end():]
+
+            # digits and signs are the only other characters of the clauses, so comments are only searched for if
+            # the chunk contains a c or a %
+            end = False
+            if b"%" in chunk:
+                match = END_MARKER.search(chunk)
+                if match is not None:
+                    chunk = chunk[:match.start()]
+                    end = True
+            if b"c" in chunk:
+                chunk = COMMENT.sub(b"", chunk)
+
+            self.__parse_literals(chunk)
+            if end:
+                break
+
+        if not header_found:
+            raise ValueError(f"{fn} does not contain a 'p cnf' header")
+
+        # a missing 0 after the last clause is tolerated
+        if len(self.literals) > 0 and self.literals[-1] != 0:
+            self.literals.append(0)
+
+    def __parse_literals(self, chunk: bytes):
+        """
+        Converts the whitespace separated integers of a chunk and appends them to the literals.
+        :param chunk: A part of the file that contains only integers and whitespace
+        """
+        # numpy reads a chunk consisting only of whitespace as a single 0
+        if not chunk or chunk.isspace():
+            return
+
+        if np is not None:
+            # older versions of numpy only warn about tokens that are not integers
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    values = np.fromstring(chunk, dtype=np.int64, sep=" ")
+                except DeprecationWarning as e:
+                    raise ValueError(str(e)) from None
+            if len(values) > 0 and max(-values.min(), values.max()) > MAX_LITERAL:
+                raise ValueError("literal out of range")
+            self.literals.frombytes(values.astype(np.int32).tobytes())
+        else:
+            try:
+                self.literals.extend(map(int, chunk.split()))
+            except OverflowError:
+                raise ValueError("literal out of range") from None
+
+    @staticmethod
+    def __chunks(fn: str) -> Iterator[bytes]:
+        """
+        Reads a file in large chunks that end at line breaks. Uncompressed files are memory mapped.
+        :param fn: The path of the file
+        :return: The chunks of the file
+        """
+        for suffix, opener in OPENERS.items():
+            if fn.endswith(suffix):
+                with opener(fn, "rb") as f:
+                    rest = b""
+                    while block := f.read(CHUNK_SIZE):
+                        block = rest + block
+                        split = block.rfind(b"\n") + 1
+                        rest = block[split:]
+                        yield block[:split]
+                    yield rest
+                return
 
-            
\ No newline at end of file
+        with open(fn, "rb") as f:
+            # empty files can not be memory mapped
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start = 0
+                while start < len(mapped):
+                    end = min(start + CHUNK_SIZE, len(mapped))
+                    if end < len(mapped):
+                        # lines longer than a chunk extend it to the next line break
+                        newline = mapped.rfind(b"\n", start, end)
+                        if newline < 0:
+                            newline = mapped.find(b"\n", end)
+                        end = newline + 1 if newline >= 0 else len(mapped)
+                    yield mapped[start:end]
+                    start = end
@@ -0,0 +1,113 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+import dimacs_reader
+from dimacs_reader import DIMACSReader
+from second_part import CDCLSolver, DLPPSolver, clause_arena
+
+FORMULA = b"c a comment\np cnf 3 2\n1 -3 0\n2 3 -1 0\n"
+
+
+def read(tmp_path, content: bytes, name="formula.cnf", opener=open) -> DIMACSReader:
+    path = tmp_path / name
+    with opener(path, "wb") as f:
+        f.write(content)
+    reader = DIMACSReader()
+    reader.read(str(path))
+    return reader
+
+
+def test_read_plain(tmp_path):
+    reader = read(tmp_path, FORMULA)
+    assert reader.num_vars == 3
+    assert reader.num_clauses == 2
+    assert reader.get_clauses() == [[1, -3], [2, 3, -1]]
+    assert reader.clauses == [[(1, 0), (-1, 2)], [(1, 1), (1, 2), (-1, 0)]]
+
+
+@pytest.mark.parametrize("suffix, opener", [(".gz", gzip.open), (".xz", lzma.open), (".bz2", bz2.open)])
+def test_read_compressed(tmp_path, suffix, opener):
+    reader = read(tmp_path, FORMULA, name="formula.cnf" + suffix, opener=opener)
+    assert reader.get_clauses() == [[1, -3], [2, 3, -1]]
+
+
+def test_read_lenient_format(tmp_path):
+    content = b"c first\r\n\r\nc second\r\np  cnf\t4 4 \r\n1\t-2\r\n 0 3 0\r\nc between\n-4 0 2\n4 -1\n"
+    reader = read(tmp_path, content)
+    assert reader.num_vars == 4
+    # the missing terminator of the last clause is added
+    assert reader.get_clauses() == [[1, -2], [3], [-4], [2, 4, -1]]
+
+
+def test_read_end_marker(tmp_path):
+    reader = read(tmp_path, b"p cnf 2 2\n1 2 0\n-1 0\n%\n0\n\n")
+    assert reader.get_clauses() == [[1, 2], [-1]]
+
+
+def test_read_bytes():
+    reader = DIMACSReader()
+    reader.read_bytes(FORMULA)
+    assert reader.num_vars == 3
+    assert reader.get_clauses() == [[1, -3], [2, 3, -1]]
+    with pytest.raises(ValueError, match="request"):
+        reader.read_bytes(b"1 2 0\n", name="request")
+
+
+def test_read_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        read(tmp_path, b"c no header\n1 2 0\n")
+    with pytest.raises(ValueError):
+        read(tmp_path, b"1 2 0\np cnf 2 1\n")
+    with pytest.raises(ValueError):
+        read(tmp_path, b"p cnf 2 1\n1 x 0\n")
+    with pytest.raises(ValueError):
+        read(tmp_path, b"p cnf 2 1\n1 99999999999 0\n")
+
+
+def test_read_chunks(tmp_path, monkeypatch):
+    # clauses and comments have to survive being split across chunks
+    monkeypatch.setattr(dimacs_reader, "CHUNK_SIZE", 7)
+    content = b"c comment\np cnf 5 3\n1 -2 3\n-4 5 0\nc another comment\n-1 0 2 3 4 5 0\n"
+    for name, opener in (("formula.cnf", open), ("formula.cnf.gz", gzip.open)):
+        reader = read(tmp_path, content, name=name, opener=opener)
+        assert reader.get_clauses() == [[1, -2, 3, -4, 5], [-1], [2, 3, 4, 5]]
+
+
+def test_read_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(dimacs_reader, "np", None)
+    assert read(tmp_path, FORMULA).get_clauses() == [[1, -3], [2, 3, -1]]
+
+
+def test_get_arena(tmp_path):
+    reader = read(tmp_path, b"p cnf 3 4\n1 -3 0\n2 0\n0\n-1 2 3 0\n")
+    arena = reader.get_arena()
+    assert len(arena) == 4
+    assert [arena[cref] for cref in range(len(arena))] == [[1, -3], [2], [], [-1, 2, 3]]
+    # every call gives an independent arena
+    assert reader.get_arena().literals is not arena.literals
+    assert len(read(tmp_path, b"p cnf 0 0\n").get_arena()) == 0
+
+
+def test_solve_arena(tmp_path):
+    reader = read(tmp_path, b"p cnf 3 4\n1 1 -3 0\n2 0\n-1 -2 3 0\n-3 -2 1 -3 0\n")
+    for solver in (DLPPSolver(reader.get_arena()), CDCLSolver(reader.get_arena())):
+        assert solver.solve()
+        model = solver.get_model()
+        assert set(model) == {1, 2, 3}
+        assert all(any(model[abs(literal)] == (literal > 0) for literal in clause)
+                   for clause in reader.get_clauses())
+
+    reader = read(tmp_path, b"p cnf 1 2\n1 1 0\n-1 0\n")
+    assert not DLPPSolver(reader.get_arena()).solve()
+    assert not CDCLSolver(reader.get_arena()).solve()
+
+
+def test_get_arena_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(clause_arena, "np", None)
+    reader = read(tmp_path, b"p cnf 3 4\n1 -3 0\n2 0\n0\n-1 2 3 0\n")
+    arena = reader.get_arena()
+    assert [arena[cref] for cref in range(len(arena))] == [[1, -3], [2], [], [-1, 2, 3]]
+    assert len(read(tmp_path, b"p cnf 0 0\n").get_arena()) == 0
@@ -0,0 +1,182 @@
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, Python integers are used as bit vectors without it
+    np = None
+
+
+# the highest number of variables whose assignments can be numbered by 64 bit integers
+MAX_VARIABLES = 64
+
+# the bit patterns of the lowest six bits of the assignment numbers within one 64 bit word
+WORD_PATTERNS = [sum(1 << lane for lane in range(64) if lane >> bit & 1) for bit in range(6)]
+ALL_ONES = (1 << 64) - 1
+
+
+class BitParallelEvaluator:
+    """
+    Evaluates a formula on all assignments of its variables in blocks of 2^k assignments at once. Assignment number a
+    assigns the variable i to bit n - 1 - i of a, so that the assignments are numbered in the order of
+    itertools.product([0, 1], repeat=n). Within a block the lowest k bits vary: every clause is stored once as the
+    bit vector of the assignments of a block that satisfy it by its literals on these bits. The literals on the higher
+    bits are fixed within a block and stored as positive and negative bitmasks, so that a block only has to AND the bit
+    vectors of the clauses that its fixed bits do not satisfy.
+    The bit vectors are NumPy arrays of uint64 words or, without NumPy, Python integers.
+    """
+    def __init__(self, clauses: List[List[Tuple[int, int]]], num_variables: int, block_bits=16,
+                 memory_limit=1 << 28, use_numpy: Optional[bool] = None):
+        """
+        Initializes the evaluator.
+        :param clauses: a list of clauses of the form [[(polarity, variable), ...], ...] e.g. [[(1, 5),...],...]
+        :param num_variables: The number of variables, which are 0 to num_variables - 1
+        :param block_bits: (optional) k, the number of variables that are evaluated in parallel in one block
+        :param memory_limit: (optional) the bytes the bit vectors of the clauses may use. Blocks are made smaller to
+        stay below it
+        :param use_numpy: (optional) whether to use NumPy. By default it is used if it is installed
+        """
+        if num_variables > MAX_VARIABLES:
+            raise ValueError(f"the bit-parallel evaluation supports at most {MAX_VARIABLES} variables")
+        if block_bits < 0:
+            raise ValueError("block_bits can not be negative")
+        if use_numpy and np is None:
+            raise ValueError("numpy is not installed")
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.num_variables = num_variables
+
+        # the block bits are limited by the number of variables and by the memory of the bit vectors
+        block_bits = min(block_bits, num_variables)
+        while block_bits > 6 and len(clauses) * (1 << block_bits) // 8 > memory_limit:
+            block_bits -= 1
+        self.block_bits = block_bits
+        self.block_size = 1 << block_bits
+        self.num_blocks = 1 << (num_variables - block_bits)
+
+        # the bits of the assignment numbers that vary within a block as bit vectors over the block
+        patterns = [self.__pattern(bit) for bit in range(block_bits)]
+        self.full = self.__full()
+
+        # the assignments of a block that satisfy all clauses on the block bits only
+        self.base = self.full
+        clause_vectors = []
+        high_positives = []
+        high_negatives = []
+        for clause in clauses:
+            vector = self.__zero()
+            positives = negatives = 0
+            for polarity, variable in clause:
+                if not 0 <= variable < num_variables:
+                    raise ValueError(f"variable {variable} is not one of the variables 0 to {num_variables - 1}")
+                bit = num_variables - 1 - variable
+                if bit < block_bits:
+                    vector = vector | (patterns[bit] if polarity > 0 else self.full & ~patterns[bit])
+                elif polarity > 0:
+                    positives |= 1 << bit
+                else:
+                    negatives |= 1 << bit
+
+            if positives == 0 and negatives == 0:
+                self.base = self.base & vector
+            else:
+                clause_vectors.append(vector)
+                high_positives.append(positives)
+                high_negatives.append(negatives)
+
+        if self.use_numpy:
+            self.clause_vectors = np.array(clause_vectors, dtype=np.uint64).reshape(len(clause_vectors), len(self.full))
+            self.high_positives = np.array(high_positives, dtype=np.uint64)
+            self.high_negatives = np.array(high_negatives, dtype=np.uint64)
+        else:
+            self.clause_vectors = clause_vectors
+            self.high_positives = high_positives
+            self.high_negatives = high_negatives
+
+    def __zero(self):
+        return np.zeros(max(1, self.block_size >> 6), dtype=np.uint64) if self.use_numpy else 0
+
+    def __full(self):
+        """
+        :return: The bit vector of all assignments of a block
+        """
+        if self.use_numpy:
+            full = np.full(max(1, self.block_size >> 6), ALL_ONES, dtype=np.uint64)
+            if self.block_size < 64:
+                full[0] = (1 << self.block_size) - 1
+            return full
+        return (1 << self.block_size) - 1
+
+    def __pattern(self, bit: int):
+        """
+        :param bit: A bit that varies within a block
+        :return: The bit vector of the assignments of a block in which the bit is set
+        """
+        if self.use_numpy:
+            if bit < 6:
+                return np.full(max(1, self.block_size >> 6), WORD_PATTERNS[bit] & self.__full()[0], dtype=np.uint64)
+            words = np.arange(self.block_size >> 6, dtype=np.uint64)
+            return np.where((words >> np.uint64(bit - 6)) & np.uint64(1), np.uint64(ALL_ONES), np.uint64(0))
+
+        # runs of 2^bit zeros and ones, doubled until they cover the block
+        pattern = ((1 << (1 << bit)) - 1) << (1 << bit)
+        length = 2 << bit
+        while length < self.block_size:
+            pattern |= pattern << length
+            length *= 2
+        return pattern
+
+    def evaluate(self, block: int):
+        """
+        Evaluates the formula on the assignments of a block.
+        :param block: The index of the block, whose assignments are block * 2^k to (block + 1) * 2^k - 1
+        :return: The bit vector of the assignments of the block that satisfy the formula
+        """
+        fixed = block << self.block_bits
+        if self.use_numpy:
+            fixed = np.uint64(fixed)
+            unsatisfied = ((fixed & self.high_positives) | (~fixed & self.high_negatives)) == 0
+            vectors = self.clause_vectors[unsatisfied]
+            if len(vectors) == 0:
+                return self.base
+            return self.base & np.bitwise_and.reduce(vectors, axis=0)
+
+        satisfying = self.base
+        for vector, positives, negatives in zip(self.clause_vectors, self.high_positives, self.high_negatives):
+            if fixed & positives or ~fixed & negatives:
+                continue
+            satisfying &= vector
+            if not satisfying:
+                break
+        return satisfying
+
+    def count(self, satisfying) -> int:
+        """
+        :param satisfying: A bit vector of evaluate
+        :return: The number of assignments in it
+        """
+        if self.use_numpy:
+            if hasattr(np, "bitwise_count"):
+                return int(np.bitwise_count(satisfying).sum())
+            return int(np.unpackbits(satisfying.view(np.uint8)).sum())
+        return bin(satisfying).count("1")
+
+    def first(self, satisfying) -> Optional[int]:
+        """
+        :param satisfying: A bit vector of evaluate
+        :return: The index of the first assignment in it within the block; None if it is empty
+        """
+        if self.use_numpy:
+            words = np.flatnonzero(satisfying)
+            if len(words) == 0:
+                return None
+            word = int(satisfying[words[0]])
+            return int(words[0]) * 64 + (word & -word).bit_length() - 1
+        if not satisfying:
+            return None
+        return (satisfying & -satisfying).bit_length() - 1
+
+    def assignment(self, number: int) -> Tuple[int, ...]:
+        """
+        :param number: The number of an assignment
+        :return: The values of the variables 0 to n - 1 under it
+        """
+        return tuple(number >> (self.num_variables - 1 - variable) & 1 for variable in range(self.num_variables))
@@ -1,43 +1,105 @@
 from itertools import product
-from time import perf_counter
-from typing import Dict
+from typing import Callable, Dict, Optional
+
+from budget import Budget
+from solver_statistics import ProgressHooks, SolverStatistics
+
+from .bit_parallel import BitParallelEvaluator
 
 
 class SimpleSolver:
-    def __init__(self, clauses, timeout=float("inf")):
+    def __init__(self, clauses, timeout=float("inf"), vectorized=False, block_bits=16):
         """
         Initialize the solver.
         :param clauses: a list of clauses of the form [[(polarity, variable), ...], ...] e.g. [[(1, 5),...],...]
-        :param timeout: (optional) timeout in seconds
+        :param timeout: (optional) timeout in seconds of every call of solve, after which it returns None
+        :param vectorized: (optional) evaluate blocks of assignments at once with bitwise operations instead of one
+        assignment after the other. The assignments are still tried in the same order
+        :param block_bits: (optional) the vectorized mode evaluates 2^block_bits assignments at once
         """
-        # get the number of variables
-        variables = {}
-        for clause in clauses:
-            for literal in clause:
-                variables[literal[1]] = True
-        self.num_variables = len(variables)
+        # the variables are 0 to the highest one that occurs. Variables below it that occur in no clause are free,
+        # like in a DIMACS file that declares more variables than it uses
+        variables = {literal[1] for clause in clauses for literal in clause}
+        if any(variable < 0 for variable in variables):
+            raise ValueError("variables have to be non-negative indices")
+        self.num_variables = max(variables, default=-1) + 1
 
 
         self.clauses = clauses
         self.model = []
-        self.num_decisions = 0
 
-        self.timeout = timeout
+        # every assignment that is tried counts as a decision and every falsified one as a conflict
+        self.stats = SolverStatistics()
+        self.progress_hooks = ProgressHooks()
+
+        # the budget limits every call of solve. A call that used it up or was interrupted returns None and the
+        # next call continues with the assignments it did not try yet
+        self.budget = Budget(seconds=timeout)
+        self.stop_reason = None
+        self.__interrupt_requested = False
+        self.__assignments = None
+        self.__next_block = 0
 
-    def solve(self) -> bool:
+        self.vectorized = vectorized
+        self.block_bits = block_bits
+        self.__evaluator = None
+
+    def set_budget(self, conflicts: Optional[int] = None, decisions: Optional[int] = None, seconds=float("inf")):
+        """
+        Replaces the budget of the following calls of solve, including the timeout. None stands for no limit.
+        :param conflicts: (optional) the number of falsified assignments per call
+        :param decisions: (optional) the number of tried assignments per call
+        :param seconds: (optional) the wall-clock time per call
+        """
+        self.budget = Budget(conflicts=conflicts, decisions=decisions, seconds=seconds)
+
+    def interrupt(self):
+        """
+        Asks the running call of solve to stop, it returns None at its next check. Only a flag is set, so that it can
+        be called from another thread or from a signal handler. If no call is running, the next one stops at once.
+        """
+        self.__interrupt_requested = True
+
+    def __out_of_budget(self, steps=1) -> bool:
+        """
+        Checks for an interrupt and whether the budget of the running call is used up.
+        :param steps: (optional) the number of assignments since the last check
+        :return: True if the call has to stop. The reason is stored in stop_reason
+        """
+        if self.__interrupt_requested:
+            self.__interrupt_requested = False
+            self.stop_reason = "interrupt"
+            return True
+        self.stop_reason = self.budget.exceeded(self.stats, steps=steps)
+        return self.stop_reason is not None
+
+    def solve(self) -> Optional[bool]:
         """
         Solves the given SAT problem
-        :return: True if a model was found, False else
+        :return: True if a model was found, False else; None if the budget was used up or the solver was interrupted
+        before. The next call resumes with the next assignment
         """
-        start_time = perf_counter()
+        self.stop_reason = None
+        self.budget.start(self.stats)
+        if self.vectorized:
+            return self.__solve_vectorized()
 
-        # tries all possible assignments by iterating over all lists with elements out of {0,1} of length n
-        for assignment in  product([0,1], repeat=self.num_variables):
-            # every new assignment can be seen as a decision
-            self.num_decisions += 1
+        stats = self.stats
+
+        # tries all possible assignments by iterating over all lists with elements out of {0,1} of length n. The
+        # iterator is kept while the search is stopped
+        if self.__assignments is None:
+            self.__assignments = product([0, 1], repeat=self.num_variables)
+        assignments = self.__assignments
+        while True:
+            if self.__out_of_budget():
+                return None
+            assignment = next(assignments, None)
+            if assignment is None:
+                break
 
-            if perf_counter() - start_time > self.timeout:
-                raise TimeoutError()
+            # every new assignment can be seen as a decision
+            stats.decisions += 1
 
             # each clause is tested against the assignment
             for clause in self.clauses:
@@ -56,16 +118,95 @@ class SimpleSolver:
 
                 # if one clause is false by the assignment the whole CNF is false
                 if clause_val is False:
+                    stats.conflicts += 1
+                    if stats.conflicts >= self.progress_hooks.next_call:
+                        self.progress_hooks.call(self, stats.conflicts)
                     break
             else:
                 # if there was no clause that was false under the assignment
                 # the current assignment is a model for the CNF
                 self.model = assignment
+                self.__assignments = None
                 return True
 
         # if all possibilities were exhausted there is no model for the CNF and it is unsatisfiable
+        self.__assignments = None
         return False
 
+    def __solve_vectorized(self) -> Optional[bool]:
+        """
+        Solves the given SAT problem by evaluating blocks of assignments at once. Every assignment of a block counts
+        as a decision and every one of them that is not a model as a conflict. The budget is checked before every
+        block, a stopped search resumes with the block it did not evaluate.
+        :return: True if a model was found, False else; None if the budget was used up or the solver was interrupted
+        """
+        stats = self.stats
+        evaluator = self.__make_evaluator()
+        while self.__next_block < evaluator.num_blocks:
+            block = self.__next_block
+            if self.__out_of_budget(evaluator.block_size):
+                return None
+            self.__next_block += 1
+            satisfying = evaluator.evaluate(block)
+            first = evaluator.first(satisfying)
+            tried = evaluator.block_size if first is None else first + 1
+            stats.decisions += tried
+            stats.conflicts += tried if first is None else tried - 1
+            if stats.conflicts >= self.progress_hooks.next_call:
+                self.progress_hooks.call(self, stats.conflicts)
+
+            if first is not None:
+                self.model = evaluator.assignment(block * evaluator.block_size + first)
+                self.__next_block = 0
+                return True
+        self.__next_block = 0
+        return False
+
+    def __make_evaluator(self) -> BitParallelEvaluator:
+        """
+        :return: The evaluator of the vectorized mode, which is built on first use
+        """
+        if self.__evaluator is None:
+            self.__evaluator = BitParallelEvaluator(self.clauses, self.num_variables, block_bits=self.block_bits)
+        return self.__evaluator
+
+    def count_models(self) -> Optional[int]:
+        """
+        Counts the models of the given SAT problem, i.e. the assignments of all variables that satisfy it. The
+        budget of solve applies, but a stopped count is not resumed.
+        :return: The number of models; None if the budget was used up or the solver was interrupted
+        """
+        self.stop_reason = None
+        self.budget.start(self.stats)
+        num_models = 0
+        if self.vectorized:
+            evaluator = self.__make_evaluator()
+            for block in range(evaluator.num_blocks):
+                if self.__out_of_budget(evaluator.block_size):
+                    return None
+                num_models += evaluator.count(evaluator.evaluate(block))
+            return num_models
+
+        for assignment in product([0, 1], repeat=self.num_variables):
+            if self.__out_of_budget():
+                return None
+            if all(any(bool(assignment[variable]) == (polarity == 1) for polarity, variable in clause)
+                   for clause in self.clauses):
+                num_models += 1
+        return num_models
+
+    @property
+    def num_decisions(self) -> int:
+        return self.stats.decisions
+
+    def add_hook(self, callback: Callable[["SimpleSolver"], None], every=1000):
+        """
+        Registers a callback that is called with the solver every few falsified assignments.
+        :param callback: The function to call
+        :param every: (optional) the number of falsified assignments between two calls
+        """
+        self.progress_hooks.add(callback, every, self.stats.conflicts)
+
     def get_num_decisions(self) -> int:
         """
         Returns the number of decisions made
@@ -0,0 +1,102 @@
+import random
+import pytest
+
+from first_part import SimpleSolver, bit_parallel
+from first_part.bit_parallel import BitParallelEvaluator
+
+
+def random_formula(rng, num_variables, num_clauses):
+    clauses = [[(rng.choice([-1, 1]), rng.randrange(num_variables)) for _ in range(rng.randint(1, 3))]
+               for _ in range(num_clauses)]
+    # every variable has to occur in the formula
+    return clauses + [[(1, variable), (-1, variable)] for variable in range(num_variables)]
+
+@pytest.fixture(params=["numpy", "integers"])
+def engine(request, monkeypatch):
+    if request.param == "numpy" and bit_parallel.np is None:
+        pytest.skip("numpy is not installed")
+    if request.param == "integers":
+        monkeypatch.setattr(bit_parallel, "np", None)
+    return request.param
+
+def test_solve():
+    solver = SimpleSolver([[(1, 0), (-1, 1)], [(1, 1)]])
+    assert solver.solve() is True
+    assert solver.get_model() == {1: True, 2: True}
+    assert solver.count_models() == 1
+
+@pytest.mark.parametrize("block_bits", [0, 3, 6, 8])
+def test_vectorized_matches_simple_solver(engine, block_bits):
+    rng = random.Random(18)
+    for _ in range(30):
+        clauses = random_formula(rng, rng.randint(1, 10), rng.randint(0, 30))
+        solver = SimpleSolver(clauses)
+        vectorized = SimpleSolver(clauses, vectorized=True, block_bits=block_bits)
+        assert vectorized.solve() == solver.solve()
+        # the assignments are tried in the same order
+        assert vectorized.get_model() == solver.get_model()
+        assert vectorized.get_num_decisions() == solver.get_num_decisions()
+        assert vectorized.stats.conflicts == solver.stats.conflicts
+        assert vectorized.count_models() == solver.count_models()
+
+def test_sparse_variables(engine):
+    # the variables in between that occur in no clause are free
+    for clauses, num_models in (([[(1, 0), (1, 2)], [(-1, 0)]], 2), ([[(1, 0)], [(-1, 5)]], 16)):
+        solver = SimpleSolver(clauses)
+        vectorized = SimpleSolver(clauses, vectorized=True, block_bits=2)
+        assert solver.solve() is True and vectorized.solve() is True
+        assert vectorized.get_model() == solver.get_model()
+        assert vectorized.get_num_decisions() == solver.get_num_decisions()
+        assert vectorized.count_models() == solver.count_models() == num_models
+    vectorized = SimpleSolver([[(1, 0), (1, 2)], [(-1, 0)]], vectorized=True)
+    assert vectorized.solve() is True
+    assert vectorized.get_model() == {1: False, 2: False, 3: True}
+
+    rng = random.Random(5)
+    for _ in range(20):
+        variables = rng.sample(range(12), rng.randint(1, 6))
+        clauses = [[(rng.choice([-1, 1]), rng.choice(variables)) for _ in range(rng.randint(1, 3))]
+                   for _ in range(rng.randint(1, 12))]
+        solver = SimpleSolver(clauses)
+        vectorized = SimpleSolver(clauses, vectorized=True, block_bits=3)
+        assert vectorized.solve() == solver.solve()
+        assert vectorized.get_model() == solver.get_model()
+        assert vectorized.count_models() == solver.count_models()
+
+def test_invalid_variables():
+    with pytest.raises(ValueError):
+        SimpleSolver([[(1, -1)]])
+    with pytest.raises(ValueError):
+        BitParallelEvaluator([[(1, 3)]], 3)
+
+def test_vectorized_with_many_variables(engine):
+    # x0 xor x1, x2 xor x3, ... has 2^12 models among the 2^24 assignments
+    clauses = []
+    for variable in range(0, 24, 2):
+        clauses += [[(1, variable), (1, variable + 1)], [(-1, variable), (-1, variable + 1)]]
+    solver = SimpleSolver(clauses, vectorized=True)
+    assert solver.count_models() == 2 ** 12
+    assert solver.solve() is True
+    assert solver.get_model() == {variable + 1: variable % 2 == 1 for variable in range(24)}
+
+def test_vectorized_hooks_and_timeout():
+    reports = []
+    solver = SimpleSolver([[(1, 0)], [(-1, 0)]] + [[(1, variable), (-1, variable)] for variable in range(1, 12)],
+                          vectorized=True, block_bits=8)
+    solver.add_hook(lambda s: reports.append(s.stats.conflicts), every=1000)
+    assert solver.solve() is False
+    assert solver.stats.conflicts == 2 ** 12
+    assert reports == [1024, 2048, 3072, 4096]
+
+    solver = SimpleSolver([[(1, variable), (-1, variable)] for variable in range(30)] + [[(1, 0)], [(-1, 0)]],
+                          vectorized=True, block_bits=6, timeout=0.1)
+    assert solver.count_models() is None
+    assert solver.stop_reason == "time"
+
+def test_evaluator_limits():
+    with pytest.raises(ValueError):
+        BitParallelEvaluator([], 65)
+    # the blocks get smaller to keep the bit vectors of the clauses in memory
+    evaluator = BitParallelEvaluator([[(1, 0), (1, 19)]] * 64, 20, block_bits=16, memory_limit=1 << 12)
+    assert evaluator.block_bits == 9
+    assert evaluator.num_blocks == 2 ** 11
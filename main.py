@@ -1,40 +1,124 @@
+import argparse
 from glob import glob
 
 
 from dimacs_reader import DIMACSReader
 from first_part import SimpleSolver
-from second_part import DLPPSolver
+from second_part import DLPPSolver, CDCLSolver
+from second_part.cache import ResultCache, solve_cached
+from second_part.cube_and_conquer import solve_cubes
+from second_part.portfolio import solve_portfolio
 
 
-def main():
-    files = glob("./test-formulas/*.in")
+def report(is_sat, solver, name):
+    # solve returns None if the solver ran out of time
+    if is_sat is None:
+        print(f"{name} timeout")
+        return
+    print(is_sat)
+    print(solver.get_model())
+    print(solver.get_num_decisions())
+
+
+def main(files, timeout=10):
     for file in files:
         print(f"solving file {file}", flush=True)
         dimacs_reader = DIMACSReader()
         dimacs_reader.read(file)
 
-        try:
-            solver1 = SimpleSolver(dimacs_reader.clauses, timeout=10)
-            print("solver1 ...")
-            is_sat1 = solver1.solve()
-            print(is_sat1)
-            print(solver1.get_model())
-            print(solver1.get_num_decisions())
-        except TimeoutError:
-            print("solver1 timeout")
-        try:
-            print()
-            print("solver2 ...")
-            solver2 = DLPPSolver(dimacs_reader.get_clauses(), timeout=10)
-            is_sat2 = solver2.solve()
-            print(is_sat2)
-            print(solver2.get_model())
-            print(solver2.get_num_decisions())
-        except TimeoutError:
-            print("solver2 timeout")
+        solver1 = SimpleSolver(dimacs_reader.clauses, timeout=timeout)
+        print("solver1 ...")
+        report(solver1.solve(), solver1, "solver1")
+
+        print()
+        print("solver2 ...")
+        solver2 = DLPPSolver(dimacs_reader.get_arena(), timeout=timeout)
+        report(solver2.solve(), solver2, "solver2")
+
+        print()
+        print("solver3 ...")
+        solver3 = CDCLSolver(dimacs_reader.get_arena(), timeout=timeout)
+        report(solver3.solve(), solver3, "solver3")
+        print()
+
+
+def main_portfolio(files, num_workers, timeout=10):
+    for file in files:
+        print(f"solving file {file} with a portfolio of {num_workers} solvers", flush=True)
+        dimacs_reader = DIMACSReader()
+        dimacs_reader.read(file)
+
+        result = solve_portfolio(dimacs_reader.literals, num_workers=num_workers, timeout=timeout)
+        if result.satisfiable is None:
+            print("portfolio timeout")
+        else:
+            print(result.satisfiable)
+            print(result.model)
+            print(f"solved by worker {result.worker} {result.config} in {result.seconds:.3f}s")
         print()
 
 
+def main_cubes(files, num_workers, depth, timeout=10):
+    for file in files:
+        print(f"solving file {file} by cube and conquer with {num_workers} DPLL solvers", flush=True)
+        dimacs_reader = DIMACSReader()
+        dimacs_reader.read(file)
+
+        result = solve_cubes(dimacs_reader.literals, num_workers=num_workers, depth=depth, timeout=timeout)
+        if result.satisfiable is None:
+            print("cube and conquer timeout")
+        else:
+            print(result.satisfiable)
+            print(result.model)
+        print(f"{len(result.cubes)} of {result.num_cubes} cubes solved, {result.num_refuted} refuted by the cuber, "
+              f"{result.seconds:.3f}s")
+        if result.cubes:
+            times = sorted(cube.seconds for cube in result.cubes)
+            print(f"cube times: min {times[0]:.3f}s, median {times[len(times) // 2]:.3f}s, max {times[-1]:.3f}s")
+            worker_times = ", ".join(f"{worker}: {seconds:.3f}s" for worker, seconds in
+                                     sorted(result.worker_times().items()))
+            print(f"worker times: {worker_times}")
+        print()
+
+
+def main_cached(files, cache_path, timeout=10):
+    with ResultCache(cache_path) as cache:
+        for file in files:
+            print(f"solving file {file} with the result cache {cache_path}", flush=True)
+            dimacs_reader = DIMACSReader()
+            dimacs_reader.read(file)
+
+            result = solve_cached(dimacs_reader.get_clauses(), cache,
+                                  solver=lambda clauses: CDCLSolver(clauses, timeout=timeout))
+            if result.satisfiable is None:
+                print("solver timeout")
+            else:
+                print(result.satisfiable)
+                print(result.model)
+            print("cache hit" if result.hit else "cache miss")
+            print()
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="the CNF files to solve, by default ./test-formulas/*.in")
+    parser.add_argument("--timeout", type=float, default=10, help="timeout in seconds per solver")
+    parser.add_argument("--portfolio", type=int, metavar="N",
+                        help="solve with N diversified CDCL solvers in parallel processes")
+    parser.add_argument("--cubes", type=int, metavar="N",
+                        help="split the formula into cubes and solve them with N DPLL solvers in parallel processes")
+    parser.add_argument("--cube-depth", type=int, default=8, help="the number of splits of every cube")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="solve with the CDCL solver and reuse the results stored in the SQLite database PATH")
+    args = parser.parse_args()
+    files = args.files or glob("./test-formulas/*.in")
+
     print("starting solver")
-    main()
+    if args.portfolio:
+        main_portfolio(files, args.portfolio, timeout=args.timeout)
+    elif args.cubes:
+        main_cubes(files, args.cubes, args.cube_depth, timeout=args.timeout)
+    elif args.cache:
+        main_cached(files, args.cache, timeout=args.timeout)
+    else:
+        main(files, timeout=args.timeout)
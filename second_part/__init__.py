@@ -1 +1,6 @@
-from .solver import DLPPSolver, Clause, Status
\ No newline at end of file
+from .solver import DLPPSolver, Clause, Status
+from .cdcl_solver import CDCLSolver
+from .clause_arena import ClauseArena
+from .preprocessor import Preprocessor
+from .local_search import LocalSearchSolver
+from .proof import DRATWriter, check_drat
@@ -0,0 +1,223 @@
+import hashlib
+import sqlite3
+from array import array
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .cdcl_solver import CDCLSolver
+from .solver import DLPPSolver
+
+
+# changes of the canonical form or of the encoding of the models invalidate the keys of older caches
+FORMAT_VERSION = b"cnf-v1"
+
+
+class CachedResult(NamedTuple):
+    # True or False; None if the solver ran out of budget, which is not cached
+    satisfiable: Optional[bool]
+    model: Dict[int, bool]
+    # whether the result was taken from the cache
+    hit: bool
+    key: str
+
+
+def canonicalize(clauses: Iterable[Iterable[int]], renumber=False) -> Tuple[List[List[int]], Dict[int, int]]:
+    """
+    Brings a formula into a canonical form that does not depend on the order of its clauses and literals: the
+    terminating zeros and duplicate literals are dropped, the literals of every clause are sorted by their variables
+    and the clauses are sorted and deduplicated.
+    :param clauses: The clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+    :param renumber: (optional) renumber the variables to 1 ... n in the order of their numbers, so that formulas that
+    only differ by gaps or offsets in their numbering get the same form. Formulas whose variables are permuted
+    otherwise are not recognized, that would need a canonical labelling of the formula as a graph
+    :return: The canonical clauses and the canonical number of every original variable
+    """
+    clauses = [{literal for literal in clause if literal != 0} for clause in clauses]
+    variables = sorted({abs(literal) for clause in clauses for literal in clause})
+    mapping = {variable: index + 1 for index, variable in enumerate(variables)} if renumber else \
+        {variable: variable for variable in variables}
+
+    canonical = set()
+    for clause in clauses:
+        renamed = (mapping[literal] if literal > 0 else -mapping[-literal] for literal in clause)
+        canonical.add(tuple(sorted(renamed, key=lambda literal: (abs(literal), literal))))
+    return [list(clause) for clause in sorted(canonical, key=lambda clause: (len(clause), clause))], mapping
+
+
+def formula_key(canonical_clauses: List[List[int]]) -> str:
+    """
+    Hashes a canonical formula.
+    :param canonical_clauses: The clauses returned by canonicalize
+    :return: The SHA-256 hash of the formula in hexadecimal
+    """
+    digest = hashlib.sha256(FORMAT_VERSION)
+    for clause in canonical_clauses:
+        digest.update(array("i", clause + [0]).tobytes())
+    return digest.hexdigest()
+
+
+def is_model(clauses: Iterable[Iterable[int]], model: Dict[int, bool]) -> bool:
+    """
+    :return: True if every clause has a literal that is True under the model
+    """
+    return all(any(model.get(abs(literal)) == (literal > 0) for literal in clause if literal != 0)
+               for clause in clauses)
+
+
+class ResultCache:
+    """
+    Stores the results of solved formulas on disk in an SQLite database, keyed by the hash of their canonical form.
+    A model is stored as the array of its True literals. When the cache holds more than max_entries results or
+    their models more than max_bytes, the least recently used results are evicted.
+    """
+    def __init__(self, path: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Opens or creates the cache.
+        :param path: The path of the database file, ":memory:" for a cache that is not persisted
+        :param max_entries: (optional) the number of results that are kept
+        :param max_bytes: (optional) the total size of the stored models in bytes
+        """
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 0):
+            raise ValueError("max_entries has to be at least 1 and max_bytes can not be negative")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # other processes may use the same file, they wait for each other's writes
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, satisfiable INTEGER NOT NULL, "
+                "model BLOB NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __touch(self, key: str):
+        """
+        Marks a result as the most recently used one. A counter is used instead of the clock, whose resolution may
+        not tell apart results used one after the other.
+        """
+        self.connection.execute(
+            "UPDATE results SET last_used = (SELECT COALESCE(MAX(last_used), 0) + 1 FROM results) WHERE key = ?",
+            (key,))
+
+    def get(self, key: str) -> Optional[Tuple[bool, Dict[int, bool]]]:
+        """
+        Looks up a result.
+        :param key: The key of the formula
+        :return: Whether the formula is satisfiable and its model in the canonical numbering; None if it is not cached
+        """
+        row = self.connection.execute("SELECT satisfiable, model FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self.connection:
+            self.__touch(key)
+        literals = array("i")
+        literals.frombytes(row[1])
+        return bool(row[0]), {abs(literal): literal > 0 for literal in literals}
+
+    def put(self, key: str, satisfiable: bool, model: Dict[int, bool]):
+        """
+        Stores a result and evicts the least recently used ones if the cache is full.
+        :param key: The key of the formula
+        :param satisfiable: Whether the formula is satisfiable
+        :param model: The model in the canonical numbering, {} for unsatisfiable formulas
+        """
+        blob = array("i", (variable if value else -variable for variable, value in sorted(model.items()))).tobytes()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (key, satisfiable, model, size, last_used) VALUES (?, ?, ?, ?, 0)",
+                (key, int(satisfiable), blob, len(blob)))
+            self.__touch(key)
+            self.__evict()
+
+    def delete(self, key: str):
+        """
+        Removes a result, e.g. one whose model turned out to be wrong.
+        :param key: The key of the formula
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def __evict(self):
+        """
+        Deletes the least recently used results until the limits hold.
+        """
+        if self.max_entries is not None:
+            self.connection.execute(
+                "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,))
+        if self.max_bytes is not None:
+            total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            rows = self.connection.execute("SELECT key, size FROM results ORDER BY last_used").fetchall()
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= size
+            self.connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def clear(self):
+        """
+        Removes all results.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
+
+    def close(self):
+        self.connection.close()
+
+
+def solve_cached(clauses: Iterable[Iterable[int]], cache: ResultCache,
+                 solver: Union[str, Callable[[List[List[int]]], DLPPSolver]] = "cdcl", renumber=True) -> CachedResult:
+    """
+    Solves a formula unless its result is cached. A cached model is only returned if it satisfies the formula,
+    otherwise the result is dropped from the cache and the formula is solved again. Results of solvers that ran out
+    of budget are not cached.
+    :param clauses: The clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+    :param cache: The cache
+    :param solver: (optional) "cdcl", "dpll" or a function that creates a solver from the canonical clauses, e.g. to
+    pass a timeout or other options
+    :param renumber: (optional) renumber the variables in the canonical form, see canonicalize
+    :return: The result
+    """
+    if isinstance(solver, str):
+        solvers = {"cdcl": CDCLSolver, "dpll": DLPPSolver}
+        if solver not in solvers:
+            raise ValueError(f"unknown solver {solver}, choose one of {', '.join(solvers)}")
+        solver = solvers[solver]
+
+    clauses = [list(clause) for clause in clauses]
+    canonical, mapping = canonicalize(clauses, renumber)
+    key = formula_key(canonical)
+
+    def original_model(canonical_model: Dict[int, bool]) -> Dict[int, bool]:
+        return {variable: canonical_model[number] for variable, number in mapping.items() if number in canonical_model}
+
+    cached = cache.get(key)
+    if cached is not None:
+        satisfiable, model = cached
+        model = original_model(model)
+        # an unsatisfiable result can not be checked cheaply and is trusted
+        if not satisfiable or (len(model) == len(mapping) and is_model(clauses, model)):
+            return CachedResult(satisfiable, model, True, key)
+        cache.delete(key)
+
+    instance = solver(canonical)
+    satisfiable = instance.solve()
+    if satisfiable is None:
+        return CachedResult(None, {}, False, key)
+    model = instance.get_model()
+    cache.put(key, satisfiable, model)
+    return CachedResult(satisfiable, original_model(model), False, key)
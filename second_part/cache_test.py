@@ -0,0 +1,88 @@
+import random
+import pytest
+from second_part.cache import ResultCache, canonicalize, formula_key, is_model, solve_cached
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole
+
+
+def shuffled(clauses, rng):
+    clauses = [rng.sample(clause, len(clause)) for clause in clauses]
+    rng.shuffle(clauses)
+    return clauses
+
+def test_canonical_form_ignores_order_and_duplicates():
+    rng = random.Random(23)
+    clauses = [[rng.choice([-1, 1]) * rng.randint(1, 20) for _ in range(3)] for _ in range(40)]
+    canonical, _ = canonicalize(clauses)
+    assert canonicalize(shuffled(clauses, rng) + clauses[:5])[0] == canonical
+    assert canonicalize([clause + [0] for clause in clauses])[0] == canonical
+    assert formula_key(canonical) == formula_key(canonicalize(shuffled(clauses, rng))[0])
+    assert formula_key(canonical) != formula_key(canonical[1:])
+
+def test_renumbering():
+    canonical, mapping = canonicalize([[10, -30], [30, 20]], renumber=True)
+    assert mapping == {10: 1, 20: 2, 30: 3}
+    assert canonical == [[1, -3], [2, 3]]
+    assert canonicalize([[101, -103], [103, 102]], renumber=True)[0] == canonical
+    assert canonicalize([[10, -30], [30, 20]])[0] == [[10, -30], [20, 30]]
+
+def test_solve_cached(tmp_path):
+    rng = random.Random(5)
+    clauses = [[rng.choice([-1, 1]) * rng.randint(1, 30) for _ in range(3)] for _ in range(100)]
+    path = str(tmp_path / "cache.sqlite")
+    with ResultCache(path) as cache:
+        first = solve_cached(clauses, cache)
+        assert first.satisfiable is True and not first.hit
+        second = solve_cached(shuffled(clauses, rng), cache)
+        assert second.hit
+        assert is_model(clauses, second.model)
+
+    # the results persist and the models are translated to the numbering of each formula
+    shifted = [[literal + 100 if literal > 0 else literal - 100 for literal in clause] for clause in clauses]
+    with ResultCache(path) as cache:
+        result = solve_cached(shifted, cache, solver="dpll")
+        assert result.hit
+        assert is_model(shifted, result.model)
+        assert set(result.model) == {abs(literal) for clause in shifted for literal in clause}
+
+        result = solve_cached(pigeonhole(4, 3), cache)
+        assert result.satisfiable is False
+        assert solve_cached(pigeonhole(4, 3), cache) == result._replace(hit=True)
+        assert cache.hits == 2 and cache.misses == 1
+
+def test_wrong_cached_model_is_solved_again():
+    cache = ResultCache(":memory:")
+    clauses = [[1, 2], [-1], [2, 3]]
+    key = formula_key(canonicalize(clauses, renumber=True)[0])
+    cache.put(key, True, {1: True, 2: False, 3: False})
+    result = solve_cached(clauses, cache)
+    assert not result.hit
+    assert is_model(clauses, result.model)
+    assert cache.get(key)[1] == result.model
+
+def test_unfinished_results_are_not_cached():
+    cache = ResultCache(":memory:")
+    result = solve_cached(pigeonhole(9, 8), cache, solver=lambda clauses: CDCLSolver(clauses, timeout=0.05))
+    assert result.satisfiable is None
+    assert len(cache) == 0
+
+def test_lru_eviction():
+    cache = ResultCache(":memory:", max_entries=3)
+    for key in "abcd":
+        cache.put(key, False, {})
+        if key == "c":
+            # a is used again, so that b is the least recently used result
+            assert cache.get("a") is not None
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+
+    # every model of 4 variables takes 16 bytes
+    cache = ResultCache(":memory:", max_bytes=40)
+    for key in "abc":
+        cache.put(key, True, {1: True, 2: False, 3: True, 4: True})
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+    with pytest.raises(ValueError):
+        ResultCache(":memory:", max_entries=0)
@@ -0,0 +1,377 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from solver_statistics import profile_method
+
+from .clause_arena import ClauseArena
+from .heuristics import BranchingHeuristic
+from .preprocessor import Preprocessor
+from .proof import DRATWriter
+from .restarts import RestartPolicy, make_restart_policy
+from .solver import DLPPSolver, Status
+
+
+class CDCLSolver(DLPPSolver):
+    """
+    A conflict driven clause learning Solver. It shares the watch lists, the propagation queue and the variable stack
+    with the DPLL Solver, but instead of flipping the last decision on a conflict it learns a clause by first-UIP
+    conflict analysis and backjumps to the level at which the learned clause becomes unit.
+    """
+    def __init__(self, clauses: Union[List[list[int]], ClauseArena], timeout=float("inf"), verify=False,
+                 heuristic: Union[str, BranchingHeuristic] = "vsids", phase_saving=True, default_phase=True,
+                 restart_policy: Union[str, RestartPolicy] = "luby", target_phase: Optional[str] = None,
+                 reduce_interval=2000, reduce_increment=300, glue_lbd=2, learned_memory_limit: Optional[int] = None,
+                 preprocess: Union[bool, Preprocessor] = False, profile=False, proof: Optional[DRATWriter] = None):
+        """
+        Initializes the solver.
+        :param clauses: a list of clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...] or a clause arena,
+        which is used by the solver directly
+        :param timeout: (optional) timeout in seconds of every call of solve, after which it returns None
+        :param verify: (optional) cross-check every status against a full evaluation of the formula
+        :param heuristic: (optional) the branching heuristic, by name or as an instance
+        :param phase_saving: (optional) reuse the last value of a variable when it is chosen as decision
+        :param default_phase: (optional) the value of decision variables without saved phase
+        :param restart_policy: (optional) the restart policy, by name or as an instance
+        :param target_phase: (optional) "target" prefers the values of the largest assignment reached since the last
+        restart, "best" the values of the largest assignment reached at all. None uses the saved phases only
+        :param reduce_interval: (optional) the number of conflicts before the first reduction of the learned clauses
+        :param reduce_increment: (optional) the number of conflicts by which the interval grows after each reduction
+        :param glue_lbd: (optional) learned clauses with at most this LBD are never deleted
+        :param learned_memory_limit: (optional) the size in bytes of the learned clauses above which they are
+        reduced regardless of the interval
+        :param preprocess: (optional) simplify the clauses before solving, True for a preprocessor with all techniques
+        or a configured preprocessor
+        :param profile: (optional) measure the time spent in propagation, conflict analysis and decisions in stats
+        :param proof: (optional) a writer that receives the learned and deleted clauses as DRAT proof. If solve returns
+        False without assumptions, the proof ends with the empty clause
+        """
+        if target_phase not in (None, "target", "best"):
+            raise ValueError("target_phase has to be None, 'target' or 'best'")
+
+        super().__init__(clauses, timeout=timeout, verify=verify, heuristic=heuristic, phase_saving=phase_saving,
+                         default_phase=default_phase, preprocess=preprocess, profile=profile,
+                         proof=proof)
+        if profile:
+            profile_method(self, "analyze", self.stats, "analysis_time")
+
+        # marks the variables visited by conflict analysis. It is cleared after every analysis
+        self.__seen = bytearray(self.num_variables + 1)
+
+        # learned clauses are kept apart from the clauses of the formula, since they are only implied by it
+        self.learned_clauses = []
+
+        # the learned clauses are halved periodically. Clauses that took part in recent conflict analyses gain
+        # activity with an increment that grows with every conflict
+        self.reduce_increment = reduce_increment
+        self.next_reduction = reduce_interval
+        self.reduce_interval = reduce_interval
+        self.glue_lbd = glue_lbd
+        self.learned_memory_limit = learned_memory_limit
+        self.clause_increment = 1.0
+        self.clause_decay = 0.999
+
+        self.restart_policy = make_restart_policy(restart_policy)
+
+        # the values of the largest assignment that was reached before a conflict and its size
+        self.target_phase = target_phase
+        self.target_phases = [0] * (self.num_variables + 1)
+        self.target_size = 0
+
+    @property
+    def num_restarts(self) -> int:
+        return self.stats.restarts
+
+    def _resize(self, num_variables: int):
+        added = num_variables - self.num_variables
+        super()._resize(num_variables)
+        self.__seen.extend(bytes(added))
+        self.target_phases.extend([0] * added)
+
+    def analyze(self, conflict: int) -> Tuple[List[int], int]:
+        """
+        Derives a learned clause from a conflict by resolving the conflicting clause with the reasons of the
+        literals assigned on the current decision level until only one of them is left (the first UIP).
+        :param conflict: The reference of the clause that is False under the current assignment
+        :return: The minimized learned clause with the asserting literal in the first position and the literal of
+        the highest remaining decision level in the second position, and the level to backjump to
+        """
+        seen = self.__seen
+        seen_variables = []
+        learned = [0]
+        levels = self.levels
+
+        # number of literals of the current decision level that still have to be resolved away
+        open_literals = 0
+        index = len(self.variable_stack) - 1
+        cref = conflict
+        variable = 0
+        while True:
+            if self.clauses.is_learned(cref):
+                self.__bump_clause(cref)
+
+            for literal in self.clauses[cref]:
+                clause_variable = abs(literal)
+                # the reason clause contains the implied literal itself, which is resolved away
+                if clause_variable == variable or seen[clause_variable]:
+                    continue
+                # literals assigned at level zero are False in every model and can be left out
+                if levels[clause_variable] == 0:
+                    continue
+
+                seen[clause_variable] = 1
+                seen_variables.append(clause_variable)
+                if levels[clause_variable] == self.decision_level:
+                    open_literals += 1
+                else:
+                    learned.append(literal)
+
+            # the next literal to resolve is the last assigned one of the current decision level that was seen
+            while not seen[self.variable_stack[index]]:
+                index -= 1
+            variable = self.variable_stack[index]
+            index -= 1
+
+            open_literals -= 1
+            if open_literals == 0:
+                break
+            cref = self.reasons[variable]
+
+        # the negation of the first UIP is the asserting literal of the learned clause
+        learned[0] = -variable if self.values[variable] > 0 else variable
+
+        # every variable that took part in the resolution is bumped by the branching heuristic
+        self.heuristic.conflict(seen_variables)
+        for seen_variable in seen_variables:
+            seen[seen_variable] = 0
+        learned = self.__minimize(learned)
+
+        if len(learned) == 1:
+            return learned, 0
+
+        # the literal with the highest decision level besides the asserting literal is watched as well, so that
+        # the watch invariant holds after backjumping to its level
+        max_index = max(range(1, len(learned)), key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[max_index] = learned[max_index], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def __minimize(self, learned: List[int]) -> List[int]:
+        """
+        Removes the literals from a learned clause that are implied by the other literals of the clause, i.e. whose
+        reasons only consist of literals that are in the clause or are themselves redundant.
+        :param learned: The learned clause with the asserting literal in the first position
+        :return: The minimized learned clause
+        """
+        in_clause = {abs(literal) for literal in learned}
+        clause_levels = {self.levels[variable] for variable in in_clause}
+        redundant = {}
+
+        minimized = [learned[0]]
+        for literal in learned[1:]:
+            if self.reasons[abs(literal)] is None or not self.__is_redundant(abs(literal), in_clause, clause_levels,
+                                                                             redundant):
+                minimized.append(literal)
+        return minimized
+
+    def __is_redundant(self, variable: int, in_clause: Set[int], clause_levels: Set[int],
+                       redundant: Dict[int, bool]) -> bool:
+        """
+        Checks by a depth first search over the implication graph whether a variable of a learned clause is implied
+        by the other variables of the clause.
+        :param variable: The implied variable to check
+        :param in_clause: The variables of the learned clause
+        :param clause_levels: The decision levels of the variables of the learned clause. Paths that reach a variable
+        from any other level can not end in the clause
+        :param redundant: Cache of the results for variables that were already checked
+        :return: True if the variable is redundant
+        """
+        stack = [variable]
+        visited = []
+        while stack:
+            current = stack.pop()
+            for literal in self.clauses[self.reasons[current]]:
+                reason_variable = abs(literal)
+                if reason_variable == current or reason_variable in in_clause or self.levels[reason_variable] == 0:
+                    continue
+                if redundant.get(reason_variable):
+                    continue
+                if self.reasons[reason_variable] is None or redundant.get(reason_variable) is False \
+                        or self.levels[reason_variable] not in clause_levels:
+                    for visited_variable in visited:
+                        redundant[visited_variable] = False
+                    redundant[variable] = False
+                    return False
+
+                visited.append(reason_variable)
+                stack.append(reason_variable)
+                # marks the variable as under examination so that it is not pushed again
+                redundant[reason_variable] = True
+
+        redundant[variable] = True
+        return True
+
+    def learn(self, literals: List[int], lbd: int = 0):
+        """
+        Adds a learned clause after backjumping and assigns its asserting literal.
+        :param literals: The learned clause with the asserting literal in the first position and the literal of the
+        highest remaining decision level in the second position
+        :param lbd: (optional) the literal block distance of the clause
+        """
+        cref = self.clauses.add(literals, learned=True, lbd=lbd)
+        self.stats.learned_clauses += 1
+        if self.proof is not None:
+            self.proof.add(literals)
+        if len(literals) == 1:
+            # learned units hold at decision level zero and are never undone
+            self.unit_clauses.append(cref)
+        else:
+            self._watch(literals[0], literals[1], cref, len(literals))
+            self.learned_clauses.append(cref)
+            self.__bump_clause(cref)
+
+            self.stats.learned_db_bytes += self.clauses.clause_bytes(cref)
+            self.stats.max_learned_db_bytes = max(self.stats.max_learned_db_bytes, self.stats.learned_db_bytes)
+
+        self._assign(literals[0], cref)
+
+    def __bump_clause(self, cref: int):
+        """
+        Increases the activity of a learned clause that took part in conflict analysis.
+        :param cref: The reference of the learned clause
+        """
+        activities = self.clauses.activities
+        activities[cref] += self.clause_increment
+        if activities[cref] > 1e20:
+            for learned_cref in self.learned_clauses:
+                activities[learned_cref] *= 1e-20
+            self.clause_increment *= 1e-20
+
+    def __is_locked(self, cref: int) -> bool:
+        """
+        Checks if a clause is the reason of a current assignment and can therefore not be deleted. The literal
+        implied by a clause is always its first literal.
+        :param cref: The reference of a clause with at least two literals
+        :return: True if the clause is the reason of a current assignment
+        """
+        variable = abs(self.clauses.literals[self.clauses.offsets[cref]])
+        return self.values[variable] != 0 and self.reasons[variable] == cref
+
+    def reduce_learned_clauses(self):
+        """
+        Deletes the worse half of the learned clauses. Glue clauses with an LBD of at most glue_lbd and clauses that
+        are reasons of current assignments are always kept. The others are ranked by their LBD and then by their
+        activity. The deleted clauses are removed from the arena and from all watch lists.
+        """
+        lbds, activities = self.clauses.lbds, self.clauses.activities
+        candidates = [cref for cref in self.learned_clauses
+                      if lbds[cref] > self.glue_lbd and not self.__is_locked(cref)]
+        candidates.sort(key=lambda cref: (-lbds[cref], activities[cref]))
+        deleted = candidates[:len(candidates) // 2]
+
+        if deleted:
+            for cref in deleted:
+                if self.proof is not None:
+                    self.proof.delete(self.clauses[cref])
+                self.stats.learned_db_bytes -= self.clauses.clause_bytes(cref)
+                self.clauses.delete(cref)
+            mapping = self._garbage_collect()
+            self.learned_clauses = [mapping[cref] for cref in self.learned_clauses if mapping[cref] >= 0]
+
+        self.stats.reductions += 1
+        self.stats.deleted_clauses += len(deleted)
+        self.stats.kept_clauses = len(self.learned_clauses)
+
+    def restart(self):
+        """
+        Restarts the search by undoing all decisions. Learned clauses, heuristic scores and saved phases are kept.
+        """
+        self.backtrack(0)
+        self.restart_policy.restarted()
+        self.stats.restarts += 1
+        if self.target_phase == "target":
+            self.target_size = 0
+
+    def _pick_phase(self, variable: int) -> bool:
+        """
+        Chooses the value of a decision variable.
+        :param variable: The decision variable
+        :return: The target phase of the variable if target phases are used and there is one; the saved or the
+        default phase else
+        """
+        if self.target_phase is not None and self.target_phases[variable] != 0:
+            return self.target_phases[variable] > 0
+        return super()._pick_phase(variable)
+
+    def __update_target_phases(self):
+        """
+        Stores the current assignment as target phases if it is larger than the last one stored.
+        """
+        if len(self.variable_stack) > self.target_size:
+            self.target_size = len(self.variable_stack)
+            self.target_phases = self.values[:self.num_variables + 1]
+
+    def solve(self, assumptions: Iterable[int] = ()) -> Optional[bool]:
+        """
+        Conflict driven clause learning with non-chronological backjumping. It can be called again, e.g. after adding
+        clauses or with other assumptions, and keeps the learned clauses, the scores of the heuristic and the saved
+        phases of the previous calls.
+        :param assumptions: (optional) literals that are assumed to be True for this call only. If the formula is
+        unsatisfiable under them, get_core returns the assumptions that caused it
+        :return: True if a model was found, False if there is none; None if the budget was used up or the solver was
+        interrupted before. The next call with the same assumptions resumes the search with the current assignment
+        """
+        assumptions = self._start(assumptions)
+
+        while True:
+            if self._out_of_budget():
+                return self._suspend()
+
+            conflict = self.propagate()
+
+            # a conflict without any decision can not be resolved, otherwise we learn a clause that rules out the
+            # conflict and backjump to the level where it becomes unit
+            if conflict is not None:
+                self.stats.conflicts += 1
+                if self.stats.conflicts >= self.progress_hooks.next_call:
+                    self.progress_hooks.call(self, self.stats.conflicts)
+                if self.decision_level == 0:
+                    if self.proof is not None:
+                        self.proof.add([])
+                    return False
+
+                if self.target_phase is not None:
+                    self.__update_target_phases()
+
+                learned, backjump_level = self.analyze(conflict)
+                lbd = len({self.levels[abs(literal)] for literal in learned})
+                self.backtrack(backjump_level)
+                self.learn(learned, lbd)
+                self.clause_increment /= self.clause_decay
+
+                # a reduction forced by the memory limit needs new learned clauses since the last one to make sense
+                if self.stats.conflicts >= self.next_reduction or (
+                        self.learned_memory_limit is not None
+                        and self.stats.learned_db_bytes > self.learned_memory_limit
+                        and len(self.learned_clauses) > self.stats.kept_clauses):
+                    self.reduce_learned_clauses()
+                    self.reduce_interval += self.reduce_increment
+                    self.next_reduction = self.stats.conflicts + self.reduce_interval
+
+                self.restart_policy.conflict(lbd)
+                if self.restart_policy.should_restart():
+                    self.restart()
+
+            # the assumptions are the first decisions. Learned clauses only follow from the formula, so backjumping
+            # below them is fine, they are decided again
+            elif self.decision_level < len(assumptions):
+                if not self._assume(assumptions):
+                    return False
+
+            # if we found a model we return it
+            elif self.is_sat() == Status.SATISFIED:
+                return True
+
+            else:
+                variable = self._pick_branch_variable()
+                if variable is None:
+                    # No variables left unassigned, should not happen normally here
+                    raise ValueError("No unassigned variables found")
+                self.add_decision(variable, self._pick_phase(variable))
@@ -0,0 +1,254 @@
+import random
+import pytest
+from second_part.cdcl_solver import CDCLSolver
+from second_part.solver import DLPPSolver
+
+
+def pigeonhole(pigeons, holes):
+    clauses = [[i * holes + j + 1 for j in range(holes)] for i in range(pigeons)]
+    for j in range(holes):
+        for a in range(pigeons):
+            for b in range(a + 1, pigeons):
+                clauses.append([-(a * holes + j + 1), -(b * holes + j + 1)])
+    return clauses
+
+def is_model(clauses, model):
+    return all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+
+def test_solve_satisfiable():
+    clauses = [[1, 2, -3], [-1, 3], [-2, 3], [-3, 4], [-4, -1, 5], [-5, -2]]
+    solver = CDCLSolver(clauses, verify=True)
+    assert solver.solve() is True
+    assert is_model(clauses, solver.get_model())
+
+def test_solve_unsatisfiable():
+    solver = CDCLSolver(pigeonhole(4, 3))
+    assert solver.solve() is False
+    assert solver.get_model() == {}
+    assert solver.num_conflicts > 0
+
+def test_solve_with_conflicting_units():
+    solver = CDCLSolver([[1, 2], [3], [-3]])
+    assert solver.solve() is False
+    assert solver.num_conflicts == 1
+
+def test_analyze_finds_first_uip():
+    # deciding 1 and then 2 implies 3 and 4 via 2, which conflict with each other together with 1
+    solver = CDCLSolver([[-2, 3], [-3, 4], [-1, -4, 5], [-1, -4, -5], [6, 7]])
+    solver.add_decision(1, True)
+    assert solver.propagate() is None
+    solver.add_decision(2, True)
+    conflict = solver.propagate()
+    assert conflict is not None
+
+    learned, backjump_level = solver.analyze(conflict)
+    # 4 is the first UIP: every path from the decision 2 to the conflict goes through it
+    assert learned[0] == -4
+    assert sorted(learned) == [-4, -1]
+    assert backjump_level == 1
+
+def test_analyze_minimizes_learned_clause():
+    # 3 is implied by 1 alone, so it is redundant next to 1 in the learned clause
+    solver = CDCLSolver([[-1, 3], [-2, 4], [-3, -4, 5], [-1, -4, -5], [6, 7]])
+    solver.add_decision(1, True)
+    assert solver.propagate() is None
+    solver.add_decision(2, True)
+    conflict = solver.propagate()
+
+    learned, backjump_level = solver.analyze(conflict)
+    assert learned[0] == -4
+    assert sorted(learned) == [-4, -1]
+    assert backjump_level == 1
+
+def test_backjump_skips_unrelated_decisions():
+    solver = CDCLSolver([[-1, 2], [-1, -2, -5, 6], [-5, -6, -2], [3, 4], [7, 8]])
+    solver.add_decision(1, True)
+    solver.propagate()
+    solver.add_decision(3, True)
+    solver.propagate()
+    solver.add_decision(7, True)
+    solver.propagate()
+    solver.add_decision(5, True)
+    conflict = solver.propagate()
+
+    learned, backjump_level = solver.analyze(conflict)
+    assert learned[0] == -5
+    assert backjump_level == 1
+
+    solver.backtrack(backjump_level)
+    solver.learn(learned)
+    assert solver.decision_level == 1
+    assert solver.assignment[5] is False
+    assert solver.clauses[solver.reasons[5]] == learned
+
+def test_reduce_learned_clauses_deletes_worse_half():
+    solver = CDCLSolver([[1, 2, 3, 4, 5, 6], [7, 8]])
+    solver.add_decision(1, False)
+    solver.learn([3, -7, -8, -6], lbd=2)
+    solver.learn([-4, 5, 6, 7], lbd=5)
+    solver.learn([-5, 6, 7, 8], lbd=4)
+    solver.learn([-6, 4, 5, 8], lbd=6)
+    solver.learn([-2, 4, 5, 8], lbd=6)
+    worst, bad = solver.learned_clauses[3:]
+    solver.clauses.activities[bad] = solver.clauses.activities[worst] + 1
+    solver.backtrack(0)
+
+    solver.reduce_learned_clauses()
+    # the glue clause is protected, of the other four the two with the highest LBD are deleted
+    assert [solver.clauses[cref] for cref in solver.learned_clauses] == [[3, -7, -8, -6], [-4, 5, 6, 7],
+                                                                          [-5, 6, 7, 8]]
+    # the deleted clauses are garbage collected and no longer watched
+    assert len(solver.clauses) == 5
+    assert all(cref < 5 for watching_clauses in solver.watches for cref in watching_clauses)
+    # the binary clause [7, 8] is kept in the implication lists instead of the watch lists
+    assert sum(len(watching_clauses) for watching_clauses in solver.watches) == 8
+    assert sum(len(implications) for implications in solver.binary_implications) == 2
+    assert solver.stats.reductions == 1
+    assert solver.stats.deleted_clauses == 2
+    assert solver.stats.kept_clauses == 3
+    assert solver.stats.learned_db_bytes < solver.stats.max_learned_db_bytes
+
+def test_reduce_learned_clauses_keeps_locked_clauses():
+    solver = CDCLSolver([[1, 2, 3, 4, 5, 6, 7]])
+    solver.add_decision(1, False)
+    solver.learn([2, 3, 4, 5], lbd=4)
+    solver.learn([6, 3, 4, 5], lbd=4)
+    solver.learn([7, 3, 4, 5], lbd=4)
+    reason = solver.learned_clauses[0]
+    solver.clauses.activities[reason] = 0.0
+    solver.backtrack(0)
+    for variable, value in [(6, True), (7, True), (3, False), (4, False), (5, False)]:
+        solver.add_decision(variable, value)
+    solver.propagate()
+    assert solver.reasons[2] == reason
+
+    # the reason has the lowest activity but can not be deleted
+    solver.reduce_learned_clauses()
+    assert [solver.clauses[cref] for cref in solver.learned_clauses] == [[2, 3, 4, 5], [7, 3, 4, 5]]
+    assert solver.clauses[solver.reasons[2]] == [2, 3, 4, 5]
+
+def test_reduce_learned_binary_clauses():
+    solver = CDCLSolver([[1, 2, 3, 4], [5, 6, 7]], glue_lbd=0)
+    solver.add_decision(1, False)
+    solver.learn([5, 6, 7, 4], lbd=3)
+    solver.learn([2, -1], lbd=2)
+    solver.backtrack(0)
+    assert [implied for implied, _ in solver.binary_implications[-1]] == [2]
+
+    # the long clause is deleted and the reference of the binary clause changes with the garbage collection
+    solver.reduce_learned_clauses()
+    assert [solver.clauses[cref] for cref in solver.learned_clauses] == [[2, -1]]
+    assert solver.binary_implications[-1] == [(2, solver.learned_clauses[0])]
+
+    solver.add_decision(1, False)
+    solver.learn([-5, -6, -7], lbd=2)
+    solver.learn([3, -1], lbd=4)
+    solver.backtrack(0)
+    solver.reduce_learned_clauses()
+    assert [solver.clauses[cref] for cref in solver.learned_clauses] == [[2, -1], [-5, -6, -7]]
+    assert [implied for implied, _ in solver.binary_implications[-1]] == [2]
+    assert solver.binary_implications[3] == []
+
+def test_solve_with_frequent_reductions():
+    solver = CDCLSolver(pigeonhole(6, 5), reduce_interval=10, reduce_increment=0)
+    assert solver.solve() is False
+    assert solver.stats.reductions > 0
+    assert solver.stats.deleted_clauses > 0
+
+def test_solve_with_learned_memory_limit():
+    solver = CDCLSolver(pigeonhole(6, 5), learned_memory_limit=5000)
+    assert solver.solve() is False
+    assert solver.stats.reductions > 0
+
+def brute_force(clauses, num_variables):
+    return any(all(any((literal > 0) == bool(bits >> (abs(literal) - 1) & 1) for literal in clause)
+                   for clause in clauses) for bits in range(1 << num_variables))
+
+def test_incremental_solving():
+    solver = CDCLSolver([[1, 2], [-1, 3]])
+    assert solver.solve() is True
+    solver.add_clause([-3])
+    assert solver.solve() is True
+    assert solver.get_model() == {1: False, 2: True, 3: False}
+
+    # the new variable 4 is added to the solver
+    solver.add_clause([-2, 4])
+    assert solver.solve(assumptions=[-4]) is False
+    assert solver.get_core() == [-4]
+    assert solver.solve() is True
+    assert solver.get_model()[4] is True
+    solver.add_clause([-4])
+    assert solver.solve() is False
+    assert solver.get_core() == []
+
+def test_assumptions_keep_learned_clauses():
+    clauses = pigeonhole(6, 5)
+    # the selector 31 switches the pigeonhole constraints of the first pigeon off
+    clauses[0] = clauses[0] + [31]
+    solver = CDCLSolver(clauses)
+    assert solver.solve(assumptions=[-31]) is False
+    assert solver.get_core() == [-31]
+    learned_clauses = solver.stats.learned_clauses
+    assert learned_clauses > 0
+
+    assert solver.solve(assumptions=[31]) is True
+    assert solver.get_model()[31] is True
+    # the clauses learned under the first assumption still hold, so the second refutation is cheaper
+    conflicts = solver.num_conflicts
+    assert solver.solve(assumptions=[-31]) is False
+    assert solver.num_conflicts - conflicts < learned_clauses
+
+def test_core_contains_only_failed_assumptions():
+    solver = CDCLSolver([[-1, -2], [3, 4], [5, 6]])
+    assert solver.solve(assumptions=[3, 1, 5, 2, 6]) is False
+    assert solver.get_core() == [1, 2]
+    assert solver.solve(assumptions=[3, 1, -1]) is False
+    assert solver.get_core() == [1, -1]
+    assert solver.solve(assumptions=[3, 3, 1]) is True
+
+def test_invalid_assumptions():
+    solver = CDCLSolver([[1, 2]])
+    with pytest.raises(ValueError):
+        solver.solve(assumptions=[0])
+    solver = CDCLSolver([[1, 2]], preprocess=True)
+    with pytest.raises(ValueError):
+        solver.solve(assumptions=[1])
+    with pytest.raises(ValueError):
+        solver.add_clause([1])
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_incremental_solving_matches_fresh_solvers(solver_class):
+    rng = random.Random(16)
+    for _ in range(30):
+        num_variables = 8
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(3)] for _ in range(12)]
+        solver = solver_class(clauses, verify=True)
+        for _ in range(8):
+            if rng.random() < 0.5:
+                clause = [rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(rng.randint(1, 3))]
+                solver.add_clause(clause)
+                clauses.append(clause)
+            assumptions = [rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(rng.randint(0, 4))]
+
+            satisfiable = solver.solve(assumptions)
+            assert satisfiable == brute_force(clauses + [[literal] for literal in assumptions], num_variables)
+            if satisfiable:
+                model = solver.get_model()
+                assert is_model(clauses + [[literal] for literal in assumptions], model)
+            else:
+                core = solver.get_core()
+                assert set(core) <= set(assumptions)
+                assert not brute_force(clauses + [[literal] for literal in core], num_variables)
+
+def test_iter_models_after_learning():
+    rng = random.Random(8)
+    clauses = [[rng.choice([-1, 1]) * rng.randint(1, 10) for _ in range(3)] for _ in range(30)]
+    solver = CDCLSolver(clauses)
+    assert solver.solve() is True
+    models = [tuple(sorted(model.items())) for model in solver.iter_models()]
+    assert len(models) == len(set(models))
+    assert all(is_model(clauses, dict(model)) for model in models)
+    variables = sorted(solver.variables)
+    assert len(models) == sum(all(any((literal > 0) == bool(bits >> variables.index(abs(literal)) & 1)
+                                      for literal in clause) for clause in clauses)
+                              for bits in range(1 << len(variables)))
@@ -0,0 +1,182 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional and only speeds up from_dimacs
+    np = None
+
+
+# flags of the clauses in the arena
+LEARNED = 1
+DELETED = 2
+
+# the bytes each clause needs in the header arrays: offset, size, flags, lbd and activity
+HEADER_BYTES = 8 + 4 + 1 + 4 + 8
+
+
+class ClauseArena:
+    """
+    Stores all clauses of a solver in one contiguous array of literals. A clause is referenced by its index in the
+    header arrays, which hold the offset of its literals in the arena, its size, its flags and, for learned clauses,
+    its literal block distance and activity.
+    """
+    __slots__ = ("literals", "offsets", "sizes", "flags", "lbds", "activities", "num_deleted",
+                 "num_deleted_literals")
+
+    def __init__(self, clauses: Optional[Iterable[Iterable[int]]] = None):
+        """
+        Initializes the arena.
+        :param clauses: (optional) clauses to add, e.g. [[-1, 3], [2, 4, -5], ...]
+        """
+        self.literals = array("i")
+        self.offsets = array("q")
+        self.sizes = array("i")
+        self.flags = array("b")
+        self.lbds = array("i")
+        self.activities = array("d")
+
+        self.num_deleted = 0
+        self.num_deleted_literals = 0
+
+        if clauses is not None:
+            for clause in clauses:
+                self.add(clause)
+
+    @classmethod
+    def from_dimacs(cls, literals: array) -> "ClauseArena":
+        """
+        Creates an arena from the literals of a DIMACS file, in which every clause is terminated by a 0. The array is
+        used as the literal buffer of the arena without copying it, the terminators stay between the clauses.
+        :param literals: An array('i') of literals, e.g. array('i', [-1, 3, 0, 2, 4, -5, 0])
+        :return: The new arena
+        """
+        if len(literals) > 0 and literals[-1] != 0:
+            raise ValueError("the last clause is not terminated by a 0")
+
+        arena = cls()
+        arena.literals = literals
+        if np is not None:
+            terminators = np.flatnonzero(np.frombuffer(literals, dtype=np.int32) == 0)
+            starts = np.zeros(len(terminators), dtype=np.int64)
+            starts[1:] = terminators[:-1] + 1
+            arena.offsets.frombytes(starts.tobytes())
+            arena.sizes.frombytes((terminators - starts).astype(np.int32).tobytes())
+        else:
+            offsets, sizes = arena.offsets, arena.sizes
+            # the search for the terminators happens in C, only the loop over the clauses runs in Python
+            find = literals.index
+            offset = 0
+            end = len(literals)
+            while offset < end:
+                terminator = find(0, offset)
+                offsets.append(offset)
+                sizes.append(terminator - offset)
+                offset = terminator + 1
+
+        num_clauses = len(arena.sizes)
+        arena.flags = array("b", bytes(num_clauses))
+        arena.lbds = array("i", bytes(num_clauses * arena.lbds.itemsize))
+        arena.activities = array("d", bytes(num_clauses * arena.activities.itemsize))
+        return arena
+
+    def __len__(self) -> int:
+        """
+        :return: The number of clause references including deleted clauses that were not garbage collected yet
+        """
+        return len(self.sizes)
+
+    def __getitem__(self, cref: int) -> List[int]:
+        """
+        :param cref: A clause reference
+        :return: A copy of the literals of the clause
+        """
+        offset = self.offsets[cref]
+        return self.literals[offset:offset + self.sizes[cref]].tolist()
+
+    def add(self, literals: Iterable[int], learned=False, lbd=0) -> int:
+        """
+        Appends a clause to the arena.
+        :param literals: The literals of the clause
+        :param learned: (optional) whether the clause was learned
+        :param lbd: (optional) the literal block distance of a learned clause
+        :return: The reference of the new clause
+        """
+        offset = len(self.literals)
+        self.literals.extend(literals)
+
+        self.offsets.append(offset)
+        self.sizes.append(len(self.literals) - offset)
+        self.flags.append(LEARNED if learned else 0)
+        self.lbds.append(lbd)
+        self.activities.append(0.0)
+        return len(self.sizes) - 1
+
+    def is_learned(self, cref: int) -> bool:
+        return self.flags[cref] & LEARNED != 0
+
+    def is_deleted(self, cref: int) -> bool:
+        return self.flags[cref] & DELETED != 0
+
+    def delete(self, cref: int):
+        """
+        Marks a clause as deleted. Its memory is only freed by the next garbage collection.
+        :param cref: The reference of the clause to delete
+        """
+        if self.flags[cref] & DELETED:
+            return
+        self.flags[cref] |= DELETED
+        self.num_deleted += 1
+        self.num_deleted_literals += self.sizes[cref]
+
+    def crefs(self, learned: Optional[bool] = None) -> Iterator[int]:
+        """
+        Iterates over the references of the clauses that are not deleted.
+        :param learned: (optional) only the learned clauses if True, only the original clauses if False
+        """
+        for cref, flags in enumerate(self.flags):
+            if flags & DELETED:
+                continue
+            if learned is None or bool(flags & LEARNED) == learned:
+                yield cref
+
+    def garbage_collect(self) -> List[int]:
+        """
+        Removes the deleted clauses from the arena and moves the remaining clauses to the front. The references of
+        the clauses change, so every structure holding references has to be updated with the returned mapping.
+        :return: The new reference of every old reference; -1 for the deleted clauses
+        """
+        mapping = [-1] * len(self.sizes)
+        literals = array("i")
+        offsets, sizes, flags, lbds, activities = array("q"), array("i"), array("b"), array("i"), array("d")
+        for cref in range(len(self.sizes)):
+            if self.flags[cref] & DELETED:
+                continue
+            mapping[cref] = len(sizes)
+            offset = self.offsets[cref]
+            offsets.append(len(literals))
+            literals.extend(self.literals[offset:offset + self.sizes[cref]])
+            sizes.append(self.sizes[cref])
+            flags.append(self.flags[cref])
+            lbds.append(self.lbds[cref])
+            activities.append(self.activities[cref])
+
+        self.literals, self.offsets, self.sizes = literals, offsets, sizes
+        self.flags, self.lbds, self.activities = flags, lbds, activities
+        self.num_deleted = 0
+        self.num_deleted_literals = 0
+        return mapping
+
+    def clause_bytes(self, cref: int) -> int:
+        """
+        :param cref: A clause reference
+        :return: The memory used by the clause in bytes
+        """
+        return self.sizes[cref] * self.literals.itemsize + HEADER_BYTES
+
+    def nbytes(self) -> int:
+        """
+        :return: The memory used by the buffers of the arena in bytes
+        """
+        return sum(buffer.buffer_info()[1] * buffer.itemsize
+                   for buffer in (self.literals, self.offsets, self.sizes, self.flags, self.lbds, self.activities))
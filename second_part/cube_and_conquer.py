@@ -0,0 +1,289 @@
+import multiprocessing
+import queue
+import time
+from array import array
+from collections import Counter
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .clause_arena import ClauseArena
+from .portfolio import SOLVERS, _read_shared_literals, flatten
+from .solver import DLPPSolver
+
+
+class CubeTime(NamedTuple):
+    cube: List[int]
+    # the index of the worker that solved the cube
+    worker: int
+    satisfiable: bool
+    seconds: float
+
+
+class CubeResult(NamedTuple):
+    # True if a cube was satisfiable, False if all cubes were refuted; None if it did not finish in time
+    satisfiable: Optional[bool]
+    model: Dict[int, bool]
+    # the cubes solved by the workers in the order in which they finished
+    cubes: List[CubeTime]
+    # the number of cubes that were sent to the workers and of the branches that the cuber refuted itself
+    num_cubes: int
+    num_refuted: int
+    seconds: float
+
+    def worker_times(self) -> Dict[int, float]:
+        """
+        :return: The seconds every worker spent solving cubes. Large differences show a bad load balance
+        """
+        times = {}
+        for cube_time in self.cubes:
+            times[cube_time.worker] = times.get(cube_time.worker, 0.0) + cube_time.seconds
+        return times
+
+
+class Cuber:
+    """
+    Splits a formula into cubes, i.e. partial assignments that together cover all assignments that are not refuted
+    by propagation. The splitting variable of every node is chosen by lookahead: both values of the candidate
+    variables are propagated and the variable whose values force the most assignments is chosen. Literals whose
+    propagation fails are negated and added to the cube of the node.
+    """
+    def __init__(self, clauses: Union[List[list[int]], ClauseArena], depth: Optional[int] = 8,
+                 cutoff: Optional[float] = None, candidates=20):
+        """
+        Initializes the cuber.
+        :param clauses: a list of clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...] or a clause arena,
+        which is modified by the cuber
+        :param depth: (optional) the number of splits after which a node becomes a cube. None for no limit
+        :param cutoff: (optional) the fraction of assigned variables at which a node becomes a cube. None for no limit
+        :param candidates: (optional) the number of variables that are looked ahead in every node. The variables
+        with the most occurrences in the formula are preferred
+        """
+        if depth is None and cutoff is None:
+            raise ValueError("either depth or cutoff has to be given")
+        if depth is not None and depth < 0:
+            raise ValueError("depth can not be negative")
+        if cutoff is not None and not 0 < cutoff <= 1:
+            raise ValueError("cutoff has to be in (0, 1]")
+        if candidates < 1:
+            raise ValueError("candidates has to be at least 1")
+
+        # the solver is only used for its decisions, propagation and backtracking
+        self.solver = DLPPSolver(clauses)
+        self.depth = depth
+        self.cutoff = cutoff
+        self.candidates = candidates
+
+        occurrences = Counter(abs(literal) for literal in self.solver.clauses.literals)
+        occurrences.pop(0, None)
+        self.__ranking = sorted(self.solver.variables, key=lambda variable: -occurrences[variable])
+
+        # the number of branches that were refuted by propagation instead of becoming cubes
+        self.num_refuted = 0
+
+    def cubes(self) -> Iterator[List[int]]:
+        """
+        Generates the cubes depth first, so that they can be solved while the next ones are split.
+        :return: An iterator over the cubes as lists of literals
+        """
+        if self.solver.propagate() is not None:
+            self.num_refuted += 1
+            return
+        yield from self.__split([], 0)
+
+    def __split(self, cube: List[int], depth: int) -> Iterator[List[int]]:
+        """
+        Splits the node of a cube, whose literals are decided and propagated in the solver.
+        :param cube: The literals of the node
+        :param depth: The number of splits that led to the node
+        """
+        solver = self.solver
+        scores = self.__lookahead(cube)
+        if scores is None:
+            self.num_refuted += 1
+            return
+        # a node without candidates has all variables assigned without conflict, its cube is a model
+        if not scores or (self.depth is not None and depth >= self.depth) or \
+                (self.cutoff is not None and len(solver.variable_stack) >= self.cutoff * len(solver.variables)):
+            yield cube
+            return
+
+        variable = max(scores, key=scores.get)
+        level = solver.decision_level
+        for literal in (variable, -variable):
+            solver.add_decision(variable, literal > 0)
+            if solver.propagate() is None:
+                yield from self.__split(cube + [literal], depth + 1)
+            else:
+                self.num_refuted += 1
+            solver.backtrack(level)
+
+    def __look(self, literal: int) -> Tuple[bool, int]:
+        """
+        Propagates a literal and undoes it again.
+        :param literal: An unassigned literal
+        :return: Whether the propagation found a conflict and the number of assignments it made
+        """
+        solver = self.solver
+        level = solver.decision_level
+        before = len(solver.variable_stack)
+        solver.add_decision(abs(literal), literal > 0)
+        conflict = solver.propagate()
+        assigned = len(solver.variable_stack) - before
+        solver.backtrack(level)
+        return conflict is not None, assigned
+
+    def __lookahead(self, cube: List[int]) -> Optional[Dict[int, int]]:
+        """
+        Looks ahead on the candidates of a node. The negations of failed literals are added to the node until no
+        candidate fails anymore.
+        :param cube: The literals of the node, to which the negated failed literals are appended
+        :return: The score of every candidate; None if the node is refuted
+        """
+        solver = self.solver
+        while True:
+            values = solver.values
+            candidates = islice((variable for variable in self.__ranking if values[variable] == 0), self.candidates)
+            scores = {}
+            failed = None
+            for variable in candidates:
+                positive_failed, positive = self.__look(variable)
+                negative_failed, negative = (False, 0) if positive_failed else self.__look(-variable)
+                if positive_failed or negative_failed:
+                    failed = variable if positive_failed else -variable
+                    break
+                # the product of the assignments of both branches prefers variables that shrink both of them
+                scores[variable] = positive * negative + positive + negative
+
+            if failed is None:
+                return scores
+
+            # every model of the node makes the failed literal False
+            solver.add_decision(abs(failed), failed < 0)
+            cube.append(-failed)
+            if solver.propagate() is not None:
+                return None
+
+
+def _cube_worker(index: int, solver_name: str, memory_name: str, num_literals: int, tasks: multiprocessing.Queue,
+                 results: multiprocessing.Queue):
+    """
+    Solves cubes in a worker process until it receives None. For every cube (cube index, worker index, satisfiable,
+    model, refuted formula, seconds) is put into the results. The solver is created once and the cubes are solved
+    as its assumptions, so that it keeps what it learned from the previous cubes.
+    """
+    literals = _read_shared_literals(memory_name, num_literals)
+    solver = SOLVERS[solver_name](ClauseArena.from_dimacs(literals))
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        cube_index, cube = task
+        start = time.perf_counter()
+        satisfiable = solver.solve(cube)
+        seconds = time.perf_counter() - start
+        # a refutation that does not depend on the cube refutes the whole formula
+        refuted_formula = satisfiable is False and not solver.get_core()
+        results.put((cube_index, index, satisfiable, solver.get_model(), refuted_formula, seconds))
+
+
+def solve_cubes(clauses: Union[Iterable[Iterable[int]], array], num_workers: Optional[int] = None,
+                depth: Optional[int] = 8, cutoff: Optional[float] = None, solver="dpll", timeout=float("inf"),
+                cubes: Optional[Iterable[List[int]]] = None) -> CubeResult:
+    """
+    Solves a formula by cube and conquer. A lookahead cuber splits the formula into cubes in the main process,
+    which are sent to worker processes while the next ones are split. The first satisfiable cube terminates all
+    workers.
+    :param clauses: The clauses of the form [[literal, ...], ...] or an array('i') of literals in which every clause is
+    terminated by a 0, e.g. DIMACSReader.literals
+    :param num_workers: (optional) the number of worker processes, by default the number of CPUs
+    :param depth: (optional) the depth of the cuber, see Cuber
+    :param cutoff: (optional) the cutoff of the cuber, see Cuber
+    :param solver: (optional) the name of the solver of the workers in SOLVERS
+    :param timeout: (optional) timeout in seconds for the whole run
+    :param cubes: (optional) cubes to solve instead of those of the cuber
+    :return: The result with the times of the solved cubes
+    """
+    start = time.perf_counter()
+    num_workers = num_workers or multiprocessing.cpu_count()
+    if num_workers < 1:
+        raise ValueError("at least one worker is needed")
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver}, choose one of {', '.join(SOLVERS)}")
+
+    literals = clauses if isinstance(clauses, array) else flatten(clauses)
+    if len(literals) > 0 and literals[-1] != 0:
+        raise ValueError("the last clause is not terminated by a 0")
+    cuber = None
+    if cubes is None:
+        cuber = Cuber(ClauseArena.from_dimacs(array("i", literals)), depth=depth, cutoff=cutoff)
+        cubes = cuber.cubes()
+    cubes = iter(cubes)
+
+    # shared memory can not be empty
+    memory = shared_memory.SharedMemory(create=True, size=max(1, len(literals) * literals.itemsize))
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    workers = []
+    sent = []
+    solved = []
+
+    def finish(satisfiable: Optional[bool], model: Dict[int, bool]) -> CubeResult:
+        return CubeResult(satisfiable, model, solved, len(sent), cuber.num_refuted if cuber is not None else 0,
+                          time.perf_counter() - start)
+
+    try:
+        memory.buf[:len(literals) * literals.itemsize] = literals.tobytes()
+        for index in range(num_workers):
+            worker = multiprocessing.Process(
+                target=_cube_worker, args=(index, solver, memory.name, len(literals), tasks, results), daemon=True)
+            worker.start()
+            workers.append(worker)
+
+        deadline = start + timeout
+        exhausted = False
+        while True:
+            # a few cubes per worker are kept in the queue, the others are only split when they are needed
+            while not exhausted and len(sent) - len(solved) < 2 * num_workers:
+                if time.perf_counter() >= deadline:
+                    break
+                cube = next(cubes, None)
+                if cube is None:
+                    exhausted = True
+                    for _ in workers:
+                        tasks.put(None)
+                else:
+                    tasks.put((len(sent), list(cube)))
+                    sent.append(list(cube))
+            if exhausted and len(solved) == len(sent):
+                return finish(False, {})
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return finish(None, {})
+            try:
+                cube_index, worker, satisfiable, model, refuted_formula, seconds = results.get(
+                    timeout=min(remaining, 0.1))
+            except queue.Empty:
+                # workers that crashed never report a result
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    return finish(None, {})
+                continue
+
+            solved.append(CubeTime(sent[cube_index], worker, satisfiable, seconds))
+            if satisfiable:
+                return finish(True, model)
+            if refuted_formula:
+                return finish(False, {})
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        # cubes that are left in the queue are dropped
+        tasks.cancel_join_thread()
+        tasks.close()
+        results.close()
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,69 @@
+import random
+import pytest
+from second_part.cube_and_conquer import Cuber, solve_cubes
+from second_part.cdcl_solver_test import pigeonhole, is_model
+
+
+def random_formula(rng, num_variables, num_clauses):
+    return [[rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(3)] for _ in range(num_clauses)]
+
+def models(clauses, num_variables):
+    for bits in range(1 << num_variables):
+        model = {variable: bool(bits >> (variable - 1) & 1) for variable in range(1, num_variables + 1)}
+        if is_model(clauses, model):
+            yield model
+
+def test_cubes_partition_the_models():
+    rng = random.Random(17)
+    for _ in range(20):
+        clauses = random_formula(rng, 10, 30)
+        cubes = list(Cuber(clauses, depth=3, candidates=5).cubes())
+        assert len(cubes) <= 2 ** 3
+        # every model lies in exactly one cube
+        for model in models(clauses, 10):
+            assert sum(all(model[abs(literal)] == (literal > 0) for literal in cube) for cube in cubes) == 1
+
+def test_cuber_depth_and_cutoff():
+    clauses = pigeonhole(5, 4)
+    assert len(list(Cuber(clauses, depth=0).cubes())) == 1
+    cubes = list(Cuber(random_formula(random.Random(5), 40, 120), depth=None, cutoff=0.5).cubes())
+    assert len(cubes) > 1
+    cuber = Cuber(pigeonhole(4, 3), depth=None, cutoff=1)
+    assert list(cuber.cubes()) == []
+    assert cuber.num_refuted > 0
+
+def test_cuber_invalid():
+    with pytest.raises(ValueError):
+        Cuber([[1]], depth=None, cutoff=None)
+    with pytest.raises(ValueError):
+        Cuber([[1]], cutoff=2)
+
+def test_solve_cubes():
+    rng = random.Random(3)
+    clauses = random_formula(rng, 30, 100)
+    result = solve_cubes(clauses, num_workers=2, depth=4)
+    assert result.satisfiable
+    assert is_model(clauses, result.model)
+    assert 1 <= len(result.cubes) <= result.num_cubes
+
+    result = solve_cubes(pigeonhole(6, 5), num_workers=3, depth=3, solver="cdcl")
+    assert result.satisfiable is False
+    assert len(result.cubes) == result.num_cubes > 1
+    assert set(result.worker_times()) <= {0, 1, 2}
+    assert sum(result.worker_times().values()) == pytest.approx(sum(cube.seconds for cube in result.cubes))
+
+def test_solve_cubes_with_given_cubes():
+    result = solve_cubes([[1, 2], [-1, 2], [1, -2]], num_workers=1, cubes=[[-1], [1, -2], [1, 2]])
+    assert result.satisfiable
+    assert result.model == {1: True, 2: True}
+    assert result.num_refuted == 0
+
+def test_solve_cubes_timeout():
+    result = solve_cubes(pigeonhole(10, 9), num_workers=2, depth=2, timeout=0.5)
+    assert result.satisfiable is None
+
+def test_solve_cubes_invalid():
+    with pytest.raises(ValueError):
+        solve_cubes([[1]], solver="magic")
+    with pytest.raises(ValueError):
+        solve_cubes([[1]], num_workers=-1)
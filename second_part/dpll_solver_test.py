@@ -1,5 +1,7 @@
+import itertools
+import random
 import pytest
-from second_part.solver import DLPPSolver, ImpossibleAssignmentError
+from second_part.solver import DLPPSolver, Status
 
 def test_init_with_valid_input():
     solver = DLPPSolver([[1,-2,3,-4,5], [-1], [-10,20,-30,40], [-40, 50]])
@@ -55,7 +57,7 @@ def test_add_assignment_with_already_assigned_variable():
 
 def test_add_assignment_after_bcp_with_forced_assignments():
     solver = DLPPSolver([[1,-2,3,-4,5], [-1], [-10,20,-30,40],[10], [20], [-40, 50]])
-    solver.bcp()
+    solver.propagate()
     solver.add_decision(40, True)
     assert solver.decision_level == 1
     assert solver.backtracking_stack == [0, 4]
@@ -100,42 +102,211 @@ def test_backtrack_from_3_decision_levels():
 
 def test_bcp_from_unit_clauses():
     solver = DLPPSolver([[1,-2,3,-4,5], [-1], [-10,20,-30,40], [10], [100], [-40, 50]])
-    forced_assignments = solver.bcp()
-    assert forced_assignments == {1: False, 10: True, 100: True}
+    conflict = solver.propagate()
+    assert conflict is None
+    assert solver.assignment == {1: False, 10: True, 100: True}
     assert solver.backtracking_stack == [0]
 
 def test_bcp_from_units_with_impossible_forced_assignments():
     solver = DLPPSolver([[1,-2,3,-4,5], [-1], [-10,20,-30,40], [10], [-10], [-40, 50]])
-    with pytest.raises(ImpossibleAssignmentError):
-        solver.bcp()
+    conflict = solver.propagate()
+    assert conflict is not None
+    assert solver.clauses[conflict] == [-10]
 
 def test_bcp_from_units_with_contradiction_to_previous_assignments():
     solver = DLPPSolver([[1,-2,3,-4,5], [-1], [-10,20,-30,40], [10], [-40, 50]])
     solver.add_decision(10, False)
-    with pytest.raises(ImpossibleAssignmentError):
-        solver.bcp()
+    conflict = solver.propagate()
+    assert conflict is not None
+    assert solver.clauses[conflict] == [10]
+
+def test_bcp_with_conflict_from_implications():
+    solver = DLPPSolver([[-1, 2], [-2, 3], [-3, -1], [4, 5]])
+    assert solver.propagate() is None
+    solver.add_decision(1, True)
+    conflict = solver.propagate()
+    assert conflict is not None
+    assert sorted(solver.clauses[conflict]) == [-2, 3]
+    assert solver.variable_stack == [1, 2, 3]
 
 def test_bcp_with_multiple_steps():
     solver = DLPPSolver([[1, -10, 100], [-1], [-10,20,-30,40], [10], [-40, 50]])
-    solver.bcp()
-    for var in [1,10]:
-        assert var in solver.variable_stack
+    solver.propagate()
+    assert solver.variable_stack == [1, 10, 100]
     assert solver.decision_level == 0
     assert solver.backtracking_stack == [0]
     solver.add_decision(20, True)
     assert solver.decision_level == 1
-    assert solver.backtracking_stack == [0, 3]
-    solver.bcp()
+    assert solver.backtracking_stack == [0, 4]
+    solver.propagate()
     for var in [1, 10, 20, 100]:
         assert var in solver.variable_stack
     assert solver.decision_level == 1
-    assert solver.backtracking_stack == [0, 3]
+    assert solver.backtracking_stack == [0, 4]
     solver.add_decision(40, True)
-    solver.bcp()
+    solver.propagate()
     for var in [1, 10, 20, 100, 50]:
         assert var in solver.variable_stack
     assert solver.decision_level == 2
-    assert solver.backtracking_stack == [0, 3, 5]
+    assert solver.backtracking_stack == [0, 4, 5]
+
+def test_backtrack_keeps_forced_assignments_of_lower_levels():
+    solver = DLPPSolver([[-1, 2], [-3, 4], [5, 6]])
+    solver.add_decision(1, True)
+    solver.propagate()
+    solver.add_decision(3, True)
+    solver.propagate()
+    assert solver.variable_stack == [1, 2, 3, 4]
+    solver.backtrack()
+    assert solver.assignment == {1: True, 2: True}
+    assert solver.variable_stack == [1, 2]
+    assert solver.propagation_head == 2
 
+def test_is_sat_follows_propagation():
+    solver = DLPPSolver([[-1, 2], [-2, 3], [-3, -1], [4, 5]], verify=True)
+    assert solver.is_sat() == Status.UNSATURATED
+    solver.propagate()
+    solver.add_decision(1, True)
+    assert solver.is_sat() == Status.UNSATURATED
+    solver.propagate()
+    assert solver.is_sat() == Status.CONTRADICTION
+    solver.backtrack()
+    assert solver.is_sat() == Status.UNSATURATED
+    solver.add_decision(1, False)
+    solver.add_decision(4, True)
+    solver.add_decision(2, False)
+    solver.add_decision(3, False)
+    solver.propagate()
+    assert solver.is_sat() == Status.UNSATURATED
+    solver.add_decision(5, True)
+    solver.propagate()
+    assert solver.is_sat() == Status.SATISFIED
+    assert solver.get_model() == {1: False, 2: False, 3: False, 4: True, 5: True}
+
+def test_is_sat_with_empty_clause():
+    solver = DLPPSolver([[1, 2], []], verify=True)
+    solver.propagate()
+    assert solver.is_sat() == Status.CONTRADICTION
+    assert solver.solve() is False
+
+def test_state_arrays_follow_assignments():
+    solver = DLPPSolver([[-1, 2], [-2, -3], [3, 4, 5]])
+    variable_stack = solver.variable_stack
+    solver.add_decision(1, True)
+    solver.propagate()
+    assert solver.values[1] == 1 and solver.values[-1] == -1
+    assert solver.values[3] == -1 and solver.values[-3] == 1
+    assert solver.levels[3] == 1
+    assert solver.clauses[solver.reasons[3]] == [-3, -2]
+    assert solver.reasons[1] is None
+    assert [solver.trail_positions[variable] for variable in [1, 2, 3]] == [0, 1, 2]
+
+    solver.backtrack()
+    # the variable stack is truncated in place
+    assert solver.variable_stack is variable_stack
+    assert solver.variable_stack == []
+    assert all(value == 0 for value in solver.values)
+
+def test_binary_clauses_are_propagated_by_implications():
+    solver = DLPPSolver([[-1, 2], [-3, 2], [-2, 4, 5]])
+    # binary clauses are not watched, every literal of them lists the other one
+    assert sum(len(watching_clauses) for watching_clauses in solver.watches) == 2
+    assert [implied for implied, _ in solver.binary_implications[-1]] == [2]
+    assert sorted(implied for implied, _ in solver.binary_implications[2]) == [-3, -1]
+
+    solver.add_decision(3, True)
+    assert solver.propagate() is None
+    assert solver.variable_stack == [3, 2]
+    # the implied literal is the first literal of its reason
+    assert solver.clauses[solver.reasons[2]] == [2, -3]
+
+    solver.add_clause([-2, -4])
+    assert [implied for implied, _ in solver.binary_implications[-4]] == [-2]
+    solver.add_decision(4, True)
+    solver.add_decision(1, True)
+    conflict = solver.propagate()
+    assert sorted(solver.clauses[conflict]) == [-1, 2]
+    assert solver.solve() is True
+
+def test_zero_literals_are_dropped():
+    solver = DLPPSolver([[1, -2, 0], [2, 0]])
+    assert solver.variables == {1, 2}
+    assert solver.solve() is True
+    assert solver.get_model() == {1: True, 2: True}
+
+def test_add_tautology_with_new_variable():
+    solver = DLPPSolver([[1, 2]])
+    solver.add_clause([5, -5])
+    assert solver.variables == {1, 2, 5}
+    assert solver.solve() is True
+    assert set(solver.get_model()) == {1, 2, 5}
+    # the same as a tautology in the formula of the constructor
+    assert set(DLPPSolver([[1, 2], [3, -3]]).variables) == {1, 2, 3}
+
+def all_models(clauses, variables):
+    models = []
+    for values in itertools.product([False, True], repeat=len(variables)):
+        model = dict(zip(variables, values))
+        if all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses):
+            models.append(model)
+    return models
+
+def test_iter_models():
+    clauses = [[1, 2], [-1, 3], [2, 3, 4]]
+    solver = DLPPSolver(clauses)
+    models = list(solver.iter_models())
+    assert sorted(map(sorted, map(dict.items, models))) == \
+        sorted(map(sorted, map(dict.items, all_models(clauses, [1, 2, 3, 4]))))
+    # the formula is not changed by the enumeration
+    assert solver.solve() is True
+
+def test_iter_models_with_projection():
+    # 1 <-> 2 with 3 and 4 free: every combination of 1 and 3 is a projected model, each of them once
+    solver = DLPPSolver([[-1, 2], [1, -2], [3, 4, -4]])
+    models = list(solver.iter_models(projection=[1, 3]))
+    assert len(models) == 4
+    assert {tuple(sorted(model.items())) for model in models} == \
+        {((1, a), (3, b)) for a, b in itertools.product([False, True], repeat=2)}
+
+def test_iter_models_with_projection_on_unknown_variable():
+    # 5 does not occur in the formula, so it is free and all 2^3 combinations of 1, 3 and 5 are projected models
+    solver = DLPPSolver([[-1, 2], [1, -2], [3, 4, -4]])
+    models = list(solver.iter_models(projection=[1, 3, 5]))
+    assert len(models) == 8
+    assert {tuple(sorted(model.items())) for model in models} == \
+        {((1, a), (3, b), (5, c)) for a, b, c in itertools.product([False, True], repeat=3)}
+
+def test_iter_models_random_formulas():
+    rng = random.Random(21)
+    for _ in range(50):
+        num_variables = rng.randint(2, 7)
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(rng.randint(1, 3))]
+                   for _ in range(rng.randint(1, 3 * num_variables))]
+        variables = sorted({abs(literal) for clause in clauses for literal in clause})
+        projection = rng.sample(variables, rng.randint(1, len(variables)))
+        assumptions = [rng.choice([-1, 1]) * rng.choice(variables)]
+
+        expected = {tuple(model[variable] for variable in projection)
+                    for model in all_models(clauses + [assumptions], variables)}
+        found = [tuple(model[variable] for variable in projection)
+                 for model in DLPPSolver(clauses).iter_models(projection=projection, assumptions=assumptions)]
+        assert len(found) == len(set(found))
+        assert set(found) == expected
+
+def test_iter_models_limit_and_cancellation():
+    # 3^8 models of independent clauses (a or b)
+    clauses = [[2 * i + 1, 2 * i + 2] for i in range(8)]
+    solver = DLPPSolver(clauses)
+    assert len(list(solver.iter_models(limit=100))) == 100
+
+    models = solver.iter_models()
+    first = next(models)
+    models.close()
+    assert len(first) == 16
+    assert len(list(solver.iter_models())) == 3 ** 8
+
+def test_iter_models_unsatisfiable():
+    assert list(DLPPSolver([[1], [-1, 2], [-2]]).iter_models()) == []
+    with pytest.raises(ValueError):
+        next(DLPPSolver([[1, 2]]).iter_models(limit=-1))
 
-        
\ No newline at end of file
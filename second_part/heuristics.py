@@ -0,0 +1,308 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Sequence, Union
+
+
+class VariableHeap:
+    """
+    A binary max-heap of variables ordered by a score list that is indexed by the variables. The position of every
+    variable in the heap is tracked, so that the score of a contained variable can be increased in O(log n).
+    """
+    def __init__(self, scores: List[float]):
+        """
+        Initializes an empty heap.
+        :param scores: The scores of the variables. It is shared with the heap and may be changed from outside, but
+        after increasing the score of a contained variable increase has to be called
+        """
+        self.scores = scores
+        self.heap = []
+        # the position of every variable in the heap; -1 if it is not contained
+        self.indices = [-1] * len(scores)
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, variable: int) -> bool:
+        return self.indices[variable] >= 0
+
+    def push(self, variable: int):
+        """
+        Inserts a variable into the heap if it is not contained yet.
+        :param variable: The variable to insert
+        """
+        if self.indices[variable] >= 0:
+            return
+        self.indices[variable] = len(self.heap)
+        self.heap.append(variable)
+        self.__sift_up(len(self.heap) - 1)
+
+    def pop(self) -> int:
+        """
+        Removes the variable with the highest score from the heap.
+        :return: The variable with the highest score
+        """
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        self.indices[top] = -1
+        if heap:
+            heap[0] = last
+            self.indices[last] = 0
+            self.__sift_down(0)
+        return top
+
+    def increase(self, variable: int):
+        """
+        Restores the heap order after the score of a variable was increased.
+        :param variable: The variable whose score was increased
+        """
+        if self.indices[variable] >= 0:
+            self.__sift_up(self.indices[variable])
+
+    def resize(self, size: int):
+        """
+        Makes room for the variables below size. The scores of the new variables have to be added by the owner of
+        the score list.
+        :param size: The new size of the score list
+        """
+        self.indices.extend([-1] * (size - len(self.indices)))
+
+    def __sift_up(self, position: int):
+        heap, scores, indices = self.heap, self.scores, self.indices
+        variable = heap[position]
+        score = scores[variable]
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if scores[parent] >= score:
+                break
+            heap[position] = parent
+            indices[parent] = position
+            position = parent_position
+        heap[position] = variable
+        indices[variable] = position
+
+    def __sift_down(self, position: int):
+        heap, scores, indices = self.heap, self.scores, self.indices
+        variable = heap[position]
+        score = scores[variable]
+        size = len(heap)
+        while True:
+            child_position = 2 * position + 1
+            if child_position >= size:
+                break
+            if child_position + 1 < size and scores[heap[child_position + 1]] > scores[heap[child_position]]:
+                child_position += 1
+            child = heap[child_position]
+            if scores[child] <= score:
+                break
+            heap[position] = child
+            indices[child] = position
+            position = child_position
+        heap[position] = variable
+        indices[variable] = position
+
+
+class BranchingHeuristic(ABC):
+    """
+    Interface of the heuristics that choose the decision variables of the solvers. The solver notifies the
+    heuristic about unassigned variables and conflicts, so that it can keep its state up to date incrementally.
+    Subclasses have to implement setup, add_variables and next_variable, otherwise they can not be instantiated.
+    """
+    @abstractmethod
+    def setup(self, variables: Iterable[int]):
+        """
+        Initializes the heuristic for the variables of a formula.
+        :param variables: The variables of the formula
+        """
+
+    @abstractmethod
+    def add_variables(self, variables: Iterable[int]):
+        """
+        Adds variables that were added to the formula after the setup, e.g. by an incremental solver.
+        :param variables: The new variables
+        """
+
+    @abstractmethod
+    def next_variable(self, values: Sequence[int]) -> Optional[int]:
+        """
+        Chooses the next decision variable.
+        :param values: The values of the literals under the current assignment of the solver, indexed by the
+        literals. A variable is unassigned if its value is 0
+        :return: An unassigned variable; None if all variables are assigned
+        """
+
+    def unassigned(self, variable: int):
+        """
+        Called by the solver for every variable that becomes unassigned while backtracking.
+        :param variable: The variable that became unassigned
+        """
+
+    def conflict(self, variables: Iterable[int]):
+        """
+        Called by the solver for every conflict.
+        :param variables: The variables involved in the conflict
+        """
+
+
+class VSIDSHeuristic(BranchingHeuristic):
+    """
+    Exponential variable state independent decaying sum. Every variable involved in a conflict is bumped by an
+    increment that grows geometrically with each conflict, so that recent conflicts weigh more than old ones. The
+    unassigned variables are kept in a max-heap by activity. Assigned variables are only removed lazily when they
+    reach the top of the heap and are inserted again when they become unassigned.
+    """
+    def __init__(self, decay: float = 0.95):
+        """
+        :param decay: (optional) factor with which older activity decays on every conflict
+        """
+        if not 0 < decay <= 1:
+            raise ValueError("decay has to be in (0, 1]")
+        self.decay = decay
+        self.increment = 1.0
+        self.activity = []
+        self.heap = VariableHeap(self.activity)
+
+    def setup(self, variables: Iterable[int]):
+        variables = list(variables)
+        self.increment = 1.0
+        self.activity = [0.0] * (max(variables, default=0) + 1)
+        self.heap = VariableHeap(self.activity)
+        for variable in sorted(variables):
+            self.heap.push(variable)
+
+    def add_variables(self, variables: Iterable[int]):
+        variables = list(variables)
+        self.activity.extend([0.0] * (max(variables, default=0) + 1 - len(self.activity)))
+        self.heap.resize(len(self.activity))
+        for variable in sorted(variables):
+            self.heap.push(variable)
+
+    def next_variable(self, values: Sequence[int]) -> Optional[int]:
+        while len(self.heap) > 0:
+            variable = self.heap.pop()
+            if values[variable] == 0:
+                return variable
+        return None
+
+    def unassigned(self, variable: int):
+        self.heap.push(variable)
+
+    def conflict(self, variables: Iterable[int]):
+        activity = self.activity
+        for variable in variables:
+            activity[variable] += self.increment
+            if activity[variable] > 1e100:
+                self.__rescale()
+            self.heap.increase(variable)
+        self.increment /= self.decay
+
+    def __rescale(self):
+        """
+        Scales all activities and the increment down to avoid a floating point overflow. The order of the
+        variables is not changed by it.
+        """
+        for variable in range(len(self.activity)):
+            self.activity[variable] *= 1e-100
+        self.increment *= 1e-100
+
+
+class OrderedHeuristic(BranchingHeuristic):
+    """
+    Always chooses the unassigned variable with the lowest index.
+    """
+    def __init__(self):
+        self.heap = VariableHeap([])
+
+    def setup(self, variables: Iterable[int]):
+        variables = list(variables)
+        # the heap is a max-heap, so lower variables get higher scores
+        self.heap = VariableHeap([-variable for variable in range(max(variables, default=0) + 1)])
+        for variable in sorted(variables):
+            self.heap.push(variable)
+
+    def add_variables(self, variables: Iterable[int]):
+        variables = list(variables)
+        scores = self.heap.scores
+        scores.extend(-variable for variable in range(len(scores), max(variables, default=0) + 1))
+        self.heap.resize(len(scores))
+        for variable in sorted(variables):
+            self.heap.push(variable)
+
+    def next_variable(self, values: Sequence[int]) -> Optional[int]:
+        while len(self.heap) > 0:
+            variable = self.heap.pop()
+            if values[variable] == 0:
+                return variable
+        return None
+
+    def unassigned(self, variable: int):
+        self.heap.push(variable)
+
+
+class RandomHeuristic(BranchingHeuristic):
+    """
+    Chooses an unassigned variable uniformly at random.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        """
+        :param seed: (optional) seed of the random number generator
+        """
+        self.random = random.Random(seed)
+        # the pool contains at least all unassigned variables. Assigned variables are removed when they are drawn
+        self.pool = []
+        self.positions = {}
+
+    def setup(self, variables: Iterable[int]):
+        self.pool = sorted(variables)
+        self.positions = {variable: i for i, variable in enumerate(self.pool)}
+
+    def add_variables(self, variables: Iterable[int]):
+        for variable in sorted(variables):
+            self.unassigned(variable)
+
+    def next_variable(self, values: Sequence[int]) -> Optional[int]:
+        while self.pool:
+            variable = self.pool[self.random.randrange(len(self.pool))]
+            self.__remove(variable)
+            if values[variable] == 0:
+                return variable
+        return None
+
+    def unassigned(self, variable: int):
+        if variable not in self.positions:
+            self.positions[variable] = len(self.pool)
+            self.pool.append(variable)
+
+    def __remove(self, variable: int):
+        """
+        Removes a variable from the pool by swapping it with the last variable.
+        :param variable: The variable to remove
+        """
+        position = self.positions.pop(variable)
+        last = self.pool.pop()
+        if last != variable:
+            self.pool[position] = last
+            self.positions[last] = position
+
+
+HEURISTICS = {
+    "vsids": VSIDSHeuristic,
+    "ordered": OrderedHeuristic,
+    "random": RandomHeuristic,
+}
+
+
+def make_heuristic(heuristic: Union[str, BranchingHeuristic], **kwargs) -> BranchingHeuristic:
+    """
+    Creates a branching heuristic.
+    :param heuristic: Either the name of a heuristic in HEURISTICS or an instance of a heuristic, which is returned
+    as it is
+    :param kwargs: Arguments passed on to the constructor of a heuristic given by name
+    :return: The branching heuristic
+    """
+    if isinstance(heuristic, BranchingHeuristic):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"unknown heuristic {heuristic}, choose one of {', '.join(HEURISTICS)}")
+    return HEURISTICS[heuristic](**kwargs)
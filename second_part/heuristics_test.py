@@ -0,0 +1,114 @@
+import pytest
+from second_part.heuristics import BranchingHeuristic, VariableHeap, VSIDSHeuristic, OrderedHeuristic, \
+    RandomHeuristic, make_heuristic
+from second_part.solver import DLPPSolver
+from second_part.cdcl_solver import CDCLSolver
+
+
+def test_heap_pops_highest_score_first():
+    scores = [0, 3.0, 1.0, 5.0, 2.0]
+    heap = VariableHeap(scores)
+    for variable in [1, 2, 3, 4]:
+        heap.push(variable)
+    assert [heap.pop() for _ in range(4)] == [3, 1, 4, 2]
+    assert len(heap) == 0
+
+def test_heap_increase_and_membership():
+    scores = [0, 1.0, 2.0, 3.0]
+    heap = VariableHeap(scores)
+    for variable in [1, 2, 3]:
+        heap.push(variable)
+    heap.push(2)
+    assert len(heap) == 3
+    scores[1] = 10.0
+    heap.increase(1)
+    assert heap.pop() == 1
+    assert 1 not in heap
+    assert 2 in heap
+
+def values_of(assignment, num_variables=10):
+    values = [0] * (2 * num_variables + 1)
+    for variable, value in assignment.items():
+        values[variable] = 1 if value else -1
+        values[-variable] = -values[variable]
+    return values
+
+def test_vsids_prefers_bumped_variables():
+    heuristic = VSIDSHeuristic()
+    heuristic.setup([1, 2, 3, 4])
+    heuristic.conflict([3])
+    heuristic.conflict([4])
+    # later conflicts weigh more
+    assert heuristic.next_variable(values_of({})) == 4
+    assert heuristic.next_variable(values_of({})) == 3
+    assert heuristic.next_variable(values_of({1: True})) == 2
+    assert heuristic.next_variable(values_of({1: True})) is None
+
+def test_vsids_reinserts_unassigned_variables():
+    heuristic = VSIDSHeuristic()
+    heuristic.setup([1, 2])
+    heuristic.conflict([2])
+    assert heuristic.next_variable(values_of({})) == 2
+    heuristic.unassigned(2)
+    assert heuristic.next_variable(values_of({})) == 2
+
+def test_vsids_rescales_activity():
+    heuristic = VSIDSHeuristic(decay=0.5)
+    heuristic.setup([1, 2])
+    for _ in range(400):
+        heuristic.conflict([1])
+    assert heuristic.activity[1] <= 1e100
+    assert heuristic.next_variable(values_of({})) == 1
+
+def test_ordered_heuristic_chooses_lowest_variable():
+    heuristic = OrderedHeuristic()
+    heuristic.setup([5, 3, 10])
+    assert heuristic.next_variable(values_of({3: True})) == 5
+    heuristic.unassigned(3)
+    assert heuristic.next_variable(values_of({})) == 3
+    assert heuristic.next_variable(values_of({})) == 10
+
+def test_random_heuristic_returns_every_unassigned_variable():
+    heuristic = RandomHeuristic(seed=1)
+    heuristic.setup(range(1, 11))
+    chosen = [heuristic.next_variable(values_of({})) for _ in range(10)]
+    assert sorted(chosen) == list(range(1, 11))
+    assert heuristic.next_variable(values_of({})) is None
+    heuristic.unassigned(4)
+    assert heuristic.next_variable(values_of({})) == 4
+
+@pytest.mark.parametrize("heuristic", [VSIDSHeuristic(), OrderedHeuristic(), RandomHeuristic(seed=2)])
+def test_add_variables(heuristic):
+    heuristic.setup([1, 3])
+    heuristic.add_variables([2, 12])
+    chosen = [heuristic.next_variable(values_of({}, 12)) for _ in range(4)]
+    assert sorted(chosen) == [1, 2, 3, 12]
+    assert heuristic.next_variable(values_of({}, 12)) is None
+
+def test_make_heuristic():
+    assert isinstance(make_heuristic("ordered"), OrderedHeuristic)
+    heuristic = RandomHeuristic(seed=3)
+    assert make_heuristic(heuristic) is heuristic
+    with pytest.raises(ValueError):
+        make_heuristic("unknown")
+
+def test_incomplete_heuristic_can_not_be_created():
+    class Incomplete(BranchingHeuristic):
+        def setup(self, variables):
+            pass
+
+    # the missing methods are reported when the heuristic is created, not when the solver calls them
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        BranchingHeuristic()
+
+@pytest.mark.parametrize("heuristic", ["vsids", "ordered", "random"])
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_solvers_with_heuristics(solver_class, heuristic):
+    clauses = [[1, 2, 3], [-1, -2], [-2, -3], [-1, -3], [2, 4], [-4, 1]]
+    solver = solver_class(clauses, heuristic=heuristic)
+    assert solver.solve() is True
+    model = solver.get_model()
+    assert all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+    assert solver_class([[1, 2], [-1, 2], [1, -2], [-1, -2]], heuristic=heuristic).solve() is False
@@ -0,0 +1,311 @@
+import random
+from typing import Dict, List, Optional, Union
+
+from budget import Budget
+from solver_statistics import SolverStatistics
+
+from .clause_arena import ClauseArena
+from .solver import DLPPSolver
+
+
+ALGORITHMS = ("probsat", "walksat")
+
+
+class LocalSearchSolver:
+    """
+    An incomplete solver that searches for a model by stochastic local search. Starting from a complete assignment,
+    it repeatedly picks a False clause and flips one of its variables, chosen by the number of clauses that the flip
+    would make False (its break value): ProbSAT picks a variable with a probability that falls polynomially with its
+    break value, WalkSAT picks one that breaks nothing if there is one and otherwise a random one with the
+    probability of the noise or the one with the lowest break value.
+    The number of True literals of every clause, the break value of every variable and the set of False clauses are
+    updated incrementally on every flip, so that a flip only visits the clauses of the flipped variable.
+    The solver can not show that a formula is unsatisfiable, solve returns False if no model was found within the
+    flip budget. Like the complete solvers, it returns None if the budget of set_budget is used up or it was
+    interrupted, and the next call continues the search.
+    """
+    def __init__(self, clauses: Union[List[list[int]], ClauseArena], timeout=float("inf"), algorithm="probsat",
+                 noise=0.567, cb=2.38, max_flips=100000, max_tries=10, seed: Optional[int] = None,
+                 phases: Union[Dict[int, bool], DLPPSolver, None] = None):
+        """
+        Initializes the solver.
+        :param clauses: a list of clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...] or a clause arena
+        :param timeout: (optional) timeout in seconds of every call of solve, after which it returns None
+        :param algorithm: (optional) "probsat" or "walksat"
+        :param noise: (optional) the probability with which WalkSAT flips a random variable of the clause
+        :param cb: (optional) the noise of ProbSAT. A variable is picked with a probability proportional to
+        (1 + break value)^-cb, so higher values pick the variables with low break values more greedily
+        :param max_flips: (optional) the number of flips after which the search restarts from a random assignment
+        :param max_tries: (optional) the number of searches before giving up, the flip budget is
+        max_flips * max_tries
+        :param seed: (optional) seed of the random number generator
+        :param phases: (optional) the values of the variables in the first search, either as a dictionary or taken from
+        a DPLL or CDCL solver: its current assignment and the saved phases of its unassigned variables. Variables
+        without phase start with a random value
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm}, choose one of {', '.join(ALGORITHMS)}")
+        if not 0 <= noise <= 1:
+            raise ValueError("noise has to be in [0, 1]")
+        if max_flips < 0 or max_tries < 1:
+            raise ValueError("max_flips can not be negative and max_tries has to be at least 1")
+
+        if isinstance(clauses, ClauseArena):
+            clauses = [clauses[cref] for cref in clauses.crefs(learned=False)]
+
+        # duplicate literals and the zeros terminating DIMACS clauses are dropped. Tautologies are True under every
+        # assignment and are left out, but their variables belong to the model
+        self.clauses = []
+        self.variables = set()
+        self.has_empty_clause = False
+        for literals in clauses:
+            clause = [literal for literal in dict.fromkeys(literals) if literal != 0]
+            self.variables.update(abs(literal) for literal in clause)
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.has_empty_clause = True
+            self.clauses.append(clause)
+
+        self.num_variables = max(self.variables, default=0)
+
+        # the clauses in which every literal occurs, indexed by the literals like the values of DLPPSolver
+        self.occurrences = [[] for _ in range(2 * self.num_variables + 1)]
+        for index, clause in enumerate(self.clauses):
+            for literal in clause:
+                self.occurrences[literal].append(index)
+
+        self.algorithm = algorithm
+        self.noise = noise
+        self.cb = cb
+        self.max_flips = max_flips
+        self.max_tries = max_tries
+        self.random = random.Random(seed)
+        self.phases = self.__phases_of(phases)
+
+        # the value of every literal under the current assignment: 1 if it is True, 0 if it is False
+        self.values = [0] * (2 * self.num_variables + 1)
+        # the number of True literals of every clause and the XOR of their variables, which is the variable of the
+        # only True literal of a clause with one True literal
+        self.true_counts = [0] * len(self.clauses)
+        self.true_variables = [0] * len(self.clauses)
+        # the number of clauses in which every variable is the only True literal
+        self.breaks = [0] * (self.num_variables + 1)
+        # the False clauses and the position of every clause in them; -1 for True clauses
+        self.unsatisfied = []
+        self.positions = [-1] * len(self.clauses)
+
+        self.model = {}
+        # every flip counts as a decision, so that the budget can limit the flips
+        self.stats = SolverStatistics()
+
+        # the budget limits every call of solve. A call that used it up or was interrupted returns None and the
+        # next call continues with the assignment and the try at which it stopped
+        self.budget = Budget(seconds=timeout)
+        self.stop_reason = None
+        self.__interrupt_requested = False
+        self.__stopped_at = None
+
+    @staticmethod
+    def __phases_of(phases: Union[Dict[int, bool], DLPPSolver, None]) -> Dict[int, bool]:
+        """
+        :return: The phases as a dictionary
+        """
+        if phases is None:
+            return {}
+        if isinstance(phases, DLPPSolver):
+            values = phases.values
+            return {variable: values[variable] > 0 if values[variable] != 0 else phases.saved_phases[variable]
+                    for variable in phases.variables}
+        return dict(phases)
+
+    def __initialize(self, phases: Dict[int, bool]):
+        """
+        Assigns every variable and computes the True literals of the clauses, the break values and the False clauses
+        from scratch.
+        :param phases: The values of the variables; missing variables are assigned randomly
+        """
+        values = self.values
+        for variable in range(1, self.num_variables + 1):
+            value = phases.get(variable)
+            if value is None:
+                value = self.random.random() < 0.5
+            values[variable] = 1 if value else 0
+            values[-variable] = 0 if value else 1
+
+        self.breaks = [0] * (self.num_variables + 1)
+        self.unsatisfied = []
+        for index, clause in enumerate(self.clauses):
+            true_count = 0
+            true_variables = 0
+            for literal in clause:
+                if values[literal]:
+                    true_count += 1
+                    true_variables ^= abs(literal)
+            self.true_counts[index] = true_count
+            self.true_variables[index] = true_variables
+            if true_count == 0:
+                self.positions[index] = len(self.unsatisfied)
+                self.unsatisfied.append(index)
+            else:
+                self.positions[index] = -1
+                if true_count == 1:
+                    self.breaks[true_variables] += 1
+
+    def flip(self, variable: int):
+        """
+        Flips the value of a variable and updates the clauses it occurs in.
+        :param variable: The variable to flip
+        """
+        values, true_counts, true_variables = self.values, self.true_counts, self.true_variables
+        breaks, unsatisfied, positions = self.breaks, self.unsatisfied, self.positions
+        true_literal = -variable if values[variable] else variable
+        values[true_literal] = 1
+        values[-true_literal] = 0
+
+        for index in self.occurrences[true_literal]:
+            true_count = true_counts[index] + 1
+            true_counts[index] = true_count
+            if true_count == 1:
+                # the clause becomes True and the variable is its only True literal
+                position = positions[index]
+                last = unsatisfied.pop()
+                if last != index:
+                    unsatisfied[position] = last
+                    positions[last] = position
+                positions[index] = -1
+                breaks[variable] += 1
+            elif true_count == 2:
+                # the other True literal is no longer the only one
+                breaks[true_variables[index]] -= 1
+            true_variables[index] ^= variable
+
+        for index in self.occurrences[-true_literal]:
+            true_count = true_counts[index] - 1
+            true_counts[index] = true_count
+            true_variables[index] ^= variable
+            if true_count == 0:
+                positions[index] = len(unsatisfied)
+                unsatisfied.append(index)
+                breaks[variable] -= 1
+            elif true_count == 1:
+                breaks[true_variables[index]] += 1
+
+        stats = self.stats
+        stats.flips += 1
+        stats.decisions += 1
+
+    def __pick_probsat(self, clause: List[int], weights: List[float]) -> int:
+        """
+        :return: A variable of the clause, picked with a probability proportional to the weight of its break value
+        """
+        breaks = self.breaks
+        scores = [weights[breaks[abs(literal)]] for literal in clause]
+        threshold = self.random.random() * sum(scores)
+        for literal, score in zip(clause, scores):
+            threshold -= score
+            if threshold < 0:
+                return abs(literal)
+        return abs(clause[-1])
+
+    def __pick_walksat(self, clause: List[int]) -> int:
+        """
+        :return: A variable of the clause that breaks no clause if there is one; a random one with the probability
+        of the noise or one with the lowest break value else
+        """
+        breaks = self.breaks
+        lowest = min(breaks[abs(literal)] for literal in clause)
+        if lowest > 0 and self.random.random() < self.noise:
+            return abs(self.random.choice(clause))
+        return self.random.choice([abs(literal) for literal in clause if breaks[abs(literal)] == lowest])
+
+    def set_budget(self, flips: Optional[int] = None, seconds=float("inf")):
+        """
+        Replaces the budget of the following calls of solve, including the timeout. None stands for no limit.
+        :param flips: (optional) the number of flips per call
+        :param seconds: (optional) the wall-clock time per call
+        """
+        self.budget = Budget(decisions=flips, seconds=seconds)
+
+    def interrupt(self):
+        """
+        Asks the running call of solve to stop, it returns None at its next check. Only a flag is set, so that it can
+        be called from another thread or from a signal handler. If no call is running, the next one stops at once.
+        """
+        self.__interrupt_requested = True
+
+    def __out_of_budget(self) -> bool:
+        """
+        Checks for an interrupt and whether the budget of the running call is used up.
+        :return: True if the call has to stop. The reason is stored in stop_reason
+        """
+        if self.__interrupt_requested:
+            self.__interrupt_requested = False
+            self.stop_reason = "interrupt"
+            return True
+        self.stop_reason = self.budget.exceeded(self.stats)
+        return self.stop_reason is not None
+
+    def solve(self) -> Optional[bool]:
+        """
+        Searches for a model with at most max_tries searches of max_flips flips each.
+        :return: True if a model was found; False if none was found within the flip budget, which does not mean
+        that there is none; None if the budget was used up or the solver was interrupted before. The next call
+        resumes the search
+        """
+        self.model = {}
+        self.stop_reason = None
+        self.budget.start(self.stats)
+        if self.has_empty_clause:
+            return False
+
+        # the weights of the break values of ProbSAT. No break value is higher than the occurrences of a literal
+        max_break = max((len(clauses) for clauses in self.occurrences), default=0)
+        weights = [(1 + break_value) ** -self.cb for break_value in range(max_break + 1)]
+        probsat = self.algorithm == "probsat"
+
+        # a stopped search continues with its current assignment; None for the flips starts a new try
+        first_attempt, first_flips = self.__stopped_at if self.__stopped_at is not None else (0, None)
+        self.__stopped_at = None
+        for attempt in range(first_attempt, self.max_tries):
+            if first_flips is None:
+                if attempt > 0:
+                    self.stats.restarts += 1
+                self.__initialize(self.phases if attempt == 0 else {})
+                first_flips = 0
+            unsatisfied = self.unsatisfied
+
+            for flips in range(first_flips, self.max_flips + 1):
+                if not unsatisfied:
+                    values = self.values
+                    self.model = {variable: values[variable] == 1 for variable in self.variables}
+                    return True
+                if flips == self.max_flips:
+                    break
+                if self.__out_of_budget():
+                    self.__stopped_at = (attempt, flips)
+                    return None
+
+                clause = self.clauses[unsatisfied[self.random.randrange(len(unsatisfied))]]
+                self.flip(self.__pick_probsat(clause, weights) if probsat else self.__pick_walksat(clause))
+            first_flips = None
+
+        return False
+
+    def get_model(self) -> Dict[int, bool]:
+        """
+        Returns the model found by the solver.
+        :return: The model as a dictionary if the solver found one; {} else
+        """
+        return dict(self.model)
+
+    @property
+    def num_flips(self) -> int:
+        return self.stats.flips
+
+    def get_num_decisions(self) -> int:
+        """
+        Gets the number of flips, which are the decisions of the local search.
+        :return: Number of flips made during the solving process.
+        """
+        return self.num_flips
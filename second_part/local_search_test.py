@@ -0,0 +1,98 @@
+import random
+import pytest
+from second_part.local_search import LocalSearchSolver
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole, is_model
+
+
+def planted_formula(rng, num_variables, num_clauses):
+    planted = {variable: rng.random() < 0.5 for variable in range(1, num_variables + 1)}
+    clauses = []
+    while len(clauses) < num_clauses:
+        clause = [rng.choice([-1, 1]) * variable for variable in rng.sample(range(1, num_variables + 1), 3)]
+        if any(planted[abs(literal)] == (literal > 0) for literal in clause):
+            clauses.append(clause)
+    return clauses
+
+@pytest.mark.parametrize("algorithm", ["probsat", "walksat"])
+def test_solve(algorithm):
+    clauses = planted_formula(random.Random(19), 100, 400)
+    solver = LocalSearchSolver(clauses, algorithm=algorithm, seed=1)
+    assert solver.solve() is True
+    assert is_model(clauses, solver.get_model())
+    assert solver.get_num_decisions() == solver.num_flips > 0
+
+@pytest.mark.parametrize("algorithm", ["probsat", "walksat"])
+def test_flips_update_counts_incrementally(algorithm):
+    rng = random.Random(4)
+    clauses = [[rng.choice([-1, 1]) * rng.randint(1, 12) for _ in range(rng.randint(1, 4))] for _ in range(60)]
+    solver = LocalSearchSolver(clauses, algorithm=algorithm, seed=2, max_flips=30, max_tries=2)
+    solver.solve()
+    for _ in range(50):
+        solver.flip(rng.randint(1, 12))
+        true_counts = [sum(solver.values[literal] for literal in clause) for clause in solver.clauses]
+        assert solver.true_counts == true_counts
+        assert sorted(solver.unsatisfied) == [index for index, count in enumerate(true_counts) if count == 0]
+        breaks = [0] * 13
+        for clause, count in zip(solver.clauses, true_counts):
+            if count == 1:
+                breaks[next(abs(literal) for literal in clause if solver.values[literal])] += 1
+        assert solver.breaks == breaks
+
+def test_flip_budget_and_restarts():
+    solver = LocalSearchSolver(pigeonhole(5, 4), max_flips=100, max_tries=3, seed=0)
+    assert solver.solve() is False
+    assert solver.get_model() == {}
+    assert solver.num_flips == 300
+    assert solver.stats.restarts == 2
+
+def test_phases():
+    clauses = planted_formula(random.Random(7), 60, 240)
+    cdcl = CDCLSolver(clauses)
+    assert cdcl.solve()
+    model = cdcl.get_model()
+    # a model as starting assignment needs no flips, whether it is given directly or taken from the solver
+    for phases in (model, cdcl):
+        solver = LocalSearchSolver(clauses, phases=phases, seed=3)
+        assert solver.solve() is True
+        assert solver.num_flips == 0
+        assert solver.get_model() == model
+
+def test_special_clauses():
+    # the variable 3 only occurs in a tautology but belongs to the model
+    solver = LocalSearchSolver([[1, 0], [3, -3], [-1, 2, 2]])
+    assert solver.solve() is True
+    assert solver.get_model() == {1: True, 2: True, 3: solver.get_model()[3]}
+    assert LocalSearchSolver([[1], []]).solve() is False
+
+def test_timeout():
+    solver = LocalSearchSolver(pigeonhole(9, 8), timeout=0.1, max_flips=10 ** 9)
+    assert solver.solve() is None
+    assert solver.stop_reason == "time"
+    assert solver.get_model() == {}
+
+def test_budget_and_interrupt_resume_the_search():
+    solver = LocalSearchSolver(pigeonhole(5, 4), max_flips=100, max_tries=3, seed=0)
+    solver.set_budget(flips=120)
+    assert solver.solve() is None
+    assert solver.stop_reason == "decisions"
+    assert solver.num_flips == 120 and solver.stats.restarts == 1
+
+    solver.interrupt()
+    assert solver.solve() is None
+    assert solver.stop_reason == "interrupt" and solver.num_flips == 120
+
+    # the flips of all calls add up to the flip budget of the search, as without stopping
+    assert solver.solve() is None
+    solver.set_budget()
+    assert solver.solve() is False
+    assert solver.stop_reason is None
+    assert solver.num_flips == 300 and solver.stats.restarts == 2
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        LocalSearchSolver([[1]], algorithm="gsat")
+    with pytest.raises(ValueError):
+        LocalSearchSolver([[1]], noise=2)
+    with pytest.raises(ValueError):
+        LocalSearchSolver([[1]], max_tries=0)
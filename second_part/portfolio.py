@@ -0,0 +1,174 @@
+import multiprocessing
+import queue
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from .cdcl_solver import CDCLSolver
+from .clause_arena import ClauseArena
+from .heuristics import RandomHeuristic
+from .solver import DLPPSolver
+
+
+SOLVERS = {
+    "cdcl": CDCLSolver,
+    "dpll": DLPPSolver,
+}
+
+# the configurations of the first workers. Each is a dictionary of keyword arguments of the solver, with "solver"
+# choosing the solver by name in SOLVERS and "seed" seeding the random heuristic
+BASE_CONFIGS = [
+    {},
+    {"restart_policy": "glucose", "target_phase": "target"},
+    {"default_phase": False, "restart_policy": "geometric"},
+    {"preprocess": True},
+    {"restart_policy": "glucose", "default_phase": False, "target_phase": "best"},
+    {"heuristic": "ordered", "restart_policy": "luby"},
+    {"heuristic": "random", "seed": 0},
+    {"preprocess": True, "restart_policy": "glucose", "default_phase": False},
+]
+
+
+class PortfolioResult(NamedTuple):
+    # True or False from the first worker that finished; None if no worker finished in time
+    satisfiable: Optional[bool]
+    model: Dict[int, bool]
+    # the index and configuration of the winning worker; -1 and {} if there is none
+    worker: int
+    config: Dict[str, Any]
+    seconds: float
+
+
+def diversified_configs(num_workers: int) -> List[Dict[str, Any]]:
+    """
+    Creates different solver configurations for the workers of a portfolio. The first ones are taken from
+    BASE_CONFIGS, the others use the random heuristic with different seeds, phases and restart policies.
+    :param num_workers: The number of configurations
+    :return: The configurations
+    """
+    configs = [dict(config) for config in BASE_CONFIGS[:num_workers]]
+    restart_policies = ["luby", "glucose", "geometric"]
+    for index in range(len(configs), num_workers):
+        configs.append({
+            "heuristic": "random",
+            "seed": index,
+            "default_phase": index % 2 == 0,
+            "restart_policy": restart_policies[index % len(restart_policies)],
+        })
+    return configs
+
+
+def flatten(clauses: Iterable[Iterable[int]]) -> array:
+    """
+    Stores clauses in one array in which every clause is terminated by a 0, as in DIMACS.
+    :param clauses: The clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+    :return: The array('i') of the literals
+    """
+    literals = array("i")
+    for clause in clauses:
+        literals.extend(literal for literal in clause if literal != 0)
+        literals.append(0)
+    return literals
+
+
+def _read_shared_literals(memory_name: str, num_literals: int) -> array:
+    """
+    Copies the literals that the main process put into shared memory. The solvers modify their clauses, so every
+    worker needs its own copy.
+    :param memory_name: The name of the shared memory
+    :param num_literals: The number of literals in it
+    :return: The array('i') of the literals
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        literals = array("i")
+        with memory.buf[:num_literals * literals.itemsize] as view:
+            literals.frombytes(view)
+    finally:
+        memory.close()
+    return literals
+
+
+def _solve_worker(index: int, config: Dict[str, Any], memory_name: str, num_literals: int, timeout: float,
+                  results: multiprocessing.Queue):
+    """
+    Runs one configuration of the portfolio in a worker process and puts (index, satisfiable, model) into the
+    results. satisfiable is None if the solver timed out.
+    """
+    literals = _read_shared_literals(memory_name, num_literals)
+
+    config = dict(config)
+    solver_class = SOLVERS[config.pop("solver", "cdcl")]
+    seed = config.pop("seed", None)
+    if config.get("heuristic") == "random":
+        config["heuristic"] = RandomHeuristic(seed)
+
+    solver = solver_class(ClauseArena.from_dimacs(literals), timeout=timeout, **config)
+    satisfiable = solver.solve()
+    results.put((index, satisfiable, solver.get_model()))
+
+
+def solve_portfolio(clauses: Union[Iterable[Iterable[int]], array], num_workers: Optional[int] = None,
+                    configs: Optional[List[Dict[str, Any]]] = None, timeout=float("inf")) -> PortfolioResult:
+    """
+    Solves a formula with several solver configurations in parallel processes. The literals are put into shared
+    memory once and copied from there by each worker. The first worker that decides the formula wins and all other
+    workers are terminated.
+    :param clauses: The clauses of the form [[literal, ...], ...] or an array('i') of literals in which every clause is
+    terminated by a 0, e.g. DIMACSReader.literals
+    :param num_workers: (optional) the number of worker processes, by default the number of CPUs. Ignored if configs
+    are given
+    :param configs: (optional) the configuration of every worker, see BASE_CONFIGS. By default diversified_configs
+    :param timeout: (optional) timeout in seconds for the whole portfolio
+    :return: The result of the winning worker
+    """
+    start = time.perf_counter()
+    if configs is None:
+        configs = diversified_configs(num_workers or multiprocessing.cpu_count())
+    if not configs:
+        raise ValueError("the portfolio needs at least one configuration")
+
+    literals = clauses if isinstance(clauses, array) else flatten(clauses)
+    if len(literals) > 0 and literals[-1] != 0:
+        raise ValueError("the last clause is not terminated by a 0")
+
+    # shared memory can not be empty
+    memory = shared_memory.SharedMemory(create=True, size=max(1, len(literals) * literals.itemsize))
+    results = multiprocessing.Queue()
+    workers = []
+    try:
+        memory.buf[:len(literals) * literals.itemsize] = literals.tobytes()
+        for index, config in enumerate(configs):
+            worker = multiprocessing.Process(
+                target=_solve_worker, args=(index, config, memory.name, len(literals), timeout, results), daemon=True)
+            worker.start()
+            workers.append(worker)
+
+        deadline = start + timeout
+        finished = 0
+        while finished < len(workers):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                index, satisfiable, model = results.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                # workers that crashed never report a result
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    break
+                continue
+            finished += 1
+            if satisfiable is not None:
+                return PortfolioResult(satisfiable, model, index, configs[index], time.perf_counter() - start)
+
+        return PortfolioResult(None, {}, -1, {}, time.perf_counter() - start)
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        results.close()
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,31 @@
+import pytest
+from second_part.portfolio import solve_portfolio, diversified_configs, flatten, BASE_CONFIGS
+from second_part.cdcl_solver_test import pigeonhole, is_model
+
+
+def test_diversified_configs():
+    configs = diversified_configs(len(BASE_CONFIGS) + 3)
+    assert configs[:len(BASE_CONFIGS)] == BASE_CONFIGS
+    assert len({tuple(sorted(config.items())) for config in configs}) == len(configs)
+
+def test_flatten():
+    assert flatten([[1, -2], [], [3, 0]]).tolist() == [1, -2, 0, 0, 3, 0]
+
+def test_solve_portfolio():
+    clauses = [[1, 2, 3], [-1, -2], [-1, -3], [-2, -3], [2, 4], [-4, 5, 6], [-5, -6]]
+    result = solve_portfolio(clauses, num_workers=3)
+    assert result.satisfiable
+    assert is_model(clauses, result.model)
+    assert result.config == diversified_configs(3)[result.worker]
+
+    result = solve_portfolio(flatten(pigeonhole(4, 3)), configs=[{"solver": "dpll"}, {"heuristic": "random", "seed": 1}])
+    assert result.satisfiable is False
+
+def test_solve_portfolio_timeout():
+    result = solve_portfolio(pigeonhole(10, 9), num_workers=2, timeout=0.5)
+    assert result.satisfiable is None
+    assert result.worker == -1
+
+def test_solve_portfolio_invalid():
+    with pytest.raises(ValueError):
+        solve_portfolio([[1]], configs=[])
@@ -0,0 +1,496 @@
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .clause_arena import ClauseArena
+
+
+TECHNIQUES = ("units", "pure_literals", "equivalences", "failed_literals", "subsumption", "strengthening",
+              "variable_elimination")
+
+
+class Preprocessor:
+    """
+    Simplifies a CNF before it is solved. The clauses are kept as sets of literals and every literal has an
+    occurrence list of the clauses containing it. The simplifications are unit propagation, pure literal elimination,
+    equivalent literal substitution, failed literal probing, backward subsumption, self-subsuming strengthening and
+    bounded variable elimination. The simplified formula is equisatisfiable to the original one. A model of it is
+    turned into a model of the original formula by extend_model, which replays the extension stack of the removed
+    clauses in reverse.
+    """
+    def __init__(self, units=True, pure_literals=True, subsumption=True, strengthening=True,
+                 variable_elimination=True, equivalences=True, failed_literals=True,
+                 time_budgets: Optional[Dict[str, float]] = None, elimination_growth=0,
+                 elimination_occurrence_limit=16):
+        """
+        Initializes the preprocessor.
+        :param units: (optional) propagate unit clauses and remove their variables
+        :param pure_literals: (optional) set literals whose negation does not occur to True
+        :param subsumption: (optional) remove clauses that are supersets of other clauses
+        :param strengthening: (optional) remove a literal l from a clause D if there is a clause C with -l in it and
+        C without -l is a subset of D
+        :param variable_elimination: (optional) replace the clauses of a variable by all their resolvents on it if
+        this does not increase the number of clauses by more than elimination_growth
+        :param equivalences: (optional) replace literals that imply each other by binary clauses by one of them
+        :param failed_literals: (optional) add the negation of a literal as unit clause if unit propagation of the
+        literal leads to a conflict
+        :param time_budgets: (optional) the time in seconds each technique may take, by name of the technique as in
+        TECHNIQUES. A technique stops when its budget is used up, leaving the formula partly simplified
+        :param elimination_growth: (optional) the number of clauses an elimination may add
+        :param elimination_occurrence_limit: (optional) variables with more occurrences are not eliminated
+        """
+        time_budgets = time_budgets or {}
+        for technique in time_budgets:
+            if technique not in TECHNIQUES:
+                raise ValueError(f"unknown technique {technique}, choose one of {', '.join(TECHNIQUES)}")
+
+        self.enabled = {
+            "units": units,
+            "pure_literals": pure_literals,
+            "subsumption": subsumption,
+            "strengthening": strengthening,
+            "variable_elimination": variable_elimination,
+            "equivalences": equivalences,
+            "failed_literals": failed_literals,
+        }
+        self.time_budgets = {technique: time_budgets.get(technique, float("inf")) for technique in TECHNIQUES}
+        self.elimination_growth = elimination_growth
+        self.elimination_occurrence_limit = elimination_occurrence_limit
+
+        self.__deadline = float("inf")
+        self.__reset()
+
+    def __reset(self):
+        # the clauses as sets of literals; None for removed clauses
+        self.clauses: List[Optional[Set[int]]] = []
+        # the clauses containing each literal, indexed by the literal like the values of the solvers
+        self.occurrences: List[Set[int]] = []
+        self.values: List[int] = []
+        # the literals of unit clauses that still have to be propagated
+        self.units = deque()
+
+        # the variables of the original formula and the removed clauses needed to extend a model. Each entry is a
+        # witness literal and a clause; if the clause is False under the model, the witness is made True
+        self.variables: Set[int] = set()
+        self.extension: List[Tuple[int, List[int]]] = []
+        self.unsat = False
+
+        self.num_fixed = 0
+        self.num_pure = 0
+        self.num_subsumed = 0
+        self.num_strengthened = 0
+        self.num_eliminated = 0
+        self.num_substituted = 0
+        self.num_failed = 0
+
+    def run(self, clauses: Union[Iterable[Iterable[int]], ClauseArena]) -> List[List[int]]:
+        """
+        Simplifies a formula with all enabled techniques.
+        :param clauses: The clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...] or a clause arena
+        :return: The simplified clauses. [[]] if the formula was found to be unsatisfiable
+        """
+        self.__reset()
+        if isinstance(clauses, ClauseArena):
+            arena = clauses
+            clauses = (arena[cref] for cref in arena.crefs())
+        clauses = [[literal for literal in clause if literal != 0] for clause in clauses]
+
+        self.variables = {abs(literal) for clause in clauses for literal in clause}
+        num_variables = max(self.variables, default=0)
+        self.occurrences = [set() for _ in range(2 * num_variables + 1)]
+        self.values = [0] * (2 * num_variables + 1)
+        for clause in clauses:
+            self.__add(clause)
+
+        self.__start("units")
+        self.__propagate_units()
+        if self.enabled["pure_literals"]:
+            self.__start("pure_literals")
+            self.__eliminate_pure_literals(range(1, num_variables + 1))
+        if self.enabled["equivalences"]:
+            self.__substitute_equivalences()
+        if self.enabled["failed_literals"]:
+            self.__probe_failed_literals()
+        if self.enabled["subsumption"] or self.enabled["strengthening"]:
+            self.__subsume()
+        if self.enabled["variable_elimination"]:
+            self.__eliminate_variables()
+        return self.get_clauses()
+
+    def get_clauses(self) -> List[List[int]]:
+        """
+        :return: The current simplified clauses. [[]] if the formula was found to be unsatisfiable
+        """
+        if self.unsat:
+            return [[]]
+        return [sorted(clause, key=abs) for clause in self.clauses if clause is not None]
+
+    def extend_model(self, model: Dict[int, bool]) -> Dict[int, bool]:
+        """
+        Extends a model of the simplified formula to a model of the original formula.
+        :param model: An assignment satisfying the simplified clauses
+        :return: An assignment of all variables of the original formula satisfying it
+        """
+        model = dict(model)
+        # variables that do not occur any more can take any value. Substituted variables are set to the value of
+        # their representative by the two clauses of their equivalence on the extension stack
+        for variable in self.variables:
+            model.setdefault(variable, True)
+        for witness, clause in reversed(self.extension):
+            if not any(model[abs(literal)] == (literal > 0) for literal in clause):
+                model[abs(witness)] = witness > 0
+        return model
+
+    def __start(self, technique: str):
+        """
+        Starts the time budget of a technique.
+        :param technique: The name of the technique
+        """
+        self.__deadline = time.perf_counter() + self.time_budgets[technique]
+
+    def __out_of_time(self) -> bool:
+        return time.perf_counter() > self.__deadline
+
+    def __add(self, literals: Iterable[int]):
+        """
+        Adds a clause. Duplicate literals are dropped, tautologies and clauses satisfied by the fixed variables are
+        skipped and False literals are removed.
+        :param literals: The literals of the clause
+        """
+        values = self.values
+        clause = set()
+        for literal in literals:
+            if values[literal] > 0 or -literal in clause:
+                return
+            if values[literal] == 0:
+                clause.add(literal)
+
+        if not clause:
+            self.unsat = True
+            return
+
+        cid = len(self.clauses)
+        self.clauses.append(clause)
+        for literal in clause:
+            self.occurrences[literal].add(cid)
+        if len(clause) == 1:
+            self.units.append(next(iter(clause)))
+
+    def __remove(self, cid: int):
+        """
+        Removes a clause from the formula and from the occurrence lists.
+        :param cid: The index of the clause
+        """
+        for literal in self.clauses[cid]:
+            self.occurrences[literal].discard(cid)
+        self.clauses[cid] = None
+
+    def __remove_literal(self, cid: int, literal: int):
+        """
+        Removes a literal from a clause. A clause that becomes unit is queued for propagation.
+        :param cid: The index of the clause
+        :param literal: The literal to remove
+        """
+        clause = self.clauses[cid]
+        clause.discard(literal)
+        self.occurrences[literal].discard(cid)
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            self.units.append(next(iter(clause)))
+
+    def __assign(self, literal: int):
+        """
+        Makes a literal True: the clauses containing it are removed and its negation is removed from all clauses.
+        The assignment is put on the extension stack.
+        :param literal: The literal to make True
+        """
+        self.values[literal] = 1
+        self.values[-literal] = -1
+        self.extension.append((literal, [literal]))
+        for cid in list(self.occurrences[literal]):
+            self.__remove(cid)
+        for cid in list(self.occurrences[-literal]):
+            self.__remove_literal(cid, -literal)
+
+    def __propagate_units(self):
+        """
+        Assigns the literals of the unit clauses until no unit clauses are left, the formula became unsatisfiable or
+        the time budget is used up. Units found by another technique are propagated within the budget of that
+        technique.
+        """
+        if not self.enabled["units"]:
+            self.units.clear()
+            return
+
+        while self.units and not self.unsat:
+            if self.__out_of_time():
+                self.units.clear()
+                return
+            literal = self.units.popleft()
+            if self.values[literal] < 0:
+                self.unsat = True
+            elif self.values[literal] == 0:
+                self.__assign(literal)
+                self.num_fixed += 1
+
+    def __eliminate_pure_literals(self, variables: Iterable[int]):
+        """
+        Assigns the literals whose negation does not occur in any clause. Removing their clauses can make other
+        literals pure, so the variables of the removed clauses are checked again.
+        :param variables: The variables to check
+        """
+        candidates = deque(variables)
+        occurrences = self.occurrences
+        while candidates and not self.unsat:
+            if self.__out_of_time():
+                return
+            variable = candidates.popleft()
+            if self.values[variable] != 0:
+                continue
+            for literal in (variable, -variable):
+                if occurrences[literal] and not occurrences[-literal]:
+                    touched = {abs(other) for cid in occurrences[literal] for other in self.clauses[cid]}
+                    self.__assign(literal)
+                    self.num_pure += 1
+                    candidates.extend(touched - {variable})
+                    break
+
+    def __binary_implications(self) -> List[List[int]]:
+        """
+        Builds the binary implication graph. A binary clause [a, b] is the pair of implications -a -> b and -b -> a.
+        :return: The literals implied by each literal, indexed by the literal
+        """
+        implications = [[] for _ in range(len(self.occurrences))]
+        for clause in self.clauses:
+            if clause is not None and len(clause) == 2:
+                first, second = clause
+                implications[-first].append(second)
+                implications[-second].append(first)
+        return implications
+
+    def __strongly_connected_components(self, implications: List[List[int]]) -> List[List[int]]:
+        """
+        Finds the strongly connected components of the binary implication graph with an iterative version of Tarjan's
+        algorithm. The literals of a component imply each other and are therefore equivalent.
+        :param implications: The binary implication graph
+        :return: The components with more than one literal. The search stops early if the time budget is used up,
+        the components found until then are complete
+        """
+        indices: Dict[int, int] = {}
+        low_links: Dict[int, int] = {}
+        stack, on_stack = [], set()
+        components = []
+        for root in range(-(len(implications) // 2), len(implications) // 2 + 1):
+            if root in indices or not implications[root]:
+                continue
+            if self.__out_of_time():
+                break
+            indices[root] = low_links[root] = len(indices)
+            stack.append(root)
+            on_stack.add(root)
+            # the literals on the path of the depth first search with the iterators over their successors
+            path = [(root, iter(implications[root]))]
+            while path:
+                literal, successors = path[-1]
+                for successor in successors:
+                    if successor not in indices:
+                        indices[successor] = low_links[successor] = len(indices)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        path.append((successor, iter(implications[successor])))
+                        break
+                    if successor in on_stack:
+                        low_links[literal] = min(low_links[literal], indices[successor])
+                else:
+                    path.pop()
+                    if path:
+                        parent = path[-1][0]
+                        low_links[parent] = min(low_links[parent], low_links[literal])
+                    if low_links[literal] == indices[literal]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == literal:
+                                break
+                        if len(component) > 1:
+                            components.append(component)
+        return components
+
+    def __substitute_equivalences(self):
+        """
+        Replaces every literal of a strongly connected component of the binary implication graph by the literal of
+        the smallest variable in the component, its representative. The components come in pairs of negated
+        literals, so the negation of a literal is replaced by the negation of the same representative. If a literal
+        and its negation are in one component, the formula is unsatisfiable. The two binary clauses that make a
+        substituted variable equivalent to its representative are put on the extension stack.
+        """
+        self.__start("equivalences")
+        representatives: Dict[int, int] = {}
+        for component in self.__strongly_connected_components(self.__binary_implications()):
+            members = set(component)
+            if any(-literal in members for literal in component):
+                self.unsat = True
+                return
+            representative = min(component, key=abs)
+            for literal in component:
+                if literal != representative:
+                    representatives[abs(literal)] = representative if literal > 0 else -representative
+
+        clauses, occurrences = self.clauses, self.occurrences
+        for variable, representative in representatives.items():
+            self.extension.append((variable, [variable, -representative]))
+            self.extension.append((-variable, [-variable, representative]))
+            for cid in list(occurrences[variable] | occurrences[-variable]):
+                clause = clauses[cid]
+                self.__remove(cid)
+                self.__add([representative if literal == variable else -representative if literal == -variable
+                            else literal for literal in clause])
+            self.num_substituted += 1
+        self.__propagate_units()
+
+    def __probe_failed_literals(self):
+        """
+        Probes the roots of the binary implication graph, i.e. the literals that imply other literals by binary
+        clauses but are not implied by any. If unit propagation of a root leads to a conflict, its negation is added
+        as unit clause. Every literal implied by a root is propagated together with it, so a root fails if any of
+        them fails.
+        """
+        self.__start("failed_literals")
+        implications = self.__binary_implications()
+        roots = [literal for literal in range(-(len(implications) // 2), len(implications) // 2 + 1)
+                 if literal != 0 and implications[literal] and not implications[-literal]]
+        for root in roots:
+            if self.unsat or self.__out_of_time():
+                return
+            if self.values[root] == 0 and self.__fails(root):
+                self.__add([-root])
+                self.num_failed += 1
+                self.__propagate_units()
+
+    def __fails(self, literal: int) -> bool:
+        """
+        Runs unit propagation on the clauses after assuming a literal. The assignments are undone afterwards.
+        :param literal: The literal to assume
+        :return: True if a clause became False
+        """
+        values, clauses, occurrences = self.values, self.clauses, self.occurrences
+        assigned = [literal]
+        values[literal], values[-literal] = 1, -1
+        failed = False
+        position = 0
+        while position < len(assigned) and not failed:
+            false_literal = -assigned[position]
+            position += 1
+            for cid in occurrences[false_literal]:
+                clause = clauses[cid]
+                if any(values[other] > 0 for other in clause):
+                    continue
+                unassigned = [other for other in clause if values[other] == 0]
+                if not unassigned:
+                    failed = True
+                    break
+                if len(unassigned) == 1:
+                    assigned.append(unassigned[0])
+                    values[unassigned[0]], values[-unassigned[0]] = 1, -1
+
+        for other in assigned:
+            values[other] = values[-other] = 0
+        return failed
+
+    def __subsume(self):
+        """
+        Runs backward subsumption and self-subsuming strengthening. Every clause C is checked against the clauses
+        in the occurrence lists of its literals: a clause containing C is removed and a clause containing C with one
+        literal negated loses that literal. Strengthened clauses are checked again.
+        """
+        self.__start("subsumption" if self.enabled["subsumption"] else "strengthening")
+        if self.enabled["subsumption"] and self.enabled["strengthening"]:
+            self.__deadline += self.time_budgets["strengthening"]
+
+        clauses, occurrences = self.clauses, self.occurrences
+        # shorter clauses are more likely to subsume others
+        queue = deque(sorted((cid for cid, clause in enumerate(clauses) if clause is not None),
+                             key=lambda cid: len(clauses[cid])))
+        queued = set(queue)
+        while queue and not self.unsat:
+            if self.__out_of_time():
+                break
+            cid = queue.popleft()
+            queued.discard(cid)
+            clause = clauses[cid]
+            if clause is None:
+                continue
+
+            if self.enabled["subsumption"]:
+                # a clause containing C contains every literal of C, so the shortest occurrence list suffices
+                literal = min(clause, key=lambda literal: len(occurrences[literal]))
+                for other in list(occurrences[literal]):
+                    if other != cid and len(clauses[other]) >= len(clause) and clause <= clauses[other]:
+                        self.__remove(other)
+                        self.num_subsumed += 1
+
+            if self.enabled["strengthening"]:
+                for literal in list(clause):
+                    rest = clause - {literal}
+                    for other in list(occurrences[-literal]):
+                        if len(clauses[other]) >= len(clause) and rest <= clauses[other]:
+                            self.__remove_literal(other, -literal)
+                            self.num_strengthened += 1
+                            if other not in queued:
+                                queue.append(other)
+                                queued.add(other)
+
+            self.__propagate_units()
+
+    def __eliminate_variables(self):
+        """
+        Eliminates variables by resolution. The clauses containing a variable are replaced by all non-tautological
+        resolvents on it if there are at most as many resolvents as clauses plus the allowed growth. The removed
+        clauses are put on the extension stack with the literal of the variable as witness.
+        """
+        self.__start("variable_elimination")
+        clauses, occurrences = self.clauses, self.occurrences
+        # variables with few occurrences are cheap to eliminate and produce few resolvents
+        candidates = sorted((variable for variable in self.variables if self.values[variable] == 0),
+                            key=lambda variable: len(occurrences[variable]) * len(occurrences[-variable]))
+        for variable in candidates:
+            if self.unsat or self.__out_of_time():
+                return
+            positive, negative = occurrences[variable], occurrences[-variable]
+            num_clauses = len(positive) + len(negative)
+            if self.values[variable] != 0 or num_clauses == 0 or num_clauses > self.elimination_occurrence_limit:
+                continue
+
+            resolvents = self.__resolvents(variable, num_clauses + self.elimination_growth)
+            if resolvents is None:
+                continue
+
+            for literal, cids in ((variable, positive), (-variable, negative)):
+                for cid in list(cids):
+                    self.extension.append((literal, list(clauses[cid])))
+                    self.__remove(cid)
+            for resolvent in resolvents:
+                self.__add(resolvent)
+            self.num_eliminated += 1
+            self.__propagate_units()
+
+    def __resolvents(self, variable: int, limit: int) -> Optional[List[Set[int]]]:
+        """
+        Computes the non-tautological resolvents of the clauses containing a variable.
+        :param variable: The variable to resolve on
+        :param limit: The maximal number of resolvents
+        :return: The resolvents; None if there are more than limit
+        """
+        clauses = self.clauses
+        resolvents = []
+        for positive_cid in self.occurrences[variable]:
+            for negative_cid in self.occurrences[-variable]:
+                resolvent = (clauses[positive_cid] | clauses[negative_cid]) - {variable, -variable}
+                if not any(-literal in resolvent for literal in resolvent):
+                    resolvents.append(resolvent)
+                    if len(resolvents) > limit:
+                        return None
+        return resolvents
@@ -0,0 +1,108 @@
+import pytest
+from second_part.clause_arena import ClauseArena
+from second_part.preprocessor import Preprocessor, TECHNIQUES
+from second_part.solver import DLPPSolver
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole, is_model
+
+
+def only(technique, **kwargs):
+    return Preprocessor(**{name: name == technique for name in TECHNIQUES}, **kwargs)
+
+def test_units():
+    preprocessor = only("units")
+    assert preprocessor.run([[1], [-1, 2], [-2, 3, 4], [5, 6]]) == [[3, 4], [5, 6]]
+    assert preprocessor.num_fixed == 2
+    assert preprocessor.run([[1], [-1, 2], [-2]]) == [[]]
+
+def test_pure_literals():
+    preprocessor = only("pure_literals")
+    # 1 is pure, removing its clauses makes -2 pure as well
+    assert preprocessor.run([[1, 2], [1, 3], [-2, -3], [3, 4], [-3, -4]]) == [[3, 4], [-3, -4]]
+    assert preprocessor.num_pure == 2
+
+def test_subsumption():
+    preprocessor = only("subsumption")
+    assert preprocessor.run([[1, 2, 3], [1, 2], [2, 1, 4], [-1, 3]]) == [[1, 2], [-1, 3]]
+    assert preprocessor.num_subsumed == 2
+
+def test_strengthening():
+    preprocessor = only("strengthening")
+    # [1, 2] strengthens [-1, 2, 3] to [2, 3]
+    assert preprocessor.run([[1, 2], [-1, 2, 3], [-2, -3]]) == [[1, 2], [2, 3], [-2, -3]]
+    assert preprocessor.num_strengthened == 1
+
+def test_variable_elimination():
+    preprocessor = only("variable_elimination")
+    clauses = preprocessor.run([[1, 2], [-1, 3], [2, 3, 4], [-3, -4]])
+    assert preprocessor.num_eliminated > 0
+    assert len(clauses) < 4
+    assert DLPPSolver(clauses).solve()
+
+def test_tautologies_and_duplicates():
+    assert only(None).run([[1, -1, 2], [2, 2, 3, 0]]) == [[2, 3]]
+
+def test_extend_model():
+    clauses = [[1, 2], [-1, 3], [-2, -3], [3, 4, 5], [-4, -5], [-3, 6]]
+    preprocessor = Preprocessor()
+    simplified = preprocessor.run(clauses)
+    solver = DLPPSolver(simplified)
+    assert solver.solve()
+    model = preprocessor.extend_model(solver.get_model())
+    assert set(model) == {1, 2, 3, 4, 5, 6}
+    assert is_model(clauses, model)
+
+def test_unknown_time_budget():
+    with pytest.raises(ValueError):
+        Preprocessor(time_budgets={"probing": 1})
+
+def test_time_budgets_used_up():
+    clauses = [[1, 2, 3], [1, 2], [-1, 3], [-3, 4], [-4]]
+    preprocessor = Preprocessor(time_budgets={technique: 0 for technique in TECHNIQUES})
+    assert sorted(preprocessor.run(clauses)) == sorted(clauses)
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_solve_preprocessed(solver_class):
+    clauses = [[1, 2, 3], [-1, -2], [-1, -3], [-2, -3], [2, 4], [-4, 5, 6], [-5, -6], [6, 7, 8], [-7, 8]]
+    solver = solver_class(clauses, preprocess=True)
+    assert solver.solve()
+    model = solver.get_model()
+    assert set(model) == set(range(1, 9))
+    assert is_model(clauses, model)
+
+    assert not solver_class(pigeonhole(4, 3), preprocess=True).solve()
+    assert not solver_class([[1, 2], [-1], [-2]], preprocess=Preprocessor(units=False)).solve()
+
+def test_run_arena():
+    arena = ClauseArena([[1, 2, 3], [1, 2], [-2, 4]])
+    assert only("subsumption").run(arena) == [[1, 2], [-2, 4]]
+
+def test_equivalences():
+    preprocessor = only("equivalences")
+    # 1, 2 and 3 imply each other, so 2 and 3 are replaced by 1 and -2, -3 by -1
+    clauses = preprocessor.run([[-1, 2], [-2, 3], [-3, 1], [2, 4, 5], [-3, -4], [-5, 6]])
+    assert sorted(clauses) == [[-5, 6], [-1, -4], [1, 4, 5]]
+    assert preprocessor.num_substituted == 2
+    # x1 -> -x1 -> x1
+    assert only("equivalences").run([[1, 2], [-2, -1], [-1, 3], [-3, 2], [-2, 1]]) == [[]]
+
+def test_equivalences_extend_model():
+    clauses = [[-1, -2], [2, 1], [-2, 3], [-3, -1], [3, 4, -5], [-4, 5], [1, 5, 6], [-6, -3, 4]]
+    preprocessor = only("equivalences")
+    solver = DLPPSolver(preprocessor.run(clauses))
+    assert solver.solve()
+    model = preprocessor.extend_model(solver.get_model())
+    assert set(model) == set(range(1, 7))
+    assert is_model(clauses, model)
+
+def test_failed_literals():
+    preprocessor = only("failed_literals")
+    # the roots are 1 and 4. 1 implies 2 and 3, [-2, -3, 4] then implies 4, which falsifies [-2, -4]
+    assert preprocessor.run([[-1, 2], [-1, 3], [-2, -3, 4], [-2, -4], [1, 5, 6]]) == \
+        [[-1, 2], [-1, 3], [-2, -3, 4], [-2, -4], [1, 5, 6], [-1]]
+    assert preprocessor.num_failed == 1
+
+    preprocessor = Preprocessor(pure_literals=False, subsumption=False, strengthening=False,
+                                variable_elimination=False)
+    assert preprocessor.run([[-1, 2], [-1, 3], [-2, -3], [1, 4, 5]]) == [[-2, -3], [4, 5]]
+    assert preprocessor.num_failed == 1
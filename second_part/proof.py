@@ -0,0 +1,364 @@
+import argparse
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# the bytes of a text proof. A proof containing other bytes in its beginning is binary
+TEXT_BYTES = frozenset(b"0123456789- d\n\r\tc")
+
+
+def _encode_binary(literal: int) -> bytes:
+    """
+    Encodes a literal of a binary DRAT proof as variable-length unsigned integer 2 * |literal| + sign.
+    :param literal: The literal
+    :return: Its encoding
+    """
+    value = 2 * abs(literal) + (literal < 0)
+    encoded = bytearray()
+    while value > 127:
+        encoded.append(value & 127 | 128)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+class DRATWriter:
+    """
+    Writes a DRAT proof: the clauses a solver adds to the formula, each of which has to be implied by the formula and
+    the clauses added before, and the clauses it deletes. A proof of unsatisfiability ends with the empty clause. The
+    proof can be written as text or in the compact binary format of drat-trim. It is collected in a buffer and only
+    written when the buffer is full, when the empty clause was added or when the writer is flushed or closed.
+    """
+    def __init__(self, target: Union[str, BinaryIO], binary=False, buffer_size=1 << 16):
+        """
+        Initializes the writer.
+        :param target: The path of the proof file or a binary stream. A stream is flushed but not closed by the writer
+        :param binary: (optional) write the binary format instead of text
+        :param buffer_size: (optional) the number of bytes collected before they are written
+        """
+        self.owns_stream = isinstance(target, str)
+        self.stream = open(target, "wb") if self.owns_stream else target
+        self.binary = binary
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        # the binary encodings of the literals written so far
+        self.__codes: Dict[int, bytes] = {}
+
+        self.num_added = 0
+        self.num_deleted = 0
+
+    def __enter__(self) -> "DRATWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __write(self, prefix: bytes, literals: Iterable[int]):
+        if self.binary:
+            codes = self.__codes
+            encoded = []
+            for literal in literals:
+                code = codes.get(literal)
+                if code is None:
+                    code = codes[literal] = _encode_binary(literal)
+                encoded.append(code)
+            self.buffer += prefix
+            self.buffer += b"".join(encoded)
+            self.buffer += b"\0"
+        else:
+            if prefix == b"d":
+                self.buffer += b"d "
+            self.buffer += " ".join([*map(str, literals), "0\n"]).encode()
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def add(self, literals: Iterable[int]):
+        """
+        Adds a clause to the proof. The empty clause completes a proof of unsatisfiability and is written at once.
+        :param literals: The literals of the clause
+        """
+        literals = list(literals)
+        self.__write(b"a", literals)
+        self.num_added += 1
+        if not literals:
+            self.flush()
+
+    def delete(self, literals: Iterable[int]):
+        """
+        Deletes a clause of the formula or of the proof.
+        :param literals: The literals of the clause
+        """
+        self.__write(b"d", literals)
+        self.num_deleted += 1
+
+    def flush(self):
+        """
+        Writes the buffered part of the proof.
+        """
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.buffer.clear()
+        self.stream.flush()
+
+    def close(self):
+        """
+        Writes the rest of the proof and closes the file if the writer opened it.
+        """
+        if self.stream.closed:
+            return
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+
+def parse_drat(data: bytes, binary: Optional[bool] = None) -> Iterator[Tuple[bool, List[int]]]:
+    """
+    Parses a DRAT proof.
+    :param data: The proof
+    :param binary: (optional) whether the proof is binary. By default it is detected from its first bytes
+    :return: An iterator over the steps of the proof as the pair of whether it is a deletion and the literals
+    """
+    if binary is None:
+        binary = not set(data[:256]) <= TEXT_BYTES
+    if binary:
+        position = 0
+        while position < len(data):
+            kind = data[position]
+            if kind not in b"ad":
+                raise ValueError(f"invalid binary proof step {kind!r} at byte {position}")
+            position += 1
+            literals = []
+            value = shift = 0
+            while True:
+                if position == len(data):
+                    raise ValueError("the last clause of the binary proof is not terminated")
+                byte = data[position]
+                position += 1
+                value |= (byte & 127) << shift
+                shift += 7
+                if byte & 128:
+                    continue
+                if value == 0:
+                    break
+                literals.append(-(value >> 1) if value & 1 else value >> 1)
+                value = shift = 0
+            yield kind == ord("d"), literals
+        return
+
+    deletion = False
+    literals = []
+    for token in data.split():
+        if token == b"d":
+            deletion = True
+        elif token == b"0":
+            yield deletion, literals
+            deletion = False
+            literals = []
+        else:
+            try:
+                literals.append(int(token))
+            except ValueError:
+                raise ValueError(f"invalid token {token!r} in proof") from None
+    if literals or deletion:
+        raise ValueError("the last clause of the proof is not terminated by a 0")
+
+
+class DRATChecker:
+    """
+    Checks a DRAT proof forwards. Every added clause has to be a reverse unit propagation (RUP) clause, i.e. unit
+    propagation has to find a conflict when all its literals are False, or a resolution asymmetric tautology (RAT) on
+    its first literal, i.e. every resolvent with a clause containing the negation of the first literal has to be
+    RUP. Unit propagation uses two watched literals per clause, the assignment is undone after every check.
+    """
+    def __init__(self, clauses: Iterable[Iterable[int]]):
+        """
+        Initializes the checker with the clauses of the formula.
+        :param clauses: The clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+        """
+        self.clauses: List[Optional[List[int]]] = []
+        # the references of the clauses that are not deleted by their sorted literals
+        self.index: Dict[Tuple[int, ...], List[int]] = {}
+        self.watches: Dict[int, List[int]] = {}
+        self.occurrences: Dict[int, List[int]] = {}
+        self.units: List[int] = []
+        self.has_empty_clause = False
+        self.values: Dict[int, bool] = {}
+
+        for clause in clauses:
+            self.add(clause)
+
+    def add(self, literals: Iterable[int]):
+        """
+        Adds a clause without checking it.
+        :param literals: The literals of the clause
+        """
+        clause = list(dict.fromkeys(literal for literal in literals if literal != 0))
+        cref = len(self.clauses)
+        self.clauses.append(clause)
+        self.index.setdefault(tuple(sorted(clause)), []).append(cref)
+        for literal in clause:
+            self.occurrences.setdefault(literal, []).append(cref)
+        if len(clause) == 0:
+            self.has_empty_clause = True
+        elif len(clause) == 1:
+            self.units.append(cref)
+        else:
+            self.watches.setdefault(clause[0], []).append(cref)
+            self.watches.setdefault(clause[1], []).append(cref)
+
+    def delete(self, literals: Iterable[int]) -> bool:
+        """
+        Deletes a clause. Deleted clauses are removed from the watch lists and occurrences when they are visited.
+        :param literals: The literals of the clause
+        :return: False if there is no such clause
+        """
+        crefs = self.index.get(tuple(sorted(set(literals))))
+        if not crefs:
+            return False
+        cref = crefs.pop()
+        if len(self.clauses[cref]) == 1:
+            self.units.remove(cref)
+        self.clauses[cref] = None
+        return True
+
+    def __propagate(self, trail: List[int]) -> bool:
+        """
+        Propagates the literals on the trail, which are True, and appends the implied literals to it.
+        :param trail: The True literals
+        :return: True if a conflict was found
+        """
+        values, clauses, watches = self.values, self.clauses, self.watches
+        head = 0
+        while head < len(trail):
+            false_literal = -trail[head]
+            head += 1
+            watching = watches.get(false_literal)
+            if not watching:
+                continue
+            kept = []
+            for i, cref in enumerate(watching):
+                clause = clauses[cref]
+                if clause is None:
+                    continue
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if values.get(other) is True:
+                    kept.append(cref)
+                    continue
+                for position in range(2, len(clause)):
+                    literal = clause[position]
+                    if values.get(literal) is not False:
+                        clause[1], clause[position] = literal, false_literal
+                        watches.setdefault(literal, []).append(cref)
+                        break
+                else:
+                    kept.append(cref)
+                    if values.get(other) is False:
+                        kept.extend(watching[i + 1:])
+                        watches[false_literal] = kept
+                        return True
+                    values[other] = True
+                    values[-other] = False
+                    trail.append(other)
+            watches[false_literal] = kept
+        return False
+
+    def is_rup(self, literals: Iterable[int]) -> bool:
+        """
+        Checks whether unit propagation finds a conflict when all literals are False.
+        :param literals: The literals of the clause
+        :return: True if the clause is RUP
+        """
+        values = self.values
+        trail = []
+        try:
+            for literal in [-literal for literal in literals] + [self.clauses[cref][0] for cref in self.units]:
+                value = values.get(literal)
+                if value is False:
+                    return True
+                if value is None:
+                    values[literal] = True
+                    values[-literal] = False
+                    trail.append(literal)
+            return self.__propagate(trail)
+        finally:
+            for literal in trail:
+                del values[literal]
+                del values[-literal]
+
+    def is_rat(self, literals: List[int]) -> bool:
+        """
+        Checks whether a clause is RAT on its first literal.
+        :param literals: The literals of the clause
+        :return: True if the clause is RAT
+        """
+        if not literals:
+            return False
+        pivot = literals[0]
+        candidates = self.occurrences.get(-pivot, [])
+        # deleted clauses are dropped from the occurrences
+        candidates[:] = [cref for cref in candidates if self.clauses[cref] is not None]
+        for cref in candidates:
+            resolvent = literals + [literal for literal in self.clauses[cref] if literal != -pivot]
+            if any(-literal in resolvent for literal in resolvent):
+                continue
+            if not self.is_rup(resolvent):
+                return False
+        return True
+
+    def check(self, steps: Iterable[Tuple[bool, List[int]]]) -> bool:
+        """
+        Checks the steps of a proof and adds or deletes their clauses.
+        :param steps: The steps as pairs of whether it is a deletion and the literals, e.g. from parse_drat
+        :return: True if every added clause is RUP or RAT and the empty clause was added
+        """
+        if self.has_empty_clause:
+            return True
+        for deletion, literals in steps:
+            if deletion:
+                self.delete(literals)
+                continue
+            literals = list(dict.fromkeys(literals))
+            if not self.is_rup(literals) and not self.is_rat(literals):
+                return False
+            self.add(literals)
+            if not literals:
+                return True
+        return False
+
+
+def check_drat(clauses: Iterable[Iterable[int]], proof: Union[bytes, str], binary: Optional[bool] = None) -> bool:
+    """
+    Checks that a DRAT proof shows the unsatisfiability of a formula.
+    :param clauses: The clauses of the formula of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+    :param proof: The proof or the path of the proof file
+    :param binary: (optional) whether the proof is binary. By default it is detected
+    :return: True if the proof is valid and ends with the empty clause
+    """
+    if isinstance(proof, str):
+        with open(proof, "rb") as f:
+            proof = f.read()
+    return DRATChecker(clauses).check(parse_drat(proof, binary))
+
+
+def main():
+    # the reader is only needed by the command line and imported here, since it depends on this package
+    from dimacs_reader import DIMACSReader
+
+    parser = argparse.ArgumentParser(description="checks a DRAT proof of the unsatisfiability of a CNF formula")
+    parser.add_argument("formula", help="the CNF file")
+    parser.add_argument("proof", help="the text or binary DRAT proof")
+    args = parser.parse_args()
+
+    reader = DIMACSReader()
+    reader.read(args.formula)
+    if check_drat(reader.get_clauses(), args.proof):
+        print("s VERIFIED")
+    else:
+        print("s NOT VERIFIED")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import io
+import os
+import random
+import subprocess
+import sys
+import pytest
+from second_part.proof import DRATWriter, DRATChecker, check_drat, parse_drat
+from second_part.solver import DLPPSolver
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole
+
+
+def write_proof(steps, binary, buffer_size=1 << 16):
+    stream = io.BytesIO()
+    with DRATWriter(stream, binary=binary, buffer_size=buffer_size) as writer:
+        for deletion, literals in steps:
+            if deletion:
+                writer.delete(literals)
+            else:
+                writer.add(literals)
+    return stream.getvalue()
+
+def test_text_format():
+    assert write_proof([(False, [1, -2]), (True, [3, 4, -5]), (False, [])], binary=False) == b"1 -2 0\nd 3 4 -5 0\n0\n"
+
+def test_binary_format():
+    # 2 * 1 = 2, 2 * 2 + 1 = 5 and 2 * 100 = 200, which needs two bytes
+    assert write_proof([(False, [1, -2]), (True, [100]), (False, [])], binary=True) == \
+        b"a\x02\x05\x00d\xc8\x01\x00a\x00"
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_round_trip(binary):
+    rng = random.Random(3)
+    steps = [(rng.random() < 0.3, [rng.choice([-1, 1]) * rng.randint(1, 5000) for _ in range(rng.randint(0, 6))])
+             for _ in range(200)]
+    data = write_proof(steps, binary, buffer_size=32)
+    assert list(parse_drat(data)) == steps
+
+def test_writer_closes_only_its_own_files(tmp_path):
+    stream = io.BytesIO()
+    DRATWriter(stream).close()
+    assert not stream.closed
+
+    with DRATWriter(str(tmp_path / "proof.drat")) as writer:
+        writer.add([1])
+        stream = writer.stream
+    assert stream.closed
+    assert (tmp_path / "proof.drat").read_bytes() == b"1 0\n"
+
+def test_empty_clause_is_flushed_at_once():
+    stream = io.BytesIO()
+    writer = DRATWriter(stream)
+    writer.add([1, 2])
+    assert stream.getvalue() == b""
+    writer.add([])
+    assert stream.getvalue() == b"1 2 0\n0\n"
+
+def test_checker():
+    clauses = [[1, 2], [1, -2], [-1, 2], [-1, -2]]
+    assert check_drat(clauses, b"1 0\n0\n")
+    # -2 is not implied by unit propagation
+    assert not check_drat([[1, 2], [-1, 2]], b"-2 0\n0\n")
+    # a proof has to end with the empty clause
+    assert not check_drat(clauses, b"1 0\n")
+
+def test_checker_rat():
+    # x3 <-> -x1 is a definition of the fresh variable 3, i.e. RAT on 3, but not implied by the formula
+    checker = DRATChecker([[1, 2]])
+    assert not checker.is_rup([3, 1])
+    assert checker.is_rat([3, 1])
+    assert checker.check([(False, [3, 1]), (False, [-3, -1])]) is False
+    assert len(checker.clauses) == 3
+
+def test_checker_deletion():
+    checker = DRATChecker([[1, 2], [-1, 2], [-2]])
+    assert checker.is_rup([])
+    checker.delete([2, -1])
+    assert not checker.is_rup([])
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+@pytest.mark.parametrize("binary", [False, True])
+def test_pigeonhole_proof(solver_class, binary):
+    clauses = pigeonhole(6, 5)
+    stream = io.BytesIO()
+    with DRATWriter(stream, binary=binary) as writer:
+        assert solver_class(clauses, proof=writer).solve() is False
+    assert check_drat(clauses, stream.getvalue())
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_random_proofs(solver_class):
+    rng = random.Random(20)
+    num_unsatisfiable = 0
+    for _ in range(40):
+        num_variables = rng.randint(3, 10)
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(3)]
+                   for _ in range(6 * num_variables)]
+        stream = io.BytesIO()
+        # the learned clauses are reduced often, so that the proof contains deletions
+        options = {"reduce_interval": 3, "reduce_increment": 1, "glue_lbd": 0} if solver_class is CDCLSolver else {}
+        solver = solver_class(clauses, proof=DRATWriter(stream), heuristic=rng.choice(["vsids", "random"]), **options)
+        if not solver.solve():
+            num_unsatisfiable += 1
+            solver.proof.close()
+            assert check_drat(clauses, stream.getvalue())
+    assert num_unsatisfiable > 10
+
+def test_proof_requires_original_formula():
+    with pytest.raises(ValueError):
+        CDCLSolver([[1, 2]], preprocess=True, proof=DRATWriter(io.BytesIO()))
+    with pytest.raises(ValueError):
+        CDCLSolver([[1, 2]], proof=DRATWriter(io.BytesIO())).add_clause([-1])
+
+def test_command_line(tmp_path):
+    clauses = pigeonhole(4, 3)
+    formula = tmp_path / "formula.cnf"
+    lines = [" ".join(map(str, clause)) + " 0\n" for clause in clauses]
+    formula.write_text(f"p cnf 12 {len(clauses)}\n" + "".join(lines))
+    proof = tmp_path / "proof.drat"
+    with DRATWriter(str(proof), binary=True) as writer:
+        CDCLSolver(clauses, proof=writer).solve()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-m", "second_part.proof", str(formula), str(proof)], cwd=root,
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "s VERIFIED" in result.stdout
+
+    proof.write_bytes(b"1 0\n0\n")
+    result = subprocess.run([sys.executable, "-m", "second_part.proof", str(formula), str(proof)], cwd=root,
+                            capture_output=True, text=True)
+    assert result.returncode == 1
@@ -0,0 +1,166 @@
+from collections import deque
+from typing import Union
+
+
+def luby(index: int) -> int:
+    """
+    Computes an element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    :param index: The index of the element starting at 0
+    :return: The element of the sequence
+    """
+    # finds the finite subsequence of length 2^k - 1 that contains the index
+    size, exponent = 1, 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+
+    # and descends into its halves until the index points to the last element of one of them
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        exponent -= 1
+        index = index % size
+
+    return 2 ** exponent
+
+
+class RestartPolicy:
+    """
+    Interface of the policies that decide when the CDCL Solver restarts its search. After every conflict the solver
+    reports the literal block distance (LBD) of the learned clause and asks the policy whether it should restart.
+    """
+    def conflict(self, lbd: int):
+        """
+        Called by the solver after every conflict.
+        :param lbd: The literal block distance of the learned clause, i.e. the number of decision levels among its
+        literals
+        """
+
+    def should_restart(self) -> bool:
+        """
+        :return: True if the solver should restart now
+        """
+        return False
+
+    def restarted(self):
+        """
+        Called by the solver after it restarted.
+        """
+
+
+class NoRestarts(RestartPolicy):
+    """
+    Never restarts.
+    """
+
+
+class LubyRestarts(RestartPolicy):
+    """
+    Restarts after a number of conflicts that follows the Luby sequence scaled by a unit.
+    """
+    def __init__(self, unit: int = 100):
+        """
+        :param unit: (optional) the number of conflicts corresponding to an element 1 of the sequence
+        """
+        if unit < 1:
+            raise ValueError("unit has to be at least 1")
+        self.unit = unit
+        self.num_restarts = 0
+        self.conflicts = 0
+        self.limit = unit * luby(0)
+
+    def conflict(self, lbd: int):
+        self.conflicts += 1
+
+    def should_restart(self) -> bool:
+        return self.conflicts >= self.limit
+
+    def restarted(self):
+        self.num_restarts += 1
+        self.conflicts = 0
+        self.limit = self.unit * luby(self.num_restarts)
+
+
+class GeometricRestarts(RestartPolicy):
+    """
+    Restarts after a number of conflicts that grows geometrically.
+    """
+    def __init__(self, first: int = 100, factor: float = 1.5):
+        """
+        :param first: (optional) the number of conflicts before the first restart
+        :param factor: (optional) the factor by which the number of conflicts grows after every restart
+        """
+        if first < 1 or factor < 1:
+            raise ValueError("first and factor have to be at least 1")
+        self.factor = factor
+        self.conflicts = 0
+        self.limit = float(first)
+
+    def conflict(self, lbd: int):
+        self.conflicts += 1
+
+    def should_restart(self) -> bool:
+        return self.conflicts >= self.limit
+
+    def restarted(self):
+        self.conflicts = 0
+        self.limit *= self.factor
+
+
+class GlucoseRestarts(RestartPolicy):
+    """
+    Restarts as soon as the learned clauses get worse than usual, i.e. when the average LBD of the last learned
+    clauses times a margin exceeds the average LBD of all learned clauses.
+    """
+    def __init__(self, window: int = 50, margin: float = 0.8):
+        """
+        :param window: (optional) the number of recent learned clauses whose LBDs are averaged. At least as many
+        conflicts have to pass between two restarts
+        :param margin: (optional) the factor applied to the recent average before comparing it to the total average
+        """
+        if window < 1 or not 0 < margin <= 1:
+            raise ValueError("window has to be at least 1 and margin has to be in (0, 1]")
+        self.margin = margin
+        self.recent = deque(maxlen=window)
+        self.recent_sum = 0
+        self.total_sum = 0
+        self.total_conflicts = 0
+
+    def conflict(self, lbd: int):
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_sum -= self.recent[0]
+        self.recent.append(lbd)
+        self.recent_sum += lbd
+        self.total_sum += lbd
+        self.total_conflicts += 1
+
+    def should_restart(self) -> bool:
+        if len(self.recent) < self.recent.maxlen:
+            return False
+        return self.recent_sum / len(self.recent) * self.margin > self.total_sum / self.total_conflicts
+
+    def restarted(self):
+        self.recent.clear()
+        self.recent_sum = 0
+
+
+RESTART_POLICIES = {
+    "none": NoRestarts,
+    "luby": LubyRestarts,
+    "geometric": GeometricRestarts,
+    "glucose": GlucoseRestarts,
+}
+
+
+def make_restart_policy(policy: Union[str, RestartPolicy], **kwargs) -> RestartPolicy:
+    """
+    Creates a restart policy.
+    :param policy: Either the name of a policy in RESTART_POLICIES or an instance of a policy, which is returned
+    as it is
+    :param kwargs: Arguments passed on to the constructor of a policy given by name
+    :return: The restart policy
+    """
+    if isinstance(policy, RestartPolicy):
+        return policy
+    if policy not in RESTART_POLICIES:
+        raise ValueError(f"unknown restart policy {policy}, choose one of {', '.join(RESTART_POLICIES)}")
+    return RESTART_POLICIES[policy](**kwargs)
@@ -0,0 +1,80 @@
+import pytest
+from second_part.restarts import luby, LubyRestarts, GeometricRestarts, GlucoseRestarts, NoRestarts, \
+    make_restart_policy
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole
+
+
+def conflicts_until_restart(policy, lbd=2):
+    conflicts = 0
+    while True:
+        policy.conflict(lbd)
+        conflicts += 1
+        if policy.should_restart():
+            policy.restarted()
+            return conflicts
+
+def test_luby_sequence():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+def test_luby_restarts():
+    policy = LubyRestarts(unit=10)
+    assert [conflicts_until_restart(policy) for _ in range(7)] == [10, 10, 20, 10, 10, 20, 40]
+
+def test_geometric_restarts():
+    policy = GeometricRestarts(first=10, factor=2)
+    assert [conflicts_until_restart(policy) for _ in range(4)] == [10, 20, 40, 80]
+
+def test_glucose_restarts_on_bad_recent_clauses():
+    policy = GlucoseRestarts(window=5, margin=0.8)
+    for _ in range(100):
+        policy.conflict(2)
+        assert not policy.should_restart()
+    # the recent average of 3.6 times the margin exceeds the total average of about 2.1
+    policy.conflict(10)
+    assert policy.should_restart()
+    policy.restarted()
+    policy.conflict(10)
+    assert not policy.should_restart()
+
+def test_no_restarts():
+    policy = NoRestarts()
+    for _ in range(1000):
+        policy.conflict(3)
+    assert not policy.should_restart()
+
+def test_make_restart_policy():
+    assert isinstance(make_restart_policy("geometric"), GeometricRestarts)
+    with pytest.raises(ValueError):
+        make_restart_policy("sometimes")
+
+def test_solver_restarts_and_keeps_learned_clauses():
+    solver = CDCLSolver(pigeonhole(6, 5), restart_policy=LubyRestarts(unit=1))
+    assert solver.solve() is False
+    assert solver.num_restarts > 0
+    assert len(solver.learned_clauses) > 0
+
+@pytest.mark.parametrize("target_phase", ["target", "best"])
+def test_solver_with_target_phases(target_phase):
+    clauses = [[1, 2, 3], [-1, -2], [-2, -3], [-1, -3], [2, 4], [-4, 1], [4, 5, -6], [6, -5]]
+    solver = CDCLSolver(clauses, target_phase=target_phase, restart_policy=LubyRestarts(unit=1))
+    assert solver.solve() is True
+    model = solver.get_model()
+    assert all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+
+def test_solver_rejects_unknown_target_phase():
+    with pytest.raises(ValueError):
+        CDCLSolver([[1]], target_phase="worst")
+
+def test_decisions_use_default_and_saved_phases():
+    solver = CDCLSolver([[1, 2], [3, 4]], default_phase=False, heuristic="ordered")
+    solver.add_decision(1, solver._pick_phase(1))
+    assert solver.assignment[1] is False
+    solver.backtrack()
+    solver.saved_phases[1] = True
+    assert solver._pick_phase(1) is True
+
+    solver = CDCLSolver([[1, 2], [3, 4]], default_phase=False, phase_saving=False)
+    solver.add_decision(1, True)
+    solver.backtrack()
+    assert solver._pick_phase(1) is False
@@ -1,7 +1,15 @@
-import time
-from typing import Iterable, Dict, List, Tuple, Optional
+from array import array
+from typing import Callable, Iterable, Iterator, Dict, List, Tuple, Optional, Union
 from enum import Enum
 
+from budget import Budget
+from solver_statistics import ProgressHooks, SolverStatistics, profile_method
+
+from .clause_arena import ClauseArena
+from .heuristics import BranchingHeuristic, make_heuristic
+from .preprocessor import Preprocessor
+from .proof import DRATWriter
+
 class Status(Enum):
     """
     Enum for specifying the status of Clauses and CNFs.
@@ -14,19 +22,13 @@ class Status(Enum):
     CONTRADICTION = 2
     UNSATURATED = 3
 
-class ImpossibleAssignmentError(Exception):
-    """
-    Exception raised when an assignment is impossible. E.g. not A should be assigned while A is already assigned
-    """
-    def __init__(self, message):
-        super().__init__()
-
-
 
 class Clause:
     """
     A Clause to be used to compose CNFs e.g. (A OR B OR not C)
     """
+    __slots__ = ("literals", "watch_pointer1", "watch_pointer2")
+
     def __init__(self, literals: List[int]):
         """
         Initializes the Clause
@@ -174,37 +176,294 @@ class DLPPSolver:
     """
     A non-recursive DPLL Solver that uses watch literals to speed up BCP
     """
-    def __init__(self, clauses: List[list[int]], timeout=float("inf")):
+    def __init__(self, clauses: Union[List[list[int]], ClauseArena], timeout=float("inf"), verify=False,
+                 heuristic: Union[str, BranchingHeuristic] = "vsids", phase_saving=True, default_phase=True,
+                 preprocess: Union[bool, Preprocessor] = False, profile=False, proof: Optional[DRATWriter] = None):
         # if len(clauses) == 0:
         #     raise ValueError("literals can not be empty")
 
-        # constructs the clauses and saves them in a list
-        self.clauses = [Clause(literals) for literals in clauses]
+        # the preprocessor simplifies the clauses before they are stored. The model found for the simplified clauses
+        # is extended by it to the variables it removed
+        if preprocess is True:
+            preprocess = Preprocessor()
+        self.preprocessor = preprocess or None
+        if self.preprocessor is not None and proof is not None:
+            raise ValueError("a proof can not be written for a preprocessed formula")
+        if self.preprocessor is not None:
+            clauses = self.preprocessor.run(clauses)
+
+        # constructs the clauses and stores them in one flat arena, in which they are referenced by their index.
+        # Duplicate literals are dropped, since the two watched literals of a clause have to be different. A 0 only
+        # terminates clauses in DIMACS and is dropped as well. An arena, e.g. from DIMACSReader.get_arena, is used
+        # directly and only its clauses with duplicate literals are rewritten in place
+        if isinstance(clauses, ClauseArena):
+            self.clauses = clauses
+            self.__remove_duplicate_literals()
+        else:
+            self.clauses = ClauseArena(
+                (literal for literal in dict.fromkeys(literals) if literal != 0) for literals in clauses)
+
+        # stores all variables that appear in the clauses and stores them in a set. The distinct literals are found
+        # first, since there are far fewer of them than literals. The literals of an arena built from DIMACS still
+        # contain the terminating zeros
+        self.variables = {abs(literal) for literal in set(self.clauses.literals)}
+        self.variables.discard(0)
+
+        # all state of the variables is kept in preallocated lists. The lists indexed by literals have 2n + 1 entries,
+        # so that a positive literal l is found at index l and, by Python's negative indexing, -l at index 2n + 1 - l
+        self.num_variables = max(self.variables, default=0)
+        num_literal_slots = 2 * self.num_variables + 1
+
+        # the watch lists relate every literal to the clauses that currently watch it. The watched literals of a
+        # clause are always its first two literals. When a literal becomes False only the clauses in its watch list
+        # have to be visited. Unit clauses and empty clauses are never watched, they are asserted the first time
+        # propagate is run instead.
+        self.watches = [[] for _ in range(num_literal_slots)]
+        # binary clauses are not watched but kept in the implication lists of the binary implication graph: the list
+        # of a literal holds the other literal and the reference of every binary clause containing it. When the
+        # literal becomes False the other literal is implied without visiting the clause in the arena
+        self.binary_implications = [[] for _ in range(num_literal_slots)]
+        self.unit_clauses = []
+        literals = self.clauses.literals
+        for cref, (offset, size) in enumerate(zip(self.clauses.offsets, self.clauses.sizes)):
+            if size > 1:
+                self._watch(literals[offset], literals[offset + 1], cref, size)
+            else:
+                self.unit_clauses.append(cref)
 
-        # stores all variables that appear in the clauses and stores them in a set
-        self.variables = set()
-        for clause in self.clauses:
-            self.variables.update([abs(lit) for lit in clause.literals])
+        # the decision level at which the unit clauses were asserted. None if they still have to be asserted
+        self.__units_level = None
 
-        self.assignment = {}
+        # the value of every literal under the current assignment: 1 if it is True, -1 if it is False and 0 if its
+        # variable is unassigned
+        self.values = [0] * num_literal_slots
         self.decision_level = 0
 
+        # the decision level at which each variable was assigned, the clause that forced its assignment (None for
+        # decisions) and its position on the variable stack. Entries of unassigned variables are stale and only
+        # overwritten on the next assignment
+        self.levels = [0] * (self.num_variables + 1)
+        self.reasons = [None] * (self.num_variables + 1)
+        self.trail_positions = [0] * (self.num_variables + 1)
+
         # the variable stack stores all variables assigned by decision and by bcp so that they can be undone
-        # in the correct order
+        # in the correct order. It doubles as the propagation queue: all variables from the propagation head
+        # onwards were assigned but their consequences were not propagated yet
         self.variable_stack = []
+        self.propagation_head = 0
+
+        # the clause found to be False by the last propagation. It is kept until the conflict is backtracked
+        self.conflict = None
 
         # the backtracking relates the decision levels to the indices in the variable stack
         # The first element is the starting signifies the variables that are forced by the initial BCP
         self.backtracking_stack = [0]
 
-        self.timeout = timeout
-        self.num_decisions = 0
+        # the budget limits every call of solve. A call that used it up or was interrupted returns None and is
+        # resumed by the next call with the same assumptions
+        self.budget = Budget(seconds=timeout)
+        self.stop_reason = None
+        self.__interrupt_requested = False
+        self.__resumable = False
+        self.__assumptions = []
+
+        # the statistics count decisions, propagated literals, conflicts and backtracks. If profile is set, the time
+        # spent in propagation and in choosing decisions is measured as well. The hooks are called every N conflicts
+        self.stats = SolverStatistics()
+        self.progress_hooks = ProgressHooks()
+        if profile:
+            profile_method(self, "propagate", self.stats, "bcp_time")
+            profile_method(self, "_pick_branch_variable", self.stats, "decision_time")
+            profile_method(self, "_pick_phase", self.stats, "decision_time")
+
+        # if verify is set every status is cross-checked against a full evaluation of the formula
+        self.verify = verify
+
+        # the branching heuristic chooses the decision variables
+        self.heuristic = make_heuristic(heuristic)
+        self.heuristic.setup(self.variables)
+
+        # decisions assign the default phase unless phase saving is enabled and the variable was assigned before.
+        # In that case the value it had before it was unassigned the last time is used
+        self.phase_saving = phase_saving
+        self.default_phase = default_phase
+        self.saved_phases = [default_phase] * (self.num_variables + 1)
+
+        # the assumptions of the last call of solve that made the formula unsatisfiable
+        self.core = []
+
+        # the decisions of the search that were not flipped yet, kept so that a stopped search can be resumed
+        self._flips = []
+
+        # the DRAT proof receives the clauses derived by the search, which are checked against the original formula
+        self.proof = proof
+
+    def __remove_duplicate_literals(self):
+        """
+        Removes duplicate literals from the clauses of the arena by moving the remaining literals to the front of the
+        clause and shrinking its size.
+        """
+        literals, sizes = self.clauses.literals, self.clauses.sizes
+        for cref, (offset, size) in enumerate(zip(self.clauses.offsets, sizes)):
+            if size > 1:
+                clause = literals[offset:offset + size]
+                if len(set(clause)) < size:
+                    unique = array("i", dict.fromkeys(clause))
+                    literals[offset:offset + len(unique)] = unique
+                    sizes[cref] = len(unique)
+
+    def add_clause(self, literals: Iterable[int]):
+        """
+        Adds a clause to the formula, e.g. between two calls of solve. Everything the solver derived so far stays
+        valid, since the formula only becomes more constrained. Variables that do not occur in the formula yet are
+        added to it.
+        :param literals: The literals of the clause, e.g. [-1, 3]
+        """
+        if self.preprocessor is not None:
+            raise ValueError("clauses can not be added to a preprocessed formula")
+        if self.proof is not None:
+            raise ValueError("clauses can not be added while a proof is written, since they do not follow from the "
+                             "formula")
+        literals = [literal for literal in dict.fromkeys(literals) if literal != 0]
+        # the variables are added even for a tautology, like the constructor does, so that they are in the model
+        self._add_variables(abs(literal) for literal in literals)
+        distinct_literals = set(literals)
+        if any(-literal in distinct_literals for literal in literals):
+            # tautologies are satisfied by every assignment
+            return
+
+        self.backtrack(0)
+        self.__resumable = False
+
+        # the literals that are not False at level zero are moved to the front. If the first two of them can be
+        # watched, the watch invariant holds without propagating the assignments at level zero again. Otherwise the
+        # clause is unit or False at level zero and is asserted with the unit clauses by the next propagation
+        values = self.values
+        literals.sort(key=lambda literal: values[literal] < 0)
+        cref = self.clauses.add(literals)
+        if len(literals) > 1 and values[literals[1]] >= 0:
+            self._watch(literals[0], literals[1], cref, len(literals))
+        else:
+            self.unit_clauses.append(cref)
+            self.__units_level = None
+
+    def _watch(self, first: int, second: int, cref: int, size: int):
+        """
+        Watches the first two literals of a clause, or puts a binary clause into the implication lists.
+        :param first: The first literal of the clause
+        :param second: The second literal of the clause
+        :param cref: The reference of the clause
+        :param size: The number of literals of the clause, at least two
+        """
+        if size == 2:
+            self.binary_implications[first].append((second, cref))
+            self.binary_implications[second].append((first, cref))
+        else:
+            self.watches[first].append(cref)
+            self.watches[second].append(cref)
+
+    def _add_variables(self, variables: Iterable[int]):
+        """
+        Adds the variables that do not occur in the formula yet to the solver and to the branching heuristic.
+        :param variables: The variables, which may already occur in the formula
+        """
+        new_variables = set(variables) - self.variables
+        if not new_variables:
+            return
+        if max(new_variables) > self.num_variables:
+            self._resize(max(new_variables))
+        self.variables |= new_variables
+        self.heuristic.add_variables(new_variables)
+
+    def _resize(self, num_variables: int):
+        """
+        Makes room for the variables up to num_variables in the lists indexed by variables and literals.
+        :param num_variables: The new highest variable
+        """
+        added = num_variables - self.num_variables
+        # the slots of the new literals are inserted between those of the positive and the negative literals, so
+        # that every negative literal keeps its index counted from the end
+        middle = self.num_variables + 1
+        self.values[middle:middle] = [0] * (2 * added)
+        self.watches[middle:middle] = [[] for _ in range(2 * added)]
+        self.binary_implications[middle:middle] = [[] for _ in range(2 * added)]
+
+        self.levels.extend([0] * added)
+        self.reasons.extend([None] * added)
+        self.trail_positions.extend([0] * added)
+        self.saved_phases.extend([self.default_phase] * added)
+        self.num_variables = num_variables
+
+    @property
+    def num_decisions(self) -> int:
+        return self.stats.decisions
+
+    @property
+    def num_conflicts(self) -> int:
+        return self.stats.conflicts
+
+    @property
+    def num_propagations(self) -> int:
+        """
+        The number of assigned literals whose consequences were propagated.
+        """
+        return self.stats.propagations
+
+    def add_hook(self, callback: Callable[["DLPPSolver"], None], every=1000):
+        """
+        Registers a callback that is called with the solver every few conflicts, e.g. to report the progress from
+        the statistics of the solver.
+        :param callback: The function to call
+        :param every: (optional) the number of conflicts between two calls
+        """
+        self.progress_hooks.add(callback, every, self.stats.conflicts)
+
+    @property
+    def assignment(self) -> Dict[int, bool]:
+        """
+        The current assignment as a dictionary of the assigned variables and their values. It is built on every access.
+        """
+        values = self.values
+        return {variable: values[variable] > 0 for variable in self.variable_stack}
 
     def is_sat(self) -> Status:
         """
-        Checks if the current assignment
-        :param assignment:
-        :return:
+        Returns the status of the formula under the current assignment in constant time. It is derived from the
+        last propagation: a conflict makes the formula CONTRADICTION and a completely propagated assignment of all
+        variables without a conflict makes it SATISFIED. Everything else is UNSATURATED.
+        :return: Status of the formula under the current assignment
+        """
+        if self.conflict is not None:
+            status = Status.CONTRADICTION
+        elif self.__units_level is not None and \
+                self.propagation_head == len(self.variable_stack) == len(self.variables):
+            status = Status.SATISFIED
+        else:
+            status = Status.UNSATURATED
+
+        if self.verify:
+            self.__verify_status(status)
+
+        return status
+
+    def __verify_status(self, status: Status):
+        """
+        Checks the incrementally tracked status against a full evaluation of the formula.
+        :param status: The incrementally tracked status
+        """
+        full_status = self.__evaluate_formula()
+        if status == Status.SATISFIED and full_status != Status.SATISFIED:
+            raise RuntimeError(f"formula is {full_status.name} although all variables are assigned without conflict")
+        if status == Status.CONTRADICTION and self.__clause_status(self.conflict) != Status.CONTRADICTION:
+            raise RuntimeError("conflicting clause is not False under the current assignment")
+        if status == Status.UNSATURATED and self.propagation_head == len(self.variable_stack) \
+                and self.__units_level is not None and full_status == Status.CONTRADICTION:
+            raise RuntimeError("propagation missed a clause that is False under the current assignment")
+
+    def __evaluate_formula(self) -> Status:
+        """
+        Checks every clause against the current assignment.
+        :return: Status of the formula under the current assignment
         """
 
         is_at_least_one_clause_unsaturated = False
@@ -212,8 +471,8 @@ class DLPPSolver:
         # iterate through all clauses and if one clause is false under the assignment
         # then CONTRADICTION is returned. If not and all variables that appear in all clauses are
         # assigned then the CNF is true. If not all variables are assigned, then the CNF is not yet decided
-        for clause in self.clauses:
-            clause_status = clause.is_sat(self.assignment)
+        for cref in self.clauses.crefs(learned=False):
+            clause_status = self.__clause_status(cref)
             if clause_status == Status.CONTRADICTION:
                 return Status.CONTRADICTION
             elif clause_status == Status.UNSATURATED:
@@ -223,10 +482,24 @@ class DLPPSolver:
             return Status.SATISFIED
 
         return Status.UNSATURATED
+
+    def __clause_status(self, cref: int) -> Status:
+        """
+        Checks a clause against the current assignment.
+        :param cref: The reference of the clause
+        :return: Status of the clause under the current assignment
+        """
+        status = Status.CONTRADICTION
+        for literal in self.clauses[cref]:
+            if self.values[literal] > 0:
+                return Status.SATISFIED
+            elif self.values[literal] == 0:
+                status = Status.UNSATURATED
+        return status
     
     def add_decision(self, variable: int, value: bool):
         """
-        Adds a decision variable to the solver.
+        Adds a decision variable to the solver. Its consequences are derived by the next call of propagate.
         :param variable:  The variable to add.
         :param value: The value of the variable to add: {True, False}
         """
@@ -234,106 +507,372 @@ class DLPPSolver:
             raise ValueError("variable has to be greater than 0")
         if variable not in self.variables:
             raise ValueError("assignment is not possible, since the variable is not contained in the formula")
-        if variable in self.assignment.keys():
+        if self.values[variable] != 0:
             raise ValueError("assigned variables can not be assigned again")
 
-        self.num_decisions += 1
+        self.stats.decisions += 1
 
         # we increase the decision level by 1 and add the new variable to the stack. Further we append a new element
         # to the backtracking stack and set it to the length of the variable stack, so that it points to the end
         # of the variable stack
         self.decision_level += 1
+        self.trail_positions[variable] = len(self.variable_stack)
         self.variable_stack.append(variable)
         self.backtracking_stack.append(len(self.variable_stack))
 
         # the variable and its value are added to the current assignment
-        self.assignment[variable] = value
+        literal = variable if value else -variable
+        self.values[literal] = 1
+        self.values[-literal] = -1
+        self.levels[variable] = self.decision_level
+        self.reasons[variable] = None
 
-        # we also need to reset the watch pointers for each clause ... could be improved by tracking the relations
-        # of clauses and variables
-        for clause in self.clauses:
-            clause.set_watchers(self.assignment, variable)
-
-    def backtrack(self):
+    def backtrack(self, level: Optional[int] = None):
         """
         Resets the state of the Solver to the state before the previous decision.
+        :param level: (optional) the decision level to go back to. Defaults to the previous decision level
         :return:
         """
+        if level is None:
+            level = self.decision_level - 1
 
-        # if decision level is zero, the method is idempotent
-        if self.decision_level == 0:
+        # if the decision level is already reached (e.g. decision level zero), the method is idempotent
+        if level < 0 or level >= self.decision_level:
             return
+        self.stats.backtracks += 1
 
         # we retrieve all variables in the assignment that we need to remove with the help of the variable stack and the
-        # backtracking stack. We then remove them peu a peu.
-        to_remove_variables = self.variable_stack[self.backtracking_stack[-2]:]
-        for variable in to_remove_variables:
-            del self.assignment[variable]
-
-        # Also the variable stack and the backtracking stack have to be popped respectively
-        self.variable_stack = self.variable_stack[:self.backtracking_stack[-2]]
-        self.backtracking_stack = self.backtracking_stack[:-1]
-
-        # the decision level is also decreased by 1
-        self.decision_level -= 1
-        
-    def bcp(self) -> Dict[int, bool]:
+        # backtracking stack. These are the decision of the level after the target level and everything that was
+        # assigned after it. We then remove them peu a peu.
+        decision_index = self.backtracking_stack[level + 1] - 1
+        values, variable_stack, unassigned = self.values, self.variable_stack, self.heuristic.unassigned
+        for position in range(len(variable_stack) - 1, decision_index - 1, -1):
+            variable = variable_stack[position]
+            if self.phase_saving:
+                self.saved_phases[variable] = values[variable] > 0
+            values[variable] = 0
+            values[-variable] = 0
+            unassigned(variable)
+
+        # Also the variable stack and the backtracking stack are truncated in place. Everything that remains
+        # on the variable stack was propagated before the decision was made
+        del variable_stack[decision_index:]
+        del self.backtracking_stack[level + 1:]
+        self.propagation_head = min(self.propagation_head, len(self.variable_stack))
+        self.conflict = None
+
+        # the decision level is also decreased
+        self.decision_level = level
+
+        # unit clauses that were asserted after a decision are lost with it and have to be asserted again
+        if self.__units_level is not None and self.__units_level > self.decision_level:
+            self.__units_level = None
+
+    def propagate(self) -> Optional[int]:
         """
-        This runs a single loop of BCP on the CNF. To get all forced assignments
-        this needs to be run until {} is returned.
-        :return: The forced assignments from a single iteration of BCP
+        Runs BCP until no further assignments are forced or a conflict is found. The variables on the variable stack
+        are used as a propagation queue, so that every assigned variable is processed exactly once and only the
+        clauses watching the literal it falsified are visited.
+        :return: The reference of the clause that is False under the current assignment if a conflict was found;
+        None else
         """
+        if self.conflict is not None:
+            return self.conflict
+
+        literals, offsets, sizes = self.clauses.literals, self.clauses.offsets, self.clauses.sizes
+
+        if self.__units_level is None:
+            self.__units_level = self.decision_level
+            for cref in self.unit_clauses:
+                # the empty clause is always false
+                if sizes[cref] == 0:
+                    self.conflict = cref
+                    return cref
+
+                literal = literals[offsets[cref]]
+                if self.values[literal] == 0:
+                    self._assign(literal, cref)
+                elif self.values[literal] < 0:
+                    self.conflict = cref
+                    return cref
+
+        values = self.values
+        watches = self.watches
+        binary_implications = self.binary_implications
+        variable_stack, levels, reasons = self.variable_stack, self.levels, self.reasons
+        trail_positions, decision_level = self.trail_positions, self.decision_level
+        head = self.propagation_head
+        while self.propagation_head < len(self.variable_stack):
+            variable = self.variable_stack[self.propagation_head]
+            self.propagation_head += 1
+            false_literal = -variable if values[variable] > 0 else variable
+
+            # the binary clauses are propagated first, they only need the value of the implied literal. The
+            # assignment is inlined and the implied literal is moved to the first position of its reason, as for the
+            # longer clauses
+            for implied_literal, cref in binary_implications[false_literal]:
+                implied_value = values[implied_literal]
+                if implied_value == 0:
+                    start = offsets[cref]
+                    literals[start] = implied_literal
+                    literals[start + 1] = false_literal
+                    implied_variable = abs(implied_literal)
+                    trail_positions[implied_variable] = len(variable_stack)
+                    variable_stack.append(implied_variable)
+                    values[implied_literal] = 1
+                    values[-implied_literal] = -1
+                    levels[implied_variable] = decision_level
+                    reasons[implied_variable] = cref
+                elif implied_value < 0:
+                    self.conflict = cref
+                    self.stats.propagations += self.propagation_head - head
+                    return cref
+
+            watching_clauses = watches[false_literal]
+            watches[false_literal] = kept_clauses = []
+            for i, cref in enumerate(watching_clauses):
+                # the falsified literal is moved to the second position, so that the first one is the other watched
+                # literal. If the clause becomes unit, this is the literal it implies
+                start = offsets[cref]
+                other_literal = literals[start]
+                if other_literal == false_literal:
+                    other_literal = literals[start + 1]
+                    literals[start] = other_literal
+                    literals[start + 1] = false_literal
+                other_value = values[other_literal]
+
+                # if the other watched literal is True the clause is satisfied and nothing has to be done
+                if other_value > 0:
+                    kept_clauses.append(cref)
+                    continue
+
+                # otherwise a literal that is not False is searched to be watched instead of the falsified one
+                for position in range(start + 2, start + sizes[cref]):
+                    literal = literals[position]
+                    if values[literal] >= 0:
+                        literals[start + 1] = literal
+                        literals[position] = false_literal
+                        watches[literal].append(cref)
+                        break
 
-        forced_assignments = {}
+                # if there is no other literal to watch, the clause is either unit or all of its literals are False
+                else:
+                    kept_clauses.append(cref)
+                    if other_value == 0:
+                        self._assign(other_literal, cref)
+                    else:
+                        kept_clauses.extend(watching_clauses[i + 1:])
+                        self.conflict = cref
+                        self.stats.propagations += self.propagation_head - head
+                        return cref
+
+        self.stats.propagations += self.propagation_head - head
+        return None
+
+    def _assign(self, literal: int, reason: int):
+        """
+        Assigns a literal to True that was forced by BCP and appends it to the propagation queue.
+        :param literal: The literal to make True
+        :param reason: The reference of the clause that forced the assignment
+        """
+        variable = abs(literal)
+        self.trail_positions[variable] = len(self.variable_stack)
+        self.variable_stack.append(variable)
+        self.values[literal] = 1
+        self.values[-literal] = -1
+        self.levels[variable] = self.decision_level
+        self.reasons[variable] = reason
 
-        for clause in self.clauses:
-            # if the clause is satisfied, we can simply go on to the next clause
-            if clause.is_sat(self.assignment) == Status.SATISFIED:
-                continue
+    def _garbage_collect(self):
+        """
+        Frees the memory of the deleted clauses in the arena and updates the clause references held by the solver.
+        Deleted clauses must not be the reason of a current assignment.
+        :return: The new reference of every old clause reference; -1 for the deleted clauses
+        """
+        mapping = self.clauses.garbage_collect()
+        for literal, watching_clauses in enumerate(self.watches):
+            self.watches[literal] = [mapping[cref] for cref in watching_clauses if mapping[cref] >= 0]
+        for literal, implications in enumerate(self.binary_implications):
+            self.binary_implications[literal] = [(implied_literal, mapping[cref]) for implied_literal, cref in
+                                                 implications if mapping[cref] >= 0]
+        self.unit_clauses = [mapping[cref] for cref in self.unit_clauses if mapping[cref] >= 0]
+        for variable in self.variable_stack:
+            if self.reasons[variable] is not None:
+                self.reasons[variable] = mapping[self.reasons[variable]]
+        return mapping
+
+    def _start(self, assumptions: Iterable[int], resume=True) -> List[int]:
+        """
+        Prepares a call of solve by undoing all decisions of the previous call. The clauses learned so far, the
+        scores of the heuristic and the saved phases are kept. If the previous call was stopped by its budget or an
+        interrupt and has the same assumptions, its decisions are kept instead, so that the search is resumed.
+        :param assumptions: The literals that are assumed to be True for this call
+        :param resume: (optional) whether a stopped call may be resumed
+        :return: The assumptions as a list
+        """
+        assumptions = list(assumptions)
+        if 0 in assumptions:
+            raise ValueError("0 is not a literal and can not be assumed")
+        if assumptions and self.preprocessor is not None:
+            raise ValueError("assumptions can not be used with a preprocessed formula")
+
+        self._add_variables(abs(literal) for literal in assumptions)
+        if not (resume and self.__resumable and assumptions == self.__assumptions):
+            self.backtrack(0)
+            self._flips = []
+        self.__resumable = False
+        self.__assumptions = assumptions
+        self.core = []
+        self.stop_reason = None
+        self.budget.start(self.stats)
+        return assumptions
+
+    def set_budget(self, conflicts: Optional[int] = None, propagations: Optional[int] = None,
+                   decisions: Optional[int] = None, memory: Optional[int] = None, seconds=float("inf")):
+        """
+        Replaces the budget of the following calls of solve, including the timeout. None stands for no limit.
+        :param conflicts: (optional) the number of conflicts per call
+        :param propagations: (optional) the number of propagated literals per call
+        :param decisions: (optional) the number of decisions per call
+        :param memory: (optional) the size of the clause database in bytes
+        :param seconds: (optional) the wall-clock time per call
+        """
+        self.budget = Budget(conflicts, propagations, decisions, memory, seconds)
 
-            # we retrieve the forced assignments from the clause and if it is empty we go to the next clause
-            clause_forced_assignment = clause.bcp(self.assignment)
-            if clause_forced_assignment is None:
-                continue
+    def interrupt(self):
+        """
+        Asks the running call of solve to stop, it returns None at its next check. Only a flag is set, so that it can
+        be called from another thread or from a signal handler. If no call is running, the next one stops at once.
+        """
+        self.__interrupt_requested = True
 
-            # if one clause forces an assignment of one variable and another clause forces an assignment of different
-            # polarity of the same variable we have a conflict an throw an Exception
-            if clause_forced_assignment[0] in forced_assignments.keys()\
-                and clause_forced_assignment[1] is not forced_assignments[clause_forced_assignment[0]]:
-                raise ImpossibleAssignmentError("bcp forces different assignments of same variable")
+    def _out_of_budget(self) -> bool:
+        """
+        Checks for an interrupt and whether the budget of the running call is used up.
+        :return: True if the call has to stop. The reason is stored in stop_reason
+        """
+        if self.__interrupt_requested:
+            self.__interrupt_requested = False
+            self.stop_reason = "interrupt"
+            return True
+        self.stop_reason = self.budget.exceeded(self.stats, self.clauses.nbytes)
+        return self.stop_reason is not None
+
+    def _suspend(self) -> None:
+        """
+        Stops the running call of solve so that the next call with the same assumptions resumes it.
+        :return: None, the result of a stopped call
+        """
+        self.__resumable = True
+        return None
 
-            # I think this can be removed, because if something was assigned prior to bcp it should not be able to
-            # assign it again via bcp
-            elif clause_forced_assignment[0] in self.assignment.keys()\
-                and clause_forced_assignment[1] is not self.assignment[clause_forced_assignment[0]]:
-                raise ImpossibleAssignmentError("bcp forces that violates previous assignments")
+    def _assume(self, assumptions: List[int]) -> bool:
+        """
+        Makes the next assumption the decision of a new decision level. The decision level i + 1 always belongs to
+        the assumption i, so that an assumption that already holds gets a level without decision.
+        :param assumptions: The assumptions of the current call of solve
+        :return: False if the assumption is False under the current assignment, which makes the core the failed
+        assumptions; True else
+        """
+        literal = assumptions[self.decision_level]
+        value = self.values[literal]
+        if value == 0:
+            self.add_decision(abs(literal), literal > 0)
+        elif value > 0:
+            # the entry points one past the position the decision would have, like those of the other levels
+            self.decision_level += 1
+            self.backtracking_stack.append(len(self.variable_stack) + 1)
+        else:
+            self.core = self._analyze_final([abs(literal)], assumptions, literal)
+            return False
+        return True
+
+    def _analyze_final(self, variables: Iterable[int], assumptions: List[int], failed: Optional[int] = None) \
+            -> List[int]:
+        """
+        Finds the assumptions the assignments of some variables follow from, by following the reasons of the
+        assignments on the variable stack back to the decisions. All decisions have to be assumptions.
+        :param variables: Assigned variables
+        :param assumptions: The assumptions of the current call of solve
+        :param failed: (optional) an assumption that is False and belongs to the core as well
+        :return: The assumptions found in the order in which they were given
+        """
+        core = set() if failed is None else {failed}
+        seen = set(variables)
+        if self.decision_level > 0:
+            levels, reasons, values = self.levels, self.reasons, self.values
+            # only the variables from level one onwards depend on decisions
+            for position in range(len(self.variable_stack) - 1, self.backtracking_stack[1] - 2, -1):
+                variable = self.variable_stack[position]
+                if variable not in seen:
+                    continue
+                if reasons[variable] is None:
+                    core.add(variable if values[variable] > 0 else -variable)
+                else:
+                    seen.update(abs(literal) for literal in self.clauses[reasons[variable]]
+                                if levels[abs(literal)] > 0)
+        return [literal for literal in dict.fromkeys(assumptions) if literal in core]
+
+    def _decisions(self) -> List[int]:
+        """
+        :return: The decided literals in the order of their levels. Levels of assumptions that already held have none
+        """
+        decisions = []
+        variable_stack, levels, reasons, values = self.variable_stack, self.levels, self.reasons, self.values
+        for level in range(1, self.decision_level + 1):
+            position = self.backtracking_stack[level] - 1
+            if position < len(variable_stack):
+                variable = variable_stack[position]
+                if levels[variable] == level and reasons[variable] is None:
+                    decisions.append(variable if values[variable] > 0 else -variable)
+        return decisions
+
+    def _log_refuted_decisions(self, level: int):
+        """
+        Writes the clauses refuting the current decisions to the proof after a conflict. The decisions d1 ... dk
+        failed and every decision that is not on the search stack anymore was flipped because its opposite value
+        failed before. So each clause -d1 v ... v -di, from i = k down to the decisions up to the given level, is
+        implied by unit propagation on the clauses written before.
+        :param level: The decision level whose decisions are refuted by the last clause. 0 ends with the empty clause
+        """
+        decisions = self._decisions()
+        remaining = sum(1 for literal in decisions if self.levels[abs(literal)] <= level)
+        for index in range(len(decisions), remaining - 1, -1):
+            self.proof.add([-literal for literal in decisions[:index]])
 
-            # if we found some forced variable assignment we add it to the forced assignment dict
-            else:
-                forced_assignments[clause_forced_assignment[0]] = clause_forced_assignment[1]
+    def get_core(self) -> List[int]:
+        """
+        Returns the failed assumptions of the last call of solve.
+        :return: Assumptions that are unsatisfiable together with the formula, in the order in which they were given.
+        Empty if the last call found a model or the formula is unsatisfiable without assumptions
+        """
+        return list(self.core)
 
-        # this is a helper to add the forced assignment to the assignment of the solver and also to update the
-        # watch literals of the clauses
-        self.__add_forced_assignment(forced_assignments)
-        return forced_assignments
-    
-    def __add_forced_assignment(self, assignment: Dict[int, bool]):
-        # here I assume that everything is correct because it is only used in bcp and
-        # there I already checked the validity of the forced assignment
-        for variable, value in assignment.items():
-            self.variable_stack.append(variable)
-            
-            self.assignment[variable] = value
+    def _pick_branch_variable(self) -> Optional[int]:
+        """
+        Chooses the next decision variable with the branching heuristic.
+        :return: An unassigned variable; None if all variables are assigned
+        """
+        return self.heuristic.next_variable(self.values)
 
-            for clause in self.clauses:
-                clause.set_watchers(self.assignment, variable)
+    def _pick_phase(self, variable: int) -> bool:
+        """
+        Chooses the value of a decision variable.
+        :param variable: The decision variable
+        :return: The saved phase of the variable if phase saving is enabled; the default phase else
+        """
+        return self.saved_phases[variable]
 
     def get_model(self) -> Dict[int, bool]:
         """
         Returns the constructed model of the solver.
-        :return: The assignment of the solver if it found a solution; {} else
+        :return: The assignment of the solver as a dictionary if it found a solution; {} else
         """
-        return self.assignment if self.is_sat() == Status.SATISFIED else {}
+        if self.is_sat() != Status.SATISFIED:
+            return {}
+        if self.preprocessor is not None:
+            return self.preprocessor.extend_model(self.assignment)
+        return self.assignment
 
     def get_num_decisions(self):
         """
@@ -342,90 +881,151 @@ class DLPPSolver:
         """
         return self.num_decisions
 
-    def solve(self)->bool:
+    def solve(self, assumptions: Iterable[int] = ()) -> Optional[bool]:
         """
-        Non-recursive implementation of DPLL.
-        :return: True if a model was found, False otherwise.
+        Non-recursive implementation of DPLL. It can be called again, e.g. after adding clauses or with other
+        assumptions, and continues with the scores of the heuristic and the saved phases of the previous calls.
+        :param assumptions: (optional) literals that are assumed to be True for this call only. If the formula is
+        unsatisfiable under them, get_core returns the assumptions that caused it
+        :return: True if a model was found, False if there is none; None if the budget was used up or the solver was
+        interrupted before. The next call with the same assumptions resumes the search
         """
-        start_time = time.perf_counter()
+        assumptions = self._start(assumptions)
 
-        variables = self.variables.copy()
-        variable_stack = []
+        variable_stack = self._flips
         while True:
-            if time.perf_counter() - start_time > self.timeout:
-                raise TimeoutError("Timed out")
-            while True:
-                try:
-                    contradiction_by_bcp = False
-                    forced_assignments = self.bcp()
-                    #print(forced_assignments)
-
-                # if an impossible assignment is forced by bcp we set a flag so that we go on like the state of the
-                # solver is CONTRADICTION
-                except ImpossibleAssignmentError:
-                    contradiction_by_bcp = True
-                    break
-
-                # if no further forced assignment was found we can go on to the next step
-                if forced_assignments == {}:
-                    break
+            if self._out_of_budget():
+                return self._suspend()
 
-            # if we found a model we return it
-            if self.is_sat() == Status.SATISFIED:
-                return True
+            conflict = self.propagate()
 
-            # if we found a contradiction (either by the current assignment or via bcp) we *
-            elif self.is_sat() == Status.CONTRADICTION or contradiction_by_bcp:
+            # if we found a contradiction via bcp we *
+            if conflict is not None:
                 # * either return that no model exists when there is nothing more to do
                 if len(variable_stack) == 0:
+                    # decisions flipped by the search are no assumptions and not explained by reasons. If there are
+                    # any, all assumptions are reported as core
+                    if self.decision_level <= len(assumptions):
+                        self.core = self._analyze_final((abs(literal) for literal in self.clauses[conflict]),
+                                                        assumptions)
+                    else:
+                        self.core = list(dict.fromkeys(assumptions))
+                    # without assumptions every decision is refuted down to the empty clause
+                    if self.proof is not None:
+                        self._log_refuted_decisions(min(self.decision_level, len(assumptions)))
                     return False
 
+                self.stats.conflicts += 1
+                if self.stats.conflicts >= self.progress_hooks.next_call:
+                    self.progress_hooks.call(self, self.stats.conflicts)
+                self.heuristic.conflict(abs(literal) for literal in self.clauses[conflict])
+
                 # * or backtrack and use the top variable from the stack and add it again as a decision with
                 # the opposite polarity
-                variable, dl = variable_stack.pop()
-                while self.decision_level != dl:
-                    self.backtrack()
+                variable, dl, value = variable_stack.pop()
+                if self.proof is not None:
+                    self._log_refuted_decisions(dl + 1)
+                self.backtrack(dl)
 
-                try:
-                    self.add_decision(variable, False)
+                self.add_decision(variable, not value)
 
-                # I think this can also be removed, since we check below if the variable is already in the assignment
-                except ImpossibleAssignmentError:
-                    pass
+            # the assumptions are the first decisions, they are never flipped
+            elif self.decision_level < len(assumptions):
+                if not self._assume(assumptions):
+                    return False
 
-            # if the state of the cnf is not decided yet, *
-            elif self.is_sat() == Status.UNSATURATED:
+            # if we found a model we return it
+            elif self.is_sat() == Status.SATISFIED:
+                return True
 
-                # we add a decision variable ... maybe something more refined could be used here ... to the stack
-                # and also add it to the assignment
-                variable = None
-                for var in sorted(variables):
-                    if var not in self.assignment:
-                        variable = var
-                        break
+            # if the state of the cnf is not decided yet, *
+            else:
+                # we add a decision variable to the stack and also add it to the assignment
+                variable = self._pick_branch_variable()
                 if variable is None:
                     # No variables left unassigned, should not happen normally here
                     raise ValueError("No unassigned variables found")
 
-                variable_stack.append((variable, self.decision_level))
-                #print(variable, self.decision_level)
-                try:
-                    self.add_decision(variable, True)
-
-                # like above I think this can be removed
-                except ImpossibleAssignmentError:
-                    pass
-
-
-
-    
-
+                value = self._pick_phase(variable)
+                variable_stack.append((variable, self.decision_level, value))
+                self.add_decision(variable, value)
 
+    def iter_models(self, projection: Optional[Iterable[int]] = None, limit: Optional[int] = None,
+                    assumptions: Iterable[int] = ()) -> Iterator[Dict[int, bool]]:
+        """
+        Enumerates the models of the formula lazily within this solver. The models are blocked by the decisions
+        instead of blocking clauses: after a model the last decision that was not flipped yet is flipped, like after
+        a conflict in solve, so that the search continues where it found the model and the formula does not grow.
+        Each model is found once and the work per model stays the same however many models were found before.
+        With projection the projected variables are decided first. As soon as one assignment of the other variables
+        completes them to a model, the last projected decision is flipped, so that every projected model is yielded
+        once. The search backtracks chronologically like solve, also in subclasses; their learned clauses are still
+        propagated. Enumeration stops early when the generator is closed or no longer iterated, or when the budget
+        is used up, which sets stop_reason. The solver must not be used otherwise while the generator is running.
+        :param projection: (optional) the variables the models are projected on. Variables that do not occur in the
+        formula take both values
+        :param limit: (optional) the maximal number of models to yield
+        :param assumptions: (optional) literals that are assumed to be True in all models
+        :return: An iterator over the distinct models, restricted to the projection if one is given
+        """
+        if self.preprocessor is not None:
+            raise ValueError("models can not be enumerated for a preprocessed formula")
+        if limit is not None and limit < 0:
+            raise ValueError("limit can not be negative")
+        if projection is not None:
+            projection = list(dict.fromkeys(projection))
+            if any(variable <= 0 for variable in projection):
+                raise ValueError("the projection has to consist of variables greater than 0")
+            self._add_variables(projection)
+        projected = None if projection is None else set(projection)
+
+        assumptions = self._start(assumptions, resume=False)
+        num_models = 0
+
+        # the decisions that can still be flipped, like in solve, and whether they assign projected variables
+        variable_stack = []
+        while limit is None or num_models < limit:
+            if self._out_of_budget():
+                return
+
+            conflict = self.propagate()
+            if conflict is None and self.decision_level < len(assumptions):
+                if not self._assume(assumptions):
+                    return
+                continue
 
+            if conflict is None and self.is_sat() == Status.SATISFIED:
+                values = self.values
+                num_models += 1
+                if projection is None:
+                    yield self.assignment
+                else:
+                    yield {variable: values[variable] > 0 for variable in projection}
+                # the other completions of the projected variables are skipped
+                while variable_stack and not variable_stack[-1][3]:
+                    variable_stack.pop()
+
+            elif conflict is None:
+                variable = None
+                if projected is not None:
+                    variable = next((variable for variable in projection if self.values[variable] == 0), None)
+                if variable is None:
+                    variable = self._pick_branch_variable()
+                value = self._pick_phase(variable)
+                variable_stack.append((variable, self.decision_level, value,
+                                       projected is None or variable in projected))
+                self.add_decision(variable, value)
+                continue
 
-
-
-
-            
-
-
+            else:
+                self.stats.conflicts += 1
+                if self.stats.conflicts >= self.progress_hooks.next_call:
+                    self.progress_hooks.call(self, self.stats.conflicts)
+                self.heuristic.conflict(abs(literal) for literal in self.clauses[conflict])
+
+            # after a model or a conflict the last decision is flipped. Without one all models were found
+            if not variable_stack:
+                return
+            variable, dl, value, _ = variable_stack.pop()
+            self.backtrack(dl)
+            self.add_decision(variable, not value)
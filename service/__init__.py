@@ -0,0 +1,3 @@
+from .client import Job, ServiceResult, SolverClient, solve
+from .protocol import DEFAULT_PORT
+from .server import SolverServer, serve
@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from .protocol import DEFAULT_PORT
+from .server import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m service",
+                                     description="runs a solving service that accepts formulas as lines of JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="the TCP port to listen on")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("-j", "--workers", type=int, help="the number of worker processes, by default the CPUs")
+    parser.add_argument("--timeout", type=float, default=60, help="the time limit per request in seconds")
+    parser.add_argument("--max-queued", type=int, default=64, help="the number of requests waiting for a worker")
+    parser.add_argument("--max-inflight", type=int, default=16, help="the number of open requests per connection")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, num_workers=args.workers, timeout=args.timeout,
+                          max_queued=args.max_queued, max_inflight=args.max_inflight))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
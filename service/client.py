@@ -0,0 +1,273 @@
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .protocol import DEFAULT_PORT, decode, encode
+
+
+class ServiceResult(NamedTuple):
+    # True or False; None if the request was not solved, see status
+    satisfiable: Optional[bool]
+    model: Dict[int, bool]
+    # one of protocol.STATUSES
+    status: str
+    # the exceeded limit of the budget or "interrupt" for UNKNOWN and CANCELLED; None else
+    stop_reason: Optional[str]
+    # the assumptions that made the formula unsatisfiable
+    core: List[int]
+    stats: Dict[str, float]
+    seconds: float
+    error: Optional[str]
+
+
+def _result(message: Dict[str, Any]) -> ServiceResult:
+    """
+    :param message: A result or error message of the server
+    :return: The result it describes
+    """
+    status = message.get("status", "ERROR")
+    return ServiceResult(
+        satisfiable={"SAT": True, "UNSAT": False}.get(status),
+        model={abs(literal): literal > 0 for literal in message.get("model", [])},
+        status=status,
+        stop_reason=message.get("stop_reason"),
+        core=message.get("core", []),
+        stats=message.get("stats", {}),
+        seconds=message.get("seconds", 0.0),
+        error=message.get("error"),
+    )
+
+
+class Job:
+    """
+    A request sent to the server.
+    """
+    def __init__(self, client: "SolverClient", request_id: int,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]]):
+        self.client = client
+        self.id = request_id
+        self.on_progress = on_progress
+        self.future = asyncio.get_running_loop().create_future()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    async def result(self) -> ServiceResult:
+        """
+        Waits for the result of the request.
+        :return: The result
+        """
+        return await asyncio.shield(self.future)
+
+    async def cancel(self):
+        """
+        Asks the server to stop the request. Its result has the status CANCELLED unless it was finished before.
+        """
+        if not self.done():
+            await self.client.send({"type": "cancel", "id": self.id})
+
+
+class SolverClient:
+    """
+    An asyncio client of the solving service. Several requests can be open at once, their results arrive in any
+    order. The client never has more open requests than the server allows per connection, submit waits for a free
+    slot instead.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, hello: Dict[str, Any]):
+        """
+        Initializes the client on an open connection, see connect.
+        :param reader: The stream from the server
+        :param writer: The stream to the server
+        :param hello: The hello message of the server
+        """
+        self.reader = reader
+        self.writer = writer
+        self.workers = hello["workers"]
+        self.max_inflight = hello["max_inflight"]
+        self.solvers = hello["solvers"]
+
+        self.__jobs: Dict[int, Job] = {}
+        self.__slots = asyncio.Semaphore(self.max_inflight)
+        self.__ids = itertools.count()
+        self.__status: List[asyncio.Future] = []
+        self.__write_lock = asyncio.Lock()
+        self.__closing = False
+        self.__receiver = asyncio.create_task(self.__receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT, path: Optional[str] = None,
+                      limit=64 * 2 ** 20) -> "SolverClient":
+        """
+        Connects to a server.
+        :param host: (optional) the host of the server
+        :param port: (optional) the TCP port of the server
+        :param path: (optional) connect to this Unix socket instead of TCP
+        :param limit: (optional) the length of the longest message that can be received, e.g. a result with a model
+        :return: The connected client
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        hello = decode(await reader.readline())
+        if hello["type"] != "hello":
+            writer.close()
+            raise ConnectionError(f"expected a hello message, got {hello}")
+        return cls(reader, writer, hello)
+
+    async def __aenter__(self) -> "SolverClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def send(self, message: Dict[str, Any]):
+        """
+        Sends a message to the server. Waits while the server does not read, which is how it slows down clients.
+        """
+        async with self.__write_lock:
+            self.writer.write(encode(message))
+            await self.writer.drain()
+
+    async def submit(self, clauses: Optional[Iterable[Iterable[int]]] = None, dimacs: Optional[str] = None,
+                     solver="cdcl", assumptions: Iterable[int] = (), budget: Optional[Dict[str, float]] = None,
+                     progress: Optional[int] = None, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) \
+            -> Job:
+        """
+        Sends a formula to the server without waiting for its result.
+        :param clauses: (optional) the clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+        :param dimacs: (optional) the formula in DIMACS format instead of clauses
+        :param solver: (optional) "cdcl" or "dpll"
+        :param assumptions: (optional) literals that are assumed to be True
+        :param budget: (optional) the limits of the solver, with the keys conflicts, propagations, decisions, memory
+        and seconds
+        :param progress: (optional) the number of conflicts between two progress messages
+        :param on_progress: (optional) called with every progress message, which has stats and seconds
+        :return: The job of the request
+        """
+        if (clauses is None) == (dimacs is None):
+            raise ValueError("either clauses or dimacs have to be given")
+        message = {"type": "solve", "solver": solver, "assumptions": list(assumptions)}
+        if clauses is not None:
+            message["clauses"] = [[literal for literal in clause if literal != 0] for clause in clauses]
+        else:
+            message["dimacs"] = dimacs
+        if budget:
+            message["budget"] = budget
+        if progress is not None:
+            message["progress"] = progress
+
+        await self.__slots.acquire()
+        job = Job(self, next(self.__ids), on_progress)
+        message["id"] = job.id
+        self.__jobs[job.id] = job
+        try:
+            await self.send(message)
+        except BaseException:
+            self.__finish(job.id, None)
+            raise
+        return job
+
+    async def solve(self, clauses: Optional[Iterable[Iterable[int]]] = None, dimacs: Optional[str] = None,
+                    **options) -> ServiceResult:
+        """
+        Solves a formula on the server, see submit for the options.
+        :return: The result
+        """
+        job = await self.submit(clauses, dimacs, **options)
+        try:
+            return await job.result()
+        except asyncio.CancelledError:
+            await job.cancel()
+            raise
+
+    async def status(self) -> Dict[str, Any]:
+        """
+        :return: The status message of the server with the number of workers, busy workers, queued requests,
+        connections and completed requests
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__status.append(future)
+        await self.send({"type": "status"})
+        return await future
+
+    def __finish(self, request_id: Any, message: Optional[Dict[str, Any]]):
+        job = self.__jobs.pop(request_id, None)
+        if job is None:
+            return
+        self.__slots.release()
+        if message is not None and not job.future.done():
+            job.future.set_result(_result(message))
+
+    async def __receive(self):
+        """
+        Receives the messages of the server and hands them to the jobs they belong to.
+        """
+        try:
+            while line := await self.reader.readline():
+                message = decode(line)
+                kind = message["type"]
+                if kind == "result" or (kind == "error" and message.get("id") in self.__jobs):
+                    self.__finish(message["id"], message)
+                elif kind == "progress":
+                    job = self.__jobs.get(message["id"])
+                    if job is not None and job.on_progress is not None:
+                        job.on_progress(message)
+                elif kind == "status" and self.__status:
+                    self.__status.pop(0).set_result(message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.__stop_waiting()
+
+    def __stop_waiting(self):
+        """
+        Ends the waiting for the open requests: those of a client that is closed are cancelled, those of a lost
+        connection fail.
+        """
+        error = ConnectionError("the connection to the server was closed")
+        for future in [job.future for job in self.__jobs.values()] + self.__status:
+            if future.done():
+                continue
+            if self.__closing:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+    async def close(self):
+        """
+        Cancels the open requests and closes the connection.
+        """
+        self.__closing = True
+        for job in list(self.__jobs.values()):
+            try:
+                await job.cancel()
+            except ConnectionError:
+                break
+        self.__receiver.cancel()
+        # a receiver that is cancelled before it ran does not clean up
+        self.__stop_waiting()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def solve(clauses: Optional[Iterable[Iterable[int]]] = None, dimacs: Optional[str] = None, host="127.0.0.1",
+          port=DEFAULT_PORT, path: Optional[str] = None, **options) -> ServiceResult:
+    """
+    Solves one formula on a server from code that does not use asyncio.
+    :param clauses: (optional) the clauses of the form [[literal, ...], ...] e.g. [[-1, 3], ...]
+    :param dimacs: (optional) the formula in DIMACS format instead of clauses
+    :param host: (optional) the host of the server
+    :param port: (optional) the TCP port of the server
+    :param path: (optional) connect to this Unix socket instead of TCP
+    :param options: The options of SolverClient.submit
+    :return: The result
+    """
+    async def run() -> ServiceResult:
+        async with await SolverClient.connect(host, port, path) as client:
+            return await client.solve(clauses, dimacs, **options)
+
+    return asyncio.run(run())
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.generators import planted_ksat, random_ksat
+from second_part.cache import is_model
+
+from .client import ServiceResult, SolverClient
+from .server import SolverServer
+
+
+class LoadTestReport(NamedTuple):
+    num_requests: int
+    # the number of results per status
+    statuses: Dict[str, int]
+    seconds: float
+    # finished requests per second
+    throughput: float
+    # the 50th, 95th and 99th percentile and the maximum of the seconds from sending a request to its result
+    latencies: Dict[str, float]
+    # the results that contradict the instance: models that do not satisfy it or UNSAT for a planted instance
+    num_wrong: int
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """
+    :param values: The measured values
+    :return: The 50th, 95th and 99th percentile and the maximum of the values; {} if there are none
+    """
+    if not values:
+        return {}
+    values = sorted(values)
+    return {name: values[round(quantile * (len(values) - 1))]
+            for name, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))}
+
+
+async def run_load_test(num_requests=200, concurrency=32, num_connections=4, num_variables=60, ratio=4.26,
+                        solver="cdcl", seconds=10.0, seed=0, host="127.0.0.1", port: Optional[int] = None,
+                        path: Optional[str] = None,
+                        on_result: Optional[Callable[[int, ServiceResult, float], None]] = None) -> LoadTestReport:
+    """
+    Sends random 3-SAT instances at the phase transition to a server, half of them with a planted model, and
+    measures the latency of the requests and the throughput of the server.
+    :param num_requests: (optional) the number of instances
+    :param concurrency: (optional) the number of requests that are open at the same time
+    :param num_connections: (optional) the number of client connections the requests are spread over
+    :param num_variables: (optional) the number of variables per instance
+    :param ratio: (optional) the number of clauses per variable
+    :param solver: (optional) "cdcl" or "dpll"
+    :param seconds: (optional) the time limit per request
+    :param seed: (optional) the seed of the first instance
+    :param host: (optional) the host of the server
+    :param port: (optional) the TCP port of the server
+    :param path: (optional) connect to this Unix socket instead of TCP
+    :param on_result: (optional) called with the index, result and latency of every request
+    :return: The report
+    """
+    instances = [(planted_ksat if index % 2 == 0 else random_ksat)(num_variables, ratio=ratio, seed=seed + index)
+                 for index in range(num_requests)]
+    clients = [await SolverClient.connect(host, port, path) for _ in range(num_connections)]
+    open_requests = asyncio.Semaphore(concurrency)
+    statuses = Counter()
+    latencies = []
+    num_wrong = 0
+
+    async def send(index: int):
+        nonlocal num_wrong
+        instance = instances[index]
+        async with open_requests:
+            start = time.perf_counter()
+            result = await clients[index % len(clients)].solve(instance.clauses, solver=solver,
+                                                               budget={"seconds": seconds})
+            latency = time.perf_counter() - start
+        statuses[result.status] += 1
+        latencies.append(latency)
+        if (result.satisfiable and not is_model(instance.clauses, result.model)) or \
+                (result.satisfiable is False and instance.expected):
+            num_wrong += 1
+        if on_result is not None:
+            on_result(index, result, latency)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(send(index) for index in range(num_requests)))
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.perf_counter() - start
+    return LoadTestReport(num_requests, dict(statuses), elapsed, num_requests / elapsed if elapsed > 0 else 0.0,
+                          percentiles(latencies), num_wrong)
+
+
+async def _main(args: argparse.Namespace) -> LoadTestReport:
+    def print_result(index: int, result: ServiceResult, latency: float):
+        if args.verbose:
+            print(f"request {index:>5} {result.status:<9} {latency:8.3f}s", flush=True)
+
+    options = {"num_requests": args.requests, "concurrency": args.concurrency, "num_connections": args.connections,
+               "num_variables": args.variables, "ratio": args.ratio, "solver": args.solver, "seconds": args.timeout,
+               "seed": args.seed, "on_result": print_result}
+    if args.port is not None or args.unix is not None:
+        return await run_load_test(host=args.host, port=args.port, path=args.unix, **options)
+
+    # without an address a server is started in this process
+    async with SolverServer(num_workers=args.workers) as server:
+        await server.start(args.host, 0)
+        print(f"started a server with {server.num_workers} workers on {server.address}", flush=True)
+        host, port = server.address
+        return await run_load_test(host=host, port=port, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m service.load_test",
+                                     description="measures the latency and throughput of a solving service")
+    parser.add_argument("--host", default="127.0.0.1", help="the host of the server")
+    parser.add_argument("--port", type=int, help="the TCP port of the server")
+    parser.add_argument("--unix", metavar="PATH", help="the Unix socket of the server")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="the workers of the server that is started if no port or socket is given")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="the number of requests")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="the number of open requests")
+    parser.add_argument("--connections", type=int, default=4, help="the number of client connections")
+    parser.add_argument("--variables", type=int, default=60, help="the number of variables per instance")
+    parser.add_argument("--ratio", type=float, default=4.26, help="the number of clauses per variable")
+    parser.add_argument("--solver", choices=("cdcl", "dpll"), default="cdcl")
+    parser.add_argument("--timeout", type=float, default=10, help="the time limit per request in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the first instance")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every result")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    statuses = ", ".join(f"{status} {count}" for status, count in sorted(report.statuses.items()))
+    latencies = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in report.latencies.items())
+    print(f"{report.num_requests} requests in {report.seconds:.3f}s, {report.throughput:.1f} requests/s")
+    print(f"statuses: {statuses}")
+    print(f"latency: {latencies}")
+    if report.num_wrong:
+        print(f"{report.num_wrong} WRONG RESULTS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import asyncio
+from service.load_test import percentiles, run_load_test
+from service.server import SolverServer
+
+
+def test_percentiles():
+    assert percentiles([]) == {}
+    values = percentiles([float(value) for value in range(100, -1, -1)])
+    assert values == {"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+
+def test_run_load_test():
+    results = []
+
+    async def run():
+        async with SolverServer(num_workers=2) as server:
+            await server.start(port=0)
+            host, port = server.address
+            return await run_load_test(num_requests=12, concurrency=4, num_connections=2, num_variables=30,
+                                       host=host, port=port, on_result=lambda *result: results.append(result))
+
+    report = asyncio.run(run())
+    assert report.num_requests == 12 and sum(report.statuses.values()) == 12
+    assert set(report.statuses) <= {"SAT", "UNSAT"} and report.num_wrong == 0
+    assert sorted(index for index, _, _ in results) == list(range(12))
+    assert report.latencies["p50"] <= report.latencies["max"] and report.throughput > 0
@@ -0,0 +1,124 @@
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from budget import Budget
+
+
+# every message is a JSON object on one line with a "type". The client sends
+#   {"type": "solve", "id": 1, "clauses": [[1, -2], [2]]} or {..., "dimacs": "p cnf 2 2\n1 -2 0\n2 0\n"}, optionally
+#       with "solver" (one of SOLVERS), "assumptions" (a list of literals), "budget" (an object with any of
+#       BUDGET_LIMITS) and "progress" (the number of conflicts between two progress messages)
+#   {"type": "cancel", "id": 1} to stop an open request
+#   {"type": "status"} to ask for the load of the server
+# and the server sends
+#   {"type": "hello", "workers": 4, "max_inflight": 16, "solvers": [...]} once after the client connected
+#   {"type": "progress", "id": 1, "stats": {...}, "seconds": 0.5} while a request is solved
+#   {"type": "result", "id": 1, "status": "SAT", "model": [-1, 2], "stats": {...}, "seconds": 0.7} once per request,
+#       with a "core" for UNSAT, a "stop_reason" for UNKNOWN and CANCELLED and an "error" for ERROR
+#   {"type": "status", "workers": 4, "busy": 2, "queued": 0, "connections": 1, "completed": 10}
+#   {"type": "error", "id": 1, "error": "..."} for an invalid message. The id is null if it could not be read
+
+# the port the server listens on and the client connects to by default
+DEFAULT_PORT = 7878
+
+SOLVERS = ("cdcl", "dpll")
+
+# the limits a request may set in its budget, named like the parameters of Budget
+BUDGET_LIMITS = ("conflicts", "propagations", "decisions", "memory", "seconds")
+
+# the statuses of a result. UNKNOWN means that the budget was used up, see stop_reason
+STATUSES = ("SAT", "UNSAT", "UNKNOWN", "CANCELLED", "MEMOUT", "ERROR")
+
+
+class SolveRequest(NamedTuple):
+    # the id the client chose for the request, a string or an integer that is unique among its open requests
+    id: Union[str, int]
+    # the formula as {"clauses": [[literal, ...], ...]} or {"dimacs": "p cnf ..."}, parsed by the worker
+    formula: Dict[str, Any]
+    solver: str
+    assumptions: List[int]
+    budget: Dict[str, float]
+    # the number of conflicts between two progress messages; None for no progress messages
+    progress: Optional[int]
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    """
+    Encodes a message as one line of JSON.
+    :param message: The message
+    :return: The line including the line break
+    """
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes) -> Dict[str, Any]:
+    """
+    Decodes a line of JSON.
+    :param line: The line
+    :return: The message, which has a "type"
+    """
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ValueError("a message has to be a JSON object with a type")
+    return message
+
+
+def is_integer(value: Any) -> bool:
+    # booleans are integers in Python but not in JSON
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_valid_id(request_id: Any) -> bool:
+    return isinstance(request_id, str) or is_integer(request_id)
+
+
+def parse_solve_request(message: Dict[str, Any], max_seconds=float("inf")) -> SolveRequest:
+    """
+    Checks the fields of a solve request. The clauses or the DIMACS text are only checked by the worker that parses
+    them, so that large formulas do not block the server.
+    :param message: The decoded message of type "solve"
+    :param max_seconds: (optional) the time limit of requests that set no or a larger one
+    :return: The request
+    """
+    request_id = message.get("id")
+    if not is_valid_id(request_id):
+        raise ValueError("the id of a request has to be a string or an integer")
+
+    if ("clauses" in message) == ("dimacs" in message):
+        raise ValueError("a request needs either clauses or dimacs")
+    if "clauses" in message:
+        if not isinstance(message["clauses"], list) or not all(isinstance(clause, list)
+                                                               for clause in message["clauses"]):
+            raise ValueError("clauses have to be a list of lists of literals")
+        formula = {"clauses": message["clauses"]}
+    else:
+        if not isinstance(message["dimacs"], str):
+            raise ValueError("dimacs has to be a string")
+        formula = {"dimacs": message["dimacs"]}
+
+    solver = message.get("solver", "cdcl")
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver}, choose one of {', '.join(SOLVERS)}")
+
+    assumptions = message.get("assumptions", [])
+    if not isinstance(assumptions, list) or not all(is_integer(literal) and literal != 0 for literal in assumptions):
+        raise ValueError("assumptions have to be a list of non-zero literals")
+
+    budget = message.get("budget") or {}
+    if not isinstance(budget, dict) or any(limit not in BUDGET_LIMITS for limit in budget):
+        raise ValueError(f"a budget may only limit {', '.join(BUDGET_LIMITS)}")
+    if not all(is_integer(value) or isinstance(value, float) for value in budget.values()):
+        raise ValueError("the limits of a budget have to be numbers")
+    budget = dict(budget)
+    budget["seconds"] = min(budget.get("seconds", max_seconds), max_seconds)
+    # raises a ValueError for negative limits
+    Budget(**budget)
+
+    progress = message.get("progress")
+    if progress is not None and (not is_integer(progress) or progress < 1):
+        raise ValueError("progress has to be a positive number of conflicts")
+
+    return SolveRequest(request_id, formula, solver, assumptions, budget, progress)
@@ -0,0 +1,60 @@
+import math
+import pytest
+from service.protocol import decode, encode, parse_solve_request
+from service.worker import load_formula
+
+
+def test_encode_decode():
+    message = {"type": "solve", "id": "a", "clauses": [[1, -2], [2]]}
+    line = encode(message)
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert decode(line) == message
+    for line in (b"{", b"[1, 2]", b'{"id": 1}', b'{"type": 1}'):
+        with pytest.raises(ValueError):
+            decode(line)
+
+def test_parse_solve_request():
+    request = parse_solve_request({"type": "solve", "id": 3, "clauses": [[1, 2]]})
+    assert request.id == 3 and request.formula == {"clauses": [[1, 2]]}
+    assert request.solver == "cdcl" and request.assumptions == [] and request.progress is None
+    assert math.isinf(request.budget["seconds"])
+
+    request = parse_solve_request({"type": "solve", "id": "x", "dimacs": "p cnf 1 1\n1 0\n", "solver": "dpll",
+                                   "assumptions": [-1], "budget": {"conflicts": 5, "seconds": 100},
+                                   "progress": 10}, max_seconds=30)
+    assert request.formula == {"dimacs": "p cnf 1 1\n1 0\n"}
+    assert request.budget == {"conflicts": 5, "seconds": 30}
+    assert (request.solver, request.assumptions, request.progress) == ("dpll", [-1], 10)
+
+    # a shorter time limit of the request is kept
+    assert parse_solve_request({"id": 1, "clauses": [], "budget": {"seconds": 2.5}}, 30).budget == {"seconds": 2.5}
+
+@pytest.mark.parametrize("message", [
+    {"clauses": [[1]]},
+    {"id": True, "clauses": [[1]]},
+    {"id": 1.5, "clauses": [[1]]},
+    {"id": 1},
+    {"id": 1, "clauses": [[1]], "dimacs": "p cnf 1 1\n1 0\n"},
+    {"id": 1, "clauses": [1, 2]},
+    {"id": 1, "dimacs": [[1]]},
+    {"id": 1, "clauses": [[1]], "solver": "walksat"},
+    {"id": 1, "clauses": [[1]], "assumptions": [0]},
+    {"id": 1, "clauses": [[1]], "assumptions": 1},
+    {"id": 1, "clauses": [[1]], "budget": {"restarts": 5}},
+    {"id": 1, "clauses": [[1]], "budget": {"conflicts": "5"}},
+    {"id": 1, "clauses": [[1]], "budget": {"conflicts": -5}},
+    {"id": 1, "clauses": [[1]], "progress": 0},
+])
+def test_invalid_solve_requests(message):
+    with pytest.raises(ValueError):
+        parse_solve_request(dict(message, type="solve"))
+
+def test_load_formula():
+    assert load_formula({"clauses": [[1, -2], [2]]}) == [[1, -2], [2]]
+    arena = load_formula({"dimacs": "c a comment\np cnf 2 2\n1 -2 0\n2 0\n"})
+    assert [arena[cref] for cref in arena.crefs()] == [[1, -2], [2]]
+    for clauses in ([[1, 2 ** 31]], [[1, "2"]], [[True]]):
+        with pytest.raises(ValueError):
+            load_formula({"clauses": clauses})
+    with pytest.raises(ValueError):
+        load_formula({"dimacs": "p cnf 1 1\n1 x 0\n"})
@@ -0,0 +1,434 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from .protocol import DEFAULT_PORT, SOLVERS, SolveRequest, decode, encode, is_valid_id, parse_solve_request
+from .worker import worker_main
+
+
+class _Connection:
+    """
+    A client connection. The messages to the client are put into a queue and written by a sender task, so that a
+    client that reads slowly only holds up its own messages. Progress messages are dropped while too many messages
+    are waiting, results never are.
+    """
+    def __init__(self, writer: asyncio.StreamWriter, max_inflight: int, max_buffered: int):
+        self.writer = writer
+        # the open requests by their id
+        self.jobs: Dict[Union[str, int], "_Job"] = {}
+        # limits the open requests; the server stops reading from the client while they are all taken
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.max_buffered = max_buffered
+        self.outgoing = asyncio.Queue()
+        self.closed = False
+        self.sender = asyncio.create_task(self.__write_messages())
+
+    def send(self, message: Optional[Dict[str, Any]], droppable=False):
+        """
+        Queues a message for the client.
+        :param message: The message; None closes the connection after the queued messages are written
+        :param droppable: (optional) drop the message if the client is behind
+        """
+        if self.closed or (droppable and self.outgoing.qsize() >= self.max_buffered):
+            return
+        self.outgoing.put_nowait(message)
+
+    async def __write_messages(self):
+        try:
+            while (message := await self.outgoing.get()) is not None:
+                self.writer.write(encode(message))
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def add(self, job: "_Job"):
+        self.jobs[job.request.id] = job
+        self.idle.clear()
+
+    def remove(self, job: "_Job"):
+        del self.jobs[job.request.id]
+        self.slots.release()
+        if not self.jobs:
+            self.idle.set()
+
+    async def finished(self):
+        """
+        Waits until all open requests are finished or the client can not receive their results any more.
+        """
+        idle = asyncio.create_task(self.idle.wait())
+        try:
+            await asyncio.wait([idle, self.sender], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            idle.cancel()
+
+
+class _Job:
+    """
+    A request that is queued or solved by a worker.
+    """
+    def __init__(self, number: int, request: SolveRequest, connection: _Connection):
+        # a number that is unique on the server, unlike the id chosen by the client
+        self.number = number
+        self.request = request
+        self.connection = connection
+        self.worker: Optional[_Worker] = None
+        self.started: Optional[float] = None
+        self.done = False
+        # the timers that kill the worker if it overruns the time limit or does not stop after a cancel
+        self.timers: List[asyncio.TimerHandle] = []
+        # the result that is sent if the worker is killed
+        self.kill_result: Optional[Dict[str, Any]] = None
+
+
+class _Worker:
+    """
+    A worker process and the two connections to it.
+    """
+    def __init__(self, context: multiprocessing.context.BaseContext):
+        task_receiver, self.tasks = context.Pipe(duplex=False)
+        self.results, result_sender = context.Pipe(duplex=False)
+        self.process = context.Process(target=worker_main, args=(task_receiver, result_sender), daemon=True)
+        self.process.start()
+        # the ends of the worker are closed here, so that receiving from it fails as soon as it exits
+        task_receiver.close()
+        result_sender.close()
+        self.job: Optional[_Job] = None
+        self.alive = True
+
+
+class SolverServer:
+    """
+    A long-running solving service. Clients connect over TCP or a Unix socket and send requests as lines of JSON.
+    The requests are solved by a pool of worker processes, one request per worker at a time, and the results are
+    sent back as lines of JSON as soon as they are found, in any order. The messages are described in
+    protocol.py.
+
+    Requests wait in a queue of max_queued requests for a free worker and every connection may have max_inflight
+    open requests. If either is full, the server stops reading from the connection, so that the client is slowed
+    down by the flow control of the socket instead of the server buffering its requests.
+    """
+    def __init__(self, num_workers: Optional[int] = None, max_queued=64, max_inflight=16, timeout=60.0,
+                 kill_grace=1.0, max_request_bytes=64 * 2 ** 20, max_buffered_progress=64):
+        """
+        Initializes the server. The workers are started by start.
+        :param num_workers: (optional) the number of worker processes, by default the number of CPUs
+        :param max_queued: (optional) the number of requests that wait for a worker
+        :param max_inflight: (optional) the number of open requests per connection
+        :param timeout: (optional) the time limit in seconds of requests that set no or a larger one
+        :param kill_grace: (optional) the seconds a worker may overrun the time limit or ignore a cancel before it is
+        killed and replaced
+        :param max_request_bytes: (optional) the length of the longest request line
+        :param max_buffered_progress: (optional) the number of messages waiting for a connection above which its
+        progress messages are dropped
+        """
+        if max_queued < 1 or max_inflight < 1:
+            raise ValueError("max_queued and max_inflight have to be at least 1")
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.max_queued = max_queued
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.kill_grace = kill_grace
+        self.max_request_bytes = max_request_bytes
+        self.max_buffered_progress = max_buffered_progress
+        self.num_completed = 0
+
+        # the workers are started fresh instead of forked, since the server runs threads
+        self.__context = multiprocessing.get_context("spawn")
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__path: Optional[str] = None
+        self.__workers: Set[_Worker] = set()
+        self.__tasks: Set[asyncio.Task] = set()
+        self.__connections: Set[_Connection] = set()
+        self.__numbers = itertools.count()
+        self.__closing = False
+
+    async def __aenter__(self) -> "SolverServer":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT, path: Optional[str] = None):
+        """
+        Starts the workers and listens for clients.
+        :param host: (optional) the address to listen on
+        :param port: (optional) the TCP port, 0 for any free port
+        :param path: (optional) listen on this Unix socket instead of TCP
+        """
+        # every worker has a thread that waits for its messages
+        self.__executor = ThreadPoolExecutor(self.num_workers)
+        self.__queue: asyncio.Queue = asyncio.Queue(self.max_queued)
+        self.__idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.num_workers):
+            self.__add_worker()
+        self.__spawn(self.__dispatch())
+
+        if path is not None:
+            self.__path = path
+            self.__server = await asyncio.start_unix_server(self.__handle, path, limit=self.max_request_bytes)
+        else:
+            self.__server = await asyncio.start_server(self.__handle, host, port, limit=self.max_request_bytes)
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        """
+        :return: The path of the Unix socket or the host and port the server listens on
+        """
+        if self.__path is not None:
+            return self.__path
+        return self.__server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening, closes all connections and stops the workers.
+        """
+        self.__closing = True
+        if self.__server is not None:
+            self.__server.close()
+        for task in list(self.__tasks):
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        for worker in self.__workers:
+            worker.process.kill()
+        for worker in self.__workers:
+            worker.process.join()
+            worker.tasks.close()
+            worker.results.close()
+        if self.__server is not None:
+            await self.__server.wait_closed()
+            self.__executor.shutdown()
+        if self.__path is not None and os.path.exists(self.__path):
+            os.unlink(self.__path)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        :return: The status message with the number of workers, busy workers, queued requests, connections and
+        completed requests
+        """
+        return {
+            "type": "status",
+            "workers": len(self.__workers),
+            "busy": sum(worker.job is not None for worker in self.__workers),
+            "queued": self.__queue.qsize(),
+            "connections": len(self.__connections),
+            "completed": self.num_completed,
+        }
+
+    def __spawn(self, coroutine) -> asyncio.Task:
+        """
+        Runs a coroutine in a task that is cancelled when the server is closed.
+        """
+        task = asyncio.create_task(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
+
+    def __add_worker(self):
+        worker = _Worker(self.__context)
+        self.__workers.add(worker)
+        self.__idle.put_nowait(worker)
+        self.__spawn(self.__listen(worker))
+
+    async def __listen(self, worker: _Worker):
+        """
+        Receives the messages of a worker. If the worker exits, its request is finished and it is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                kind, number, message = await loop.run_in_executor(self.__executor, worker.results.recv)
+            except (EOFError, OSError):
+                break
+            job = worker.job
+            if job is None or job.number != number:
+                continue
+            if kind == "progress":
+                job.connection.send({"type": "progress", "id": job.request.id, **message}, droppable=True)
+            else:
+                worker.job = None
+                self.__finish(job, message)
+                self.__idle.put_nowait(worker)
+
+        worker.alive = False
+        if self.__closing:
+            return
+        self.__workers.discard(worker)
+        worker.process.join()
+        worker.tasks.close()
+        worker.results.close()
+        if worker.job is not None:
+            job = worker.job
+            self.__finish(job, job.kill_result or {
+                "status": "ERROR", "error": f"the worker exited with code {worker.process.exitcode}"})
+        self.__add_worker()
+
+    async def __dispatch(self):
+        """
+        Hands the queued requests to the idle workers.
+        """
+        while True:
+            job = await self.__queue.get()
+            if job.done:
+                continue
+            worker = await self.__idle.get()
+            while not worker.alive:
+                worker = await self.__idle.get()
+            # the request may have been cancelled while it waited for the worker
+            if job.done:
+                self.__idle.put_nowait(worker)
+                continue
+            self.__run(job, worker)
+
+    def __run(self, job: _Job, worker: _Worker):
+        loop = asyncio.get_running_loop()
+        request = job.request
+        worker.job = job
+        job.worker = worker
+        job.started = loop.time()
+        options = {"solver": request.solver, "assumptions": request.assumptions, "budget": request.budget,
+                   "progress": request.progress}
+        try:
+            worker.tasks.send(("solve", job.number, request.formula, options))
+        except OSError:
+            # the worker died, its listener finishes the request and replaces it
+            return
+        if request.budget["seconds"] != float("inf"):
+            job.timers.append(loop.call_later(request.budget["seconds"] + self.kill_grace, self.__kill, job,
+                                              {"status": "UNKNOWN", "stop_reason": "time"}))
+
+    def __kill(self, job: _Job, result: Dict[str, Any]):
+        """
+        Kills the worker of a request that did not stop in time. The request is finished with the given result.
+        """
+        if job.done or job.worker is None:
+            return
+        job.kill_result = result
+        job.worker.process.kill()
+
+    def __cancel(self, job: _Job):
+        """
+        Cancels a request. A queued request is finished at once, a running one is interrupted by its worker.
+        """
+        if job.done:
+            return
+        if job.worker is None:
+            self.__finish(job, {"status": "CANCELLED", "stop_reason": "interrupt"})
+            return
+        try:
+            job.worker.tasks.send(("cancel", job.number))
+        except OSError:
+            pass
+        job.timers.append(asyncio.get_running_loop().call_later(
+            self.kill_grace, self.__kill, job, {"status": "CANCELLED", "stop_reason": "interrupt"}))
+
+    def __finish(self, job: _Job, result: Dict[str, Any]):
+        """
+        Sends the result of a request to its client.
+        """
+        if job.done:
+            return
+        job.done = True
+        for timer in job.timers:
+            timer.cancel()
+        if "seconds" not in result:
+            result["seconds"] = 0.0 if job.started is None else asyncio.get_running_loop().time() - job.started
+        job.connection.remove(job)
+        job.connection.send({"type": "result", "id": job.request.id, **result})
+        self.num_completed += 1
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves a client. After the client closed its side of the connection, the results of its open requests are
+        still sent. If the server is closed or the client can not receive any more, its requests are cancelled.
+        """
+        task = asyncio.current_task()
+        self.__tasks.add(task)
+        connection = _Connection(writer, self.max_inflight, self.max_buffered_progress)
+        self.__connections.add(connection)
+        connection.send({"type": "hello", "workers": self.num_workers, "max_inflight": self.max_inflight,
+                         "solvers": list(SOLVERS)})
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    connection.send({"type": "error", "id": None,
+                                     "error": f"a request may not be longer than {self.max_request_bytes} bytes"})
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await self.__handle_line(connection, line)
+            await connection.finished()
+            connection.send(None)
+            await connection.sender
+        except asyncio.CancelledError:
+            # the server is closed. The task ends normally, since the stream server of Python 3.11 reports the
+            # cancellation of a connection handler as an error
+            pass
+        finally:
+            for job in list(connection.jobs.values()):
+                self.__cancel(job)
+            connection.closed = True
+            connection.sender.cancel()
+            writer.close()
+            self.__connections.discard(connection)
+            self.__tasks.discard(task)
+
+    async def __handle_line(self, connection: _Connection, line: bytes):
+        try:
+            message = decode(line)
+        except ValueError as e:
+            connection.send({"type": "error", "id": None, "error": str(e)})
+            return
+
+        kind = message["type"]
+        request_id = message.get("id") if is_valid_id(message.get("id")) else None
+        if kind == "solve":
+            try:
+                request = parse_solve_request(message, self.timeout)
+            except ValueError as e:
+                connection.send({"type": "error", "id": request_id, "error": str(e)})
+                return
+            if request.id in connection.jobs:
+                connection.send({"type": "error", "id": request.id, "error": f"request {request.id} is still open"})
+                return
+            await connection.slots.acquire()
+            job = _Job(next(self.__numbers), request, connection)
+            connection.add(job)
+            await self.__queue.put(job)
+        elif kind == "cancel":
+            # requests that are already finished are not an error, their result may be on the way
+            if request_id in connection.jobs:
+                self.__cancel(connection.jobs[request_id])
+        elif kind == "status":
+            connection.send(self.status())
+        else:
+            connection.send({"type": "error", "id": request_id, "error": f"unknown message type {kind}"})
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, path: Optional[str] = None, **options):
+    """
+    Runs a server until it is cancelled.
+    :param host: (optional) the address to listen on
+    :param port: (optional) the TCP port
+    :param path: (optional) listen on this Unix socket instead of TCP
+    :param options: The options of SolverServer
+    """
+    async with SolverServer(**options) as server:
+        await server.start(host, port, path)
+        print(f"listening on {server.address} with {server.num_workers} workers", flush=True)
+        await server.serve_forever()
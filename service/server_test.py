@@ -0,0 +1,208 @@
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import pytest
+from second_part.cdcl_solver_test import pigeonhole, is_model
+from service.client import SolverClient, solve
+from service.server import SolverServer
+
+
+@contextlib.contextmanager
+def running_server(path=None, **options):
+    # the server runs in its own event loop in a thread, so that each test can use asyncio.run for its clients
+    loop = asyncio.new_event_loop()
+    server = SolverServer(**options)
+    loop.run_until_complete(server.start(port=0, path=path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(30)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+@pytest.fixture(scope="module")
+def server():
+    with running_server(num_workers=2) as server:
+        yield server
+
+def with_client(server, test):
+    async def run():
+        host, port = server.address
+        async with await SolverClient.connect(host, port) as client:
+            return await test(client)
+    return asyncio.run(run())
+
+async def raw_connection(server):
+    reader, writer = await asyncio.open_connection(*server.address)
+    hello = json.loads(await reader.readline())
+    assert hello["type"] == "hello"
+    return reader, writer
+
+async def send_lines(writer, *messages):
+    for message in messages:
+        writer.write(message if isinstance(message, bytes) else json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+def test_solve(server):
+    clauses = [[1, 2, 3], [-1, -2], [-2, -3], [2, 4], [-4, -1]]
+
+    async def test(client):
+        assert client.workers == 2
+        satisfiable, unsatisfiable, dimacs, dpll = await asyncio.gather(
+            client.solve(clauses),
+            client.solve(pigeonhole(5, 4)),
+            client.solve(dimacs="c comment\np cnf 2 3\n1 2 0\n-1 0\n-2 0\n"),
+            client.solve(clauses, solver="dpll"))
+        return satisfiable, unsatisfiable, dimacs, dpll
+
+    satisfiable, unsatisfiable, dimacs, dpll = with_client(server, test)
+    assert satisfiable.status == "SAT" and satisfiable.satisfiable is True
+    assert is_model(clauses, satisfiable.model)
+    assert unsatisfiable.satisfiable is False and unsatisfiable.stats["conflicts"] > 0
+    assert dimacs.status == "UNSAT"
+    assert dpll.satisfiable and is_model(clauses, dpll.model)
+
+def test_assumptions_and_budget(server):
+    async def test(client):
+        return await asyncio.gather(client.solve([[1, 2], [-1, 3]], assumptions=[-2, -3]),
+                                    client.solve(pigeonhole(8, 7), budget={"conflicts": 10}))
+
+    assumed, stopped = with_client(server, test)
+    assert assumed.status == "UNSAT"
+    assert sorted(assumed.core) == [-3, -2]
+    assert stopped.status == "UNKNOWN" and stopped.satisfiable is None
+    assert stopped.stop_reason == "conflicts"
+    assert stopped.stats["conflicts"] == 10
+
+def test_progress_and_cancel(server):
+    async def test(client):
+        progress = []
+        started = asyncio.Event()
+
+        def on_progress(message):
+            progress.append(message["stats"]["conflicts"])
+            started.set()
+
+        job = await client.submit(pigeonhole(11, 10), progress=20, on_progress=on_progress)
+        await started.wait()
+        await job.cancel()
+        result = await job.result()
+        # the worker is free for the next request
+        after = await client.solve([[1], [-1, 2]])
+        return progress, result, after
+
+    progress, result, after = with_client(server, test)
+    assert progress[0] >= 20 and progress == sorted(progress)
+    assert result.status == "CANCELLED" and result.stop_reason == "interrupt"
+    assert after.model == {1: True, 2: True}
+
+def test_invalid_requests(server):
+    async def test():
+        reader, writer = await raw_connection(server)
+        await send_lines(writer, b"not json\n", {"type": "dance"}, {"type": "solve", "id": 7},
+                         {"type": "solve", "id": 8, "clauses": [[1, "x"]]},
+                         {"type": "solve", "id": 9, "clauses": [[1]], "budget": {"seconds": -1}})
+        messages = [json.loads(await reader.readline()) for _ in range(5)]
+        writer.close()
+        return messages
+
+    messages = asyncio.run(test())
+    assert [(message["type"], message["id"]) for message in messages[:3]] == [("error", None), ("error", None),
+                                                                            ("error", 7)]
+    # the literals are checked by the worker, so its result can arrive after the next error
+    replies = {message["id"]: message for message in messages[3:]}
+    assert replies[8]["type"] == "result" and replies[8]["status"] == "ERROR"
+    assert "32 bit integers" in replies[8]["error"]
+    assert replies[9]["type"] == "error"
+
+def test_half_closed_connection_gets_results(server):
+    async def test():
+        reader, writer = await raw_connection(server)
+        await send_lines(writer, {"type": "solve", "id": "a", "clauses": [[1, 2], [-1]]},
+                         {"type": "solve", "id": "b", "clauses": [[1], [-1]]})
+        writer.write_eof()
+        results = {}
+        while line := await reader.readline():
+            message = json.loads(line)
+            results[message["id"]] = message
+        writer.close()
+        return results
+
+    results = asyncio.run(test())
+    assert results["a"]["status"] == "SAT" and results["a"]["model"] == [-1, 2]
+    assert results["b"]["status"] == "UNSAT"
+
+def test_backpressure():
+    with running_server(num_workers=1, max_inflight=1) as server:
+        async def test():
+            reader, writer = await raw_connection(server)
+            # only the first request is read while it is open, the others wait in the socket
+            await send_lines(writer, *({"type": "solve", "id": index, "clauses": pigeonhole(9, 8),
+                                        "budget": {"seconds": 0.3}} for index in range(3)))
+            await asyncio.sleep(0.2)
+            async with await SolverClient.connect(*server.address) as client:
+                status = await client.status()
+            results = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            return status, results
+
+        status, results = asyncio.run(test())
+        assert status["busy"] + status["queued"] == 1
+        assert [result["id"] for result in results] == [0, 1, 2]
+        assert all(result["status"] == "UNKNOWN" and result["stop_reason"] == "time" for result in results)
+
+def test_client_limits_open_requests():
+    with running_server(num_workers=1, max_inflight=2) as server:
+        async def test(client):
+            jobs = [await client.submit(pigeonhole(9, 8), budget={"seconds": 0.2}) for _ in range(2)]
+            # the third request waits for a free slot of the client
+            third = asyncio.create_task(client.submit([[1]]))
+            await asyncio.sleep(0.05)
+            assert not third.done()
+            results = [await job.result() for job in jobs]
+            return results, await (await third).result()
+
+        results, third = with_client(server, test)
+        assert [result.status for result in results] == ["UNKNOWN", "UNKNOWN"]
+        assert third.satisfiable
+
+def test_worker_is_killed_and_replaced():
+    # without any grace the worker is killed when its time is up, unless the solver stopped itself just before
+    with running_server(num_workers=1, kill_grace=0) as server:
+        async def test(client):
+            stopped = await client.solve(pigeonhole(10, 9), budget={"seconds": 0.3})
+            after = await client.solve([[1, 2], [-2]])
+            return stopped, after, await client.status()
+
+        stopped, after, status = with_client(server, test)
+        assert stopped.status == "UNKNOWN" and stopped.stop_reason == "time"
+        assert after.model == {1: True, 2: False}
+        assert status["workers"] == 1
+
+def test_closed_client_cancels_its_requests(server):
+    async def test():
+        client = await SolverClient.connect(*server.address)
+        job = await client.submit(pigeonhole(11, 10))
+        await client.close()
+        with pytest.raises(asyncio.CancelledError):
+            await job.result()
+
+        async with await SolverClient.connect(*server.address) as other:
+            deadline = time.perf_counter() + 10
+            while (await other.status())["busy"] > 0 and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            return await other.status()
+
+    assert asyncio.run(test())["busy"] == 0
+
+def test_unix_socket_and_blocking_client(tmp_path):
+    path = str(tmp_path / "solver.sock")
+    with running_server(path=path, num_workers=1, timeout=5) as server:
+        assert server.address == path
+        result = solve([[1, -2], [2]], path=path)
+        assert result.model == {1: True, 2: True}
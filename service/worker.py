@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Union
+
+from dimacs_reader import DIMACSReader
+from second_part.cdcl_solver import CDCLSolver
+from second_part.clause_arena import ClauseArena
+from second_part.solver import DLPPSolver
+
+from .protocol import is_integer
+
+
+SOLVER_CLASSES = {
+    "cdcl": CDCLSolver,
+    "dpll": DLPPSolver,
+}
+
+
+def load_formula(formula: Dict[str, Any]) -> Union[List[List[int]], ClauseArena]:
+    """
+    Turns the formula of a request into clauses the solvers accept.
+    :param formula: {"clauses": [[literal, ...], ...]} or {"dimacs": "p cnf ..."}
+    :return: The clauses, or a clause arena for DIMACS
+    """
+    if "dimacs" in formula:
+        reader = DIMACSReader()
+        reader.read_bytes(formula["dimacs"].encode(), name="the request")
+        return reader.get_arena()
+
+    clauses = formula["clauses"]
+    if not all(is_integer(literal) and abs(literal) < 2 ** 31 for clause in clauses for literal in clause):
+        raise ValueError("the literals of the clauses have to be 32 bit integers")
+    return clauses
+
+
+class _Task:
+    """
+    The request a worker is solving. The listener thread and the solving thread share it.
+    """
+    def __init__(self, number: int):
+        self.number = number
+        self.solver: Optional[DLPPSolver] = None
+        self.cancelled = False
+
+
+def solve_task(task: _Task, formula: Dict[str, Any], options: Dict[str, Any], results: Connection,
+               lock: threading.Lock) -> Dict[str, Any]:
+    """
+    Solves one request and sends its progress messages.
+    :param task: The shared state of the request, through which it is cancelled
+    :param formula: The formula of the request
+    :param options: The solver, assumptions, budget and progress interval of the request
+    :param results: The connection to the server
+    :param lock: Guards the task
+    :return: The result of the request
+    """
+    start = time.perf_counter()
+    solver = SOLVER_CLASSES[options["solver"]](load_formula(formula))
+    solver.set_budget(**options["budget"])
+    if options["progress"] is not None:
+        solver.add_hook(lambda solver: results.send(("progress", task.number, {
+            "stats": solver.stats.as_dict(), "seconds": time.perf_counter() - start})), every=options["progress"])
+
+    # a cancel that arrived while the formula was loaded interrupts the solver at once
+    with lock:
+        task.solver = solver
+        if task.cancelled:
+            solver.interrupt()
+
+    satisfiable = solver.solve(options["assumptions"])
+    result = {"stats": solver.stats.as_dict()}
+    if satisfiable is None:
+        result["status"] = "CANCELLED" if solver.stop_reason == "interrupt" else "UNKNOWN"
+        result["stop_reason"] = solver.stop_reason
+    elif satisfiable:
+        result["status"] = "SAT"
+        result["model"] = [variable if value else -variable for variable, value in sorted(solver.get_model().items())]
+    else:
+        result["status"] = "UNSAT"
+        result["core"] = solver.get_core()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def worker_main(tasks: Connection, results: Connection):
+    """
+    The main function of a worker process. It solves one request after the other. The requests are received by a
+    listener thread, which also receives the cancel messages and interrupts the solver of the running request, so
+    that the solver does not have to poll the connection.
+    :param tasks: The connection on which ("solve", number, formula, options) and ("cancel", number) messages arrive.
+    The worker exits when it is closed
+    :param results: The connection on which ("progress", number, message) and ("result", number, message) are sent
+    """
+    pending = queue.Queue()
+    lock = threading.Lock()
+    # the server sends a request only when the previous one is finished, so the last request received is the one
+    # that is solved or waits to be solved
+    current = _Task(-1)
+
+    def listen():
+        nonlocal current
+        while True:
+            try:
+                message = tasks.recv()
+            except (EOFError, OSError):
+                pending.put(None)
+                return
+            with lock:
+                if message[0] == "solve":
+                    current = _Task(message[1])
+                    pending.put((current, message[2], message[3]))
+                elif message[1] == current.number:
+                    current.cancelled = True
+                    if current.solver is not None:
+                        current.solver.interrupt()
+
+    threading.Thread(target=listen, daemon=True).start()
+    while True:
+        message = pending.get()
+        if message is None:
+            return
+        task, formula, options = message
+        try:
+            result = solve_task(task, formula, options, results, lock)
+        except MemoryError:
+            result = {"status": "MEMOUT"}
+        except Exception as e:
+            result = {"status": "ERROR", "error": f"{type(e).__name__}: {e}"}
+        results.send(("result", task.number, result))
@@ -0,0 +1,99 @@
+import time
+from typing import Any, Callable, Dict, List
+
+
+class SolverStatistics:
+    """
+    Counters collected by a solver while solving.
+    """
+    def __init__(self):
+        # the search
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.backtracks = 0
+        self.restarts = 0
+        # the flips of the local search
+        self.flips = 0
+
+        # the learned clauses that were added and the reductions of the learned clause database
+        self.learned_clauses = 0
+        self.reductions = 0
+        self.kept_clauses = 0
+        self.deleted_clauses = 0
+
+        # the size of the learned clauses currently in the database and the largest size it had
+        self.learned_db_bytes = 0
+        self.max_learned_db_bytes = 0
+
+        # the seconds spent in propagation, conflict analysis and choosing decisions. Only measured if the solver
+        # profiles, since the timers cost more than the counters
+        self.bcp_time = 0.0
+        self.analysis_time = 0.0
+        self.decision_time = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        :return: The statistics as a dictionary
+        """
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v}' for k, v in self.as_dict().items())})"
+
+
+def profile_method(solver: Any, name: str, stats: SolverStatistics, field: str):
+    """
+    Replaces a method of a solver instance by a wrapper that adds the time spent in it to a field of the statistics.
+    Solvers that do not profile keep the unwrapped method and pay nothing for it.
+    :param solver: The solver
+    :param name: The name of the method
+    :param stats: The statistics of the solver
+    :param field: The field of the statistics the time is added to
+    """
+    method = getattr(solver, name)
+    perf_counter = time.perf_counter
+
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            setattr(stats, field, getattr(stats, field) + perf_counter() - start)
+
+    setattr(solver, name, timed)
+
+
+class ProgressHooks:
+    """
+    Callbacks that a solver calls every N conflicts, e.g. for progress reports. The solver only compares its number of
+    conflicts with next_call after each conflict, so registering no hooks costs nothing.
+    """
+    def __init__(self):
+        # every hook is a list of the callback, its interval and the number of conflicts of its next call
+        self.hooks: List[list] = []
+        self.next_call = float("inf")
+
+    def add(self, callback: Callable[[Any], None], every: int, conflicts=0):
+        """
+        Registers a callback.
+        :param callback: Called with the solver as argument
+        :param every: The number of conflicts between two calls
+        :param conflicts: (optional) the number of conflicts of the solver so far
+        """
+        if every < 1:
+            raise ValueError("every has to be at least 1")
+        self.hooks.append([callback, every, conflicts + every])
+        self.next_call = min(self.next_call, conflicts + every)
+
+    def call(self, solver: Any, conflicts: int):
+        """
+        Calls the callbacks that are due.
+        :param solver: The solver passed on to the callbacks
+        :param conflicts: The number of conflicts of the solver so far
+        """
+        for hook in self.hooks:
+            if conflicts >= hook[2]:
+                hook[0](solver)
+                hook[2] = conflicts + hook[1]
+        self.next_call = min(hook[2] for hook in self.hooks)
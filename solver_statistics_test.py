@@ -0,0 +1,72 @@
+import pytest
+from first_part import SimpleSolver
+from solver_statistics import ProgressHooks, SolverStatistics
+from second_part.solver import DLPPSolver
+from second_part.cdcl_solver import CDCLSolver
+from second_part.cdcl_solver_test import pigeonhole
+
+
+def test_statistics_as_dict():
+    stats = SolverStatistics()
+    stats.conflicts = 3
+    assert stats.as_dict()["conflicts"] == 3
+    assert "conflicts=3" in repr(stats)
+
+def test_progress_hooks():
+    calls = []
+    hooks = ProgressHooks()
+    assert hooks.next_call == float("inf")
+    hooks.add(lambda solver: calls.append(("a", solver)), every=2)
+    hooks.add(lambda solver: calls.append(("b", solver)), every=3)
+    for conflicts in range(1, 7):
+        if conflicts >= hooks.next_call:
+            hooks.call(conflicts, conflicts)
+    assert calls == [("a", 2), ("b", 3), ("a", 4), ("a", 6), ("b", 6)]
+    with pytest.raises(ValueError):
+        hooks.add(print, every=0)
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_solver_statistics(solver_class):
+    solver = solver_class(pigeonhole(5, 4))
+    assert not solver.solve()
+    stats = solver.stats
+    assert stats.decisions == solver.get_num_decisions() > 0
+    assert stats.conflicts == solver.num_conflicts > 0
+    assert stats.propagations == solver.num_propagations > 0
+    assert stats.backtracks > 0
+    # the timers are only running when profiling
+    assert stats.bcp_time == stats.analysis_time == stats.decision_time == 0
+    assert "propagate" not in vars(solver)
+
+def test_cdcl_statistics():
+    solver = CDCLSolver(pigeonhole(6, 5), restart_policy="geometric", reduce_interval=50)
+    assert not solver.solve()
+    assert solver.stats.learned_clauses > 0
+    assert solver.stats.restarts == solver.num_restarts > 0
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_profile(solver_class):
+    solver = solver_class(pigeonhole(5, 4), profile=True)
+    assert not solver.solve()
+    assert solver.stats.bcp_time > 0
+    assert solver.stats.decision_time > 0
+    if solver_class is CDCLSolver:
+        assert solver.stats.analysis_time > 0
+
+@pytest.mark.parametrize("solver_class", [DLPPSolver, CDCLSolver])
+def test_solver_hooks(solver_class):
+    reports = []
+    solver = solver_class(pigeonhole(5, 4))
+    solver.add_hook(lambda s: reports.append(s.stats.conflicts), every=10)
+    assert not solver.solve()
+    assert reports == list(range(10, solver.num_conflicts + 1, 10))
+
+def test_simple_solver_statistics():
+    reports = []
+    # (x1 or x2) and not x1 and not x2 is falsified by every assignment
+    solver = SimpleSolver([[(1, 0), (1, 1)], [(-1, 0)], [(-1, 1)]])
+    solver.add_hook(lambda s: reports.append(s.stats.conflicts), every=2)
+    assert not solver.solve()
+    assert solver.stats.decisions == solver.get_num_decisions() == 4
+    assert solver.stats.conflicts == 4
+    assert reports == [2, 4]